@@ -16,6 +16,11 @@ from app.models.password_reset_token import PasswordResetToken
 from app.models.login_attempt import LoginAttempt
 from app.models.audit_log import AuditLog
 from app.models.captcha_challenge import CaptchaChallenge
+from app.models.import_job import ImportJob
+from app.models.idempotency_key import IdempotencyKey
+from app.models.product_daily_sales import ProductDailySales
+from app.models.customer_product_stats import CustomerProductStats
+from app.models.receivables_aging_snapshot import ReceivablesAgingSnapshot
 
 config = context.config
 
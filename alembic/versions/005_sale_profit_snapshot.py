@@ -0,0 +1,54 @@
+"""add total_cost and total_profit snapshot to sales
+
+Revision ID: 005_sale_profit_snapshot
+Revises: 004_import_jobs
+Create Date: 2026-10-19 09:00:00.000000
+
+Adiciona sales.total_cost e sales.total_profit e preenche as vendas existentes
+com o mesmo cálculo de Sale.profit: COALESCE(custo histórico do item, custo atual
+do produto, 0). O preenchimento é feito em lotes de ids para não travar a tabela.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005_sale_profit_snapshot'
+down_revision = '004_import_jobs'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade():
+    op.add_column('sales', sa.Column('total_cost', sa.Float(), nullable=True))
+    op.add_column('sales', sa.Column('total_profit', sa.Float(), nullable=True))
+
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text("SELECT COALESCE(MAX(id), 0) FROM sales")).scalar()
+
+    backfill = sa.text("""
+        UPDATE sales SET
+            total_cost = COALESCE((
+                SELECT SUM(COALESCE(si.unit_cost_price, p.cost_price, 0) * si.quantity)
+                FROM sale_items si
+                JOIN products p ON p.id = si.product_id
+                WHERE si.sale_id = sales.id
+            ), 0),
+            total_profit = COALESCE((
+                SELECT SUM((si.unit_price - COALESCE(si.unit_cost_price, p.cost_price, 0)) * si.quantity)
+                FROM sale_items si
+                JOIN products p ON p.id = si.product_id
+                WHERE si.sale_id = sales.id
+            ), 0)
+        WHERE sales.id > :start AND sales.id <= :end AND sales.total_cost IS NULL
+    """)
+
+    for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+        bind.execute(backfill, {"start": start, "end": start + BACKFILL_BATCH_SIZE})
+
+
+def downgrade():
+    op.drop_column('sales', 'total_profit')
+    op.drop_column('sales', 'total_cost')
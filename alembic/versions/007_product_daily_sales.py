@@ -0,0 +1,69 @@
+"""add product_daily_sales rollup for top-seller rankings
+
+Revision ID: 007_product_daily_sales
+Revises: 006_idempotency_keys
+Create Date: 2026-10-19 11:00:00.000000
+
+Adiciona o consolidado diário de vendas por produto (empresa, produto, dia) usado
+por /sales/products/top-sellers e /reports/sold-products, e o preenche com as
+vendas concluídas existentes em lotes de ids (somando na linha do dia).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_product_daily_sales'
+down_revision = '006_idempotency_keys'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade():
+    op.create_table(
+        'product_daily_sales',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.Column('cost', sa.Float(), nullable=False),
+        sa.Column('sale_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('company_id', 'product_id', 'day', name='uq_product_daily_sales_company_product_day')
+    )
+    op.create_index('ix_product_daily_sales_id', 'product_daily_sales', ['id'])
+    op.create_index('ix_product_daily_sales_company_day', 'product_daily_sales', ['company_id', 'day'])
+
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text("SELECT COALESCE(MAX(id), 0) FROM sales")).scalar()
+
+    backfill = sa.text("""
+        INSERT INTO product_daily_sales (company_id, product_id, day, quantity, revenue, cost, sale_count)
+        SELECT s.company_id, si.product_id, DATE(s.created_at),
+               SUM(si.quantity), SUM(si.total_price),
+               SUM(si.quantity * COALESCE(si.unit_cost_price, 0)), COUNT(DISTINCT s.id)
+        FROM sales s
+        JOIN sale_items si ON si.sale_id = s.id
+        WHERE s.id > :start AND s.id <= :end AND LOWER(CAST(s.status AS TEXT)) = 'completed'
+        GROUP BY s.company_id, si.product_id, DATE(s.created_at)
+        ON CONFLICT (company_id, product_id, day) DO UPDATE SET
+            quantity = product_daily_sales.quantity + EXCLUDED.quantity,
+            revenue = product_daily_sales.revenue + EXCLUDED.revenue,
+            cost = product_daily_sales.cost + EXCLUDED.cost,
+            sale_count = product_daily_sales.sale_count + EXCLUDED.sale_count
+    """)
+
+    for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+        bind.execute(backfill, {"start": start, "end": start + BACKFILL_BATCH_SIZE})
+
+
+def downgrade():
+    op.drop_index('ix_product_daily_sales_company_day', table_name='product_daily_sales')
+    op.drop_index('ix_product_daily_sales_id', table_name='product_daily_sales')
+    op.drop_table('product_daily_sales')
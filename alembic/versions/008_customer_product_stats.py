@@ -0,0 +1,68 @@
+"""add customer_product_stats for purchased products per customer
+
+Revision ID: 008_customer_product_stats
+Revises: 007_product_daily_sales
+Create Date: 2026-10-19 12:00:00.000000
+
+Adiciona as estatísticas cliente x produto usadas por
+/sales/by-customer/{id}/products e as preenche com as vendas concluídas
+existentes em lotes de ids (somando na linha do cliente x produto).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_customer_product_stats'
+down_revision = '007_product_daily_sales'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade():
+    op.create_table(
+        'customer_product_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('times_purchased', sa.Integer(), nullable=False),
+        sa.Column('total_quantity', sa.Integer(), nullable=False),
+        sa.Column('total_spent', sa.Float(), nullable=False),
+        sa.Column('last_purchase_date', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ),
+        sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('company_id', 'customer_id', 'product_id', name='uq_customer_product_stats')
+    )
+    op.create_index('ix_customer_product_stats_id', 'customer_product_stats', ['id'])
+
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text("SELECT COALESCE(MAX(id), 0) FROM sales")).scalar()
+
+    backfill = sa.text("""
+        INSERT INTO customer_product_stats
+            (company_id, customer_id, product_id, times_purchased, total_quantity, total_spent, last_purchase_date)
+        SELECT s.company_id, s.customer_id, si.product_id,
+               COUNT(si.id), SUM(si.quantity), SUM(si.total_price), MAX(s.created_at)
+        FROM sales s
+        JOIN sale_items si ON si.sale_id = s.id
+        WHERE s.id > :start AND s.id <= :end AND LOWER(CAST(s.status AS TEXT)) = 'completed'
+        GROUP BY s.company_id, s.customer_id, si.product_id
+        ON CONFLICT (company_id, customer_id, product_id) DO UPDATE SET
+            times_purchased = customer_product_stats.times_purchased + EXCLUDED.times_purchased,
+            total_quantity = customer_product_stats.total_quantity + EXCLUDED.total_quantity,
+            total_spent = customer_product_stats.total_spent + EXCLUDED.total_spent,
+            last_purchase_date = GREATEST(customer_product_stats.last_purchase_date, EXCLUDED.last_purchase_date)
+    """)
+
+    for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+        bind.execute(backfill, {"start": start, "end": start + BACKFILL_BATCH_SIZE})
+
+
+def downgrade():
+    op.drop_index('ix_customer_product_stats_id', table_name='customer_product_stats')
+    op.drop_table('customer_product_stats')
@@ -0,0 +1,52 @@
+"""add receivables_aging_snapshots table
+
+Revision ID: 009_receivables_aging
+Revises: 008_customer_product_stats
+Create Date: 2026-10-19 13:00:00.000000
+
+Adiciona a foto diária, por empresa, do saldo em aberto das parcelas por faixa
+de atraso, usada por /reports/receivables-aging e /cron/overdue-summary.
+A primeira foto é gerada pelo job noturno ou na primeira consulta.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_receivables_aging'
+down_revision = '008_customer_product_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'receivables_aging_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('snapshot_date', sa.Date(), nullable=False),
+        sa.Column('future_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('future_amount', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('current_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('current_amount', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('days_1_30_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('days_1_30_amount', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('days_31_60_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('days_31_60_amount', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('days_61_90_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('days_61_90_amount', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('days_90_plus_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('days_90_plus_amount', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('company_id', 'snapshot_date', name='uq_receivables_aging_company_date')
+    )
+    op.create_index('ix_receivables_aging_snapshots_id', 'receivables_aging_snapshots', ['id'])
+    op.create_index('ix_receivables_aging_snapshots_snapshot_date', 'receivables_aging_snapshots', ['snapshot_date'])
+
+
+def downgrade():
+    op.drop_index('ix_receivables_aging_snapshots_snapshot_date', table_name='receivables_aging_snapshots')
+    op.drop_index('ix_receivables_aging_snapshots_id', table_name='receivables_aging_snapshots')
+    op.drop_table('receivables_aging_snapshots')
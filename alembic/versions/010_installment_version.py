@@ -0,0 +1,30 @@
+"""add optimistic version column to installments
+
+Revision ID: 010_installment_version
+Revises: 009_receivables_aging
+Create Date: 2026-10-19 14:00:00.000000
+
+Adiciona installments.version (version_id_col do SQLAlchemy). Pagamentos leem a
+parcela sem FOR UPDATE e o UPDATE confere a versão lida; em conflito o pagamento
+é refeito. O server_default preenche as parcelas existentes com 1.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_installment_version'
+down_revision = '009_receivables_aging'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'installments',
+        sa.Column('version', sa.Integer(), nullable=False, server_default='1')
+    )
+
+
+def downgrade():
+    op.drop_column('installments', 'version')
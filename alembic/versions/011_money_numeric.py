@@ -0,0 +1,82 @@
+"""store money columns as NUMERIC(12, 2)
+
+Revision ID: 011_money_numeric
+Revises: 010_installment_version
+Create Date: 2026-10-19 15:00:00.000000
+
+Troca FLOAT por NUMERIC(12, 2) nos valores de vendas, itens, parcelas, pagamentos
+e nas tabelas de relatório (app.core.money.Money). Os valores são arredondados ao
+centavo; antes disso a diferença de arredondamento de cada venda é lançada na
+última parcela, para a soma das parcelas continuar igual ao total da venda
+(ex: 33.333.. + 33.333.. + 33.333.. vira 33.33 + 33.33 + 33.34).
+
+A troca de tipo reescreve as tabelas: rodar em janela de manutenção.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011_money_numeric'
+down_revision = '010_installment_version'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+MONEY_COLUMNS = {
+    'sales': ['subtotal', 'discount_amount', 'total_amount', 'total_cost', 'total_profit'],
+    'sale_items': ['unit_price', 'total_price', 'unit_cost_price'],
+    'installments': ['amount'],
+    'installment_payments': ['amount_paid'],
+    'product_daily_sales': ['revenue', 'cost'],
+    'customer_product_stats': ['total_spent'],
+    'receivables_aging_snapshots': [
+        'future_amount', 'current_amount', 'days_1_30_amount',
+        'days_31_60_amount', 'days_61_90_amount', 'days_90_plus_amount'
+    ],
+}
+
+
+def upgrade():
+    bind = op.get_bind()
+    max_sale_id = bind.execute(sa.text("SELECT COALESCE(MAX(sale_id), 0) FROM installments")).scalar()
+
+    # Resíduo do arredondamento de cada venda vai para a última parcela
+    adjust_last_installment = sa.text("""
+        UPDATE installments SET amount = ROUND(CAST(installments.amount AS NUMERIC), 2) + d.diff
+        FROM (
+            SELECT sale_id,
+                   MAX(installment_number) AS last_number,
+                   ROUND(CAST(SUM(amount) AS NUMERIC), 2) - SUM(ROUND(CAST(amount AS NUMERIC), 2)) AS diff
+            FROM installments
+            WHERE sale_id > :start AND sale_id <= :end
+            GROUP BY sale_id
+        ) d
+        WHERE installments.sale_id = d.sale_id
+          AND installments.installment_number = d.last_number
+          AND d.diff <> 0
+    """)
+
+    for start in range(0, max_sale_id, BACKFILL_BATCH_SIZE):
+        bind.execute(adjust_last_installment, {"start": start, "end": start + BACKFILL_BATCH_SIZE})
+
+    for table, columns in MONEY_COLUMNS.items():
+        for column in columns:
+            op.alter_column(
+                table, column,
+                type_=sa.Numeric(12, 2),
+                existing_type=sa.Float(),
+                postgresql_using=f"ROUND(CAST({column} AS NUMERIC), 2)"
+            )
+
+
+def downgrade():
+    for table, columns in MONEY_COLUMNS.items():
+        for column in columns:
+            op.alter_column(
+                table, column,
+                type_=sa.Float(),
+                existing_type=sa.Numeric(12, 2),
+                postgresql_using=f"CAST({column} AS DOUBLE PRECISION)"
+            )
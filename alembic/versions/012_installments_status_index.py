@@ -0,0 +1,30 @@
+"""add (company_id, status, due_date) index to installments
+
+Revision ID: 012_installments_status_index
+Revises: 011_money_numeric
+Create Date: 2026-10-19 16:00:00.000000
+
+O status OVERDUE passa a ser calculado na leitura (status IN ('PENDING', 'OVERDUE')
+AND due_date < hoje). O índice atende esse filtro, o status=pending e os demais
+status por empresa, sem depender do job noturno.
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '012_installments_status_index'
+down_revision = '011_money_numeric'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_installments_company_status_due_date',
+        'installments',
+        ['company_id', 'status', 'due_date']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_installments_company_status_due_date', table_name='installments')
@@ -0,0 +1,56 @@
+"""add composite and partial indexes for tenant-scoped queries
+
+Revision ID: 013_tenant_composite_indexes
+Revises: 012_installments_status_index
+Create Date: 2026-10-19 17:00:00.000000
+
+Índices no formato das consultas de reports.py, sales.py, installments.py e
+customers.py (empresa + status/data, histórico por cliente, FKs das junções).
+No PostgreSQL são criados com CREATE INDEX CONCURRENTLY, fora da transação da
+migração, sem bloquear escritas. Se a criação for interrompida, o índice fica
+INVALID: remova-o (DROP INDEX CONCURRENTLY) e rode a migração novamente.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013_tenant_composite_indexes'
+down_revision = '012_installments_status_index'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    # Listagens, relatórios e dashboard: vendas da empresa por status e período
+    ('ix_sales_company_status_created_at', 'sales', ['company_id', 'status', 'created_at'], None),
+    ('ix_sales_company_created_at', 'sales', ['company_id', 'created_at'], None),
+    # Histórico de compras do cliente
+    ('ix_sales_customer_created_at', 'sales', ['customer_id', 'created_at'], None),
+    ('ix_sale_items_sale_id', 'sale_items', ['sale_id'], None),
+    ('ix_sale_items_product_id', 'sale_items', ['product_id'], None),
+    # Parcelas do cliente ordenadas por vencimento e débito do cliente
+    ('ix_installments_customer_due_date', 'installments', ['customer_id', 'due_date'], None),
+    ('ix_installments_sale_id', 'installments', ['sale_id'], None),
+    ('ix_installment_payments_installment_id', 'installment_payments', ['installment_id'], None),
+    # Catálogo e estoque baixo: apenas produtos ativos
+    ('ix_products_company_active_stock', 'products', ['company_id', 'stock_quantity'], 'is_active'),
+    # Listagem de clientes por empresa (paginação por cursor em id)
+    ('ix_customers_company_id_id', 'customers', ['company_id', 'id'], None),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
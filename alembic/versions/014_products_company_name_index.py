@@ -0,0 +1,33 @@
+"""add products(company_id, name) index
+
+Revision ID: 014_products_company_name_index
+Revises: 013_tenant_composite_indexes
+Create Date: 2026-10-19 18:00:00.000000
+
+A busca de produtos (/products/search) filtra por empresa e ordena por nome;
+o índice parcial de produtos ativos não atende a busca com active_only=false.
+Apontado pelo teste de planos de execução (tests/test_query_plans.py).
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '014_products_company_name_index'
+down_revision = '013_tenant_composite_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_products_company_name', 'products', ['company_id', 'name'],
+            if_not_exists=True,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_products_company_name', table_name='products', if_exists=True,
+                      postgresql_concurrently=True)
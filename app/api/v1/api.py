@@ -19,7 +19,9 @@ from app.api.v1.endpoints import (
     public,
     cron,
     categories,
-    stock_movements
+    stock_movements,
+    exports,
+    profiling
 )
 
 api_router = APIRouter()
@@ -37,5 +39,7 @@ api_router.include_router(installments.router, prefix="/installments", tags=["Pa
 api_router.include_router(installment_payments.router, prefix="/installment-payments", tags=["Pagamentos de Parcelas"])
 api_router.include_router(stock_movements.router, prefix="/stock-movements", tags=["Movimentações de Estoque"])
 api_router.include_router(reports.router, prefix="/reports", tags=["Relatórios"])
+api_router.include_router(exports.router, prefix="/exports", tags=["Exportação"])
 api_router.include_router(pix.router, prefix="/pix", tags=["PIX"])
 api_router.include_router(cron.router, prefix="/cron", tags=["Cron"])
+api_router.include_router(profiling.router, prefix="/profiling", tags=["Diagnóstico"])
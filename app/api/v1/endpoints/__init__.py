@@ -15,7 +15,8 @@ from . import (
     public,
     cron,
     categories,
-    products_import
+    products_import,
+    exports
 )
 
 __all__ = [
@@ -33,4 +34,5 @@ __all__ = [
     "cron",
     "categories",
     "products_import",
+    "exports",
 ]
@@ -3,6 +3,7 @@ Endpoints de Cron Jobs (v1)
 Tarefas agendadas do sistema
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from datetime import date
 
@@ -10,7 +11,8 @@ from app.core.database import get_db
 from app.core.deps import verify_cron_auth
 from app.models.installment import Installment, InstallmentStatus
 from app.models.company import Company  # Added import for Company model
-from app.models.installment_payment import InstallmentPaymentStatus  # Added import for InstallmentPaymentStatus
+from app.models.receivables_aging_snapshot import ReceivablesAgingSnapshot
+from app.services.receivables_aging_service import refresh_aging_snapshots, serialize_snapshot
 
 router = APIRouter()
 
@@ -81,6 +83,28 @@ async def mark_overdue_installments(
     }
 
 
+@router.post("/receivables-aging", summary="Gerar aging de contas a receber (CRON)")
+async def receivables_aging(
+    cron_auth: bool = Depends(verify_cron_auth),
+    db: Session = Depends(get_db)
+):
+    """
+    **Gerar Aging de Contas a Receber**
+    
+    Recalcula a foto do dia (saldo em aberto por faixa de atraso) de todas as empresas.
+    
+    **Autenticação:** Header `X-Cron-Secret` obrigatório
+    """
+    companies_count = refresh_aging_snapshots(db)
+    db.commit()
+    
+    return {
+        "message": "Aging de contas a receber atualizado",
+        "companies_count": companies_count,
+        "executed_at": str(date.today())
+    }
+
+
 @router.get("/overdue-summary", summary="Resumo de inadimplência")
 async def overdue_summary(
     cron_auth: bool = Depends(verify_cron_auth),
@@ -91,53 +115,44 @@ async def overdue_summary(
     
     Retorna sumário de parcelas vencidas agrupadas por empresa.
     Considera apenas saldo restante após pagamentos parciais.
+    Lido da foto diária do aging (gerada na hora se ainda não existir).
     """
-    overdue_installments = db.query(Installment).filter(
-        Installment.status == InstallmentStatus.OVERDUE
-    ).all()
+    today = date.today()
+    
+    # O relatório por empresa grava só a foto de quem chamou: recalcula todas
+    # se alguma empresa ainda não tiver a foto do dia
+    snapshots_count = db.query(func.count(ReceivablesAgingSnapshot.id)).filter(
+        ReceivablesAgingSnapshot.snapshot_date == today
+    ).scalar()
+    if snapshots_count < db.query(func.count(Company.id)).scalar():
+        refresh_aging_snapshots(db, today)
+        db.commit()
+    
+    rows = db.query(ReceivablesAgingSnapshot, Company.name).join(
+        Company, Company.id == ReceivablesAgingSnapshot.company_id
+    ).filter(
+        ReceivablesAgingSnapshot.snapshot_date == today
+    ).order_by(ReceivablesAgingSnapshot.company_id).all()
     
-    def _calculate_remaining_amount(installment: Installment) -> float:
-        total_paid = sum(
-            p.amount_paid for p in installment.payments 
-            if p.status == InstallmentPaymentStatus.COMPLETED
-        )
-        return max(0, installment.amount - total_paid)
-    
-    # Agrupar por empresa
-    companies_data = {}
-    total_overdue_amount = 0.0
-    
-    for installment in overdue_installments:
-        remaining = _calculate_remaining_amount(installment)
-        company_id = installment.company_id
-        
-        if company_id not in companies_data:
-            companies_data[company_id] = {
-                "count": 0,
-                "total_amount": 0.0
-            }
-        companies_data[company_id]["count"] += 1
-        companies_data[company_id]["total_amount"] += remaining
-        total_overdue_amount += remaining
-    
-    # Preencher informações de empresa
     companies = []
-    for company_id, data in companies_data.items():
-        company = db.query(Company).filter(Company.id == company_id).first()
-        if company:
-            companies.append({
-                "company_id": company_id,
-                "company_name": company.name,
-                "overdue_count": data["count"],
-                "overdue_amount": round(data["total_amount"], 2)
-            })
+    for snapshot, company_name in rows:
+        aging = serialize_snapshot(snapshot)
+        if aging["overdue_count"] == 0:
+            continue
+        companies.append({
+            "company_id": snapshot.company_id,
+            "company_name": company_name,
+            "overdue_count": aging["overdue_count"],
+            "overdue_amount": aging["overdue_amount"],
+            "buckets": aging["buckets"]
+        })
     
     return {
         "companies": companies,
         "total_companies": len(companies),
-        "total_overdue_installments": len(overdue_installments),
-        "total_overdue_amount": round(total_overdue_amount, 2),
-        "generated_at": str(date.today())
+        "total_overdue_installments": sum(c["overdue_count"] for c in companies),
+        "total_overdue_amount": round(sum(c["overdue_amount"] for c in companies), 2),
+        "generated_at": str(today)
     }
 
 
@@ -5,7 +5,7 @@ CRUD com isolamento por empresa
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime, date as date_type
+from datetime import datetime
 
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_role
@@ -15,7 +15,7 @@ from app.models.installment import Installment, InstallmentStatus
 from app.models.installment_payment import InstallmentPayment, InstallmentPaymentStatus
 from app.schemas.customer import CustomerCreate, CustomerUpdate, CustomerResponse
 from sqlalchemy import func, select
-from app.schemas.pagination import paginate
+from app.schemas.pagination import paginate, fetch_page, keyset_paginate, paginate_cursor
 from app.api.v1.endpoints.installments import _calculate_installment_balance
 from app.core.datetime_utils import get_now_fortaleza_naive
 
@@ -37,19 +37,31 @@ def _calculate_customer_debt(db: Session, customer_id: int) -> tuple[float, floa
     
     total_debt = 0.0
     total_due = 0.0
-    today = date_type.today()
     
     for installment in pending_overdue_installments:
         _, remaining = _calculate_installment_balance(installment)
         
         total_debt += remaining
         
-        if installment.status == InstallmentStatus.OVERDUE or installment.due_date < today:
+        if installment.is_overdue:
             total_due += remaining
     
     return total_debt, total_due
 
 
+def _customers_with_debt(db: Session, customers: List[Customer]) -> List[dict]:
+    result = []
+    for customer in customers:
+        total_debt, total_due = _calculate_customer_debt(db, customer.id)
+        
+        result.append({
+            **CustomerResponse.model_validate(customer).model_dump(),
+            "total_debt": float(total_debt),
+            "total_due": float(total_due)
+        })
+    return result
+
+
 @router.post("/", response_model=CustomerResponse, status_code=status.HTTP_201_CREATED, summary="Criar novo cliente")
 async def create_customer(
     customer_data: CustomerCreate,
@@ -105,6 +117,9 @@ async def list_customers(
     skip: int = 0,
     limit: Optional[int] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    estimate_total: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -117,6 +132,9 @@ async def list_customers(
     - `search`: Buscar por nome ou CPF
     - `skip`: Pular N registros (padrão: 0)
     - `limit`: Quantidade de registros (opcional, se não informado retorna todos)
+    - `cursor`: Ativa a paginação por cursor (`cursor=` na primeira página, depois o `next_cursor` recebido)
+    - `with_total`: Calcular o total (padrão: true; false evita o COUNT e `has_next` vem de limit+1)
+    - `estimate_total`: Total aproximado pelas estatísticas do banco (listas grandes sem filtro)
     
     **Resposta:** Lista de clientes paginada
     """
@@ -130,29 +148,19 @@ async def list_customers(
             (Customer.cpf.ilike(f"%{search}%"))
         )
     
-    total = query.count()
+    if cursor is not None:
+        limit = min(limit, 100) if limit else None
+        customers, next_cursor = keyset_paginate(query, [Customer.id], cursor, limit)
+        return paginate_cursor(_customers_with_debt(db, customers), limit, next_cursor, cursor)
     
-    query = query.offset(skip)
+    if limit is not None and limit > 100:
+        limit = 100
+    customers, total, has_next = fetch_page(query, skip, limit, with_total, estimate_total)
     
     if limit is None:
-        customers = query.all()
-        limit = total if total > 0 else 1
-    else:
-        if limit > 100:
-            limit = 100
-        customers = query.limit(limit).all()
-    
-    result = []
-    for customer in customers:
-        total_debt, total_due = _calculate_customer_debt(db, customer.id)
-        
-        result.append({
-            **CustomerResponse.model_validate(customer).model_dump(),
-            "total_debt": float(total_debt),
-            "total_due": float(total_due)
-        })
+        limit = total if total else 1
     
-    return paginate(result, total, skip, limit)
+    return paginate(_customers_with_debt(db, customers), total, skip, limit, has_next)
 
 
 @router.get("/{customer_id}", response_model=dict, summary="Obter dados do cliente")
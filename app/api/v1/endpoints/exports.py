@@ -0,0 +1,86 @@
+"""
+Endpoints de Exportação (v1)
+Exporta catálogo de produtos e lista de clientes em CSV via streaming
+"""
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.database import get_db
+from app.core.deps import require_role
+from app.models.user import User
+from app.services.export_service import (
+    CUSTOMER_DEBT_HEADER,
+    CUSTOMER_EXPORT_HEADER,
+    PRODUCT_EXPORT_HEADER,
+    iter_csv,
+    iter_customer_rows,
+    iter_product_rows,
+)
+
+router = APIRouter()
+
+
+def _csv_response(content, prefix: str) -> StreamingResponse:
+    filename = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    return StreamingResponse(
+        content,
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+def _session_factory(db: Session):
+    """
+    O streaming continua após o fim da dependência get_db,
+    então cada exportação usa uma sessão própria no mesmo engine.
+    """
+    return sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+
+
+@router.get("/products", summary="Exportar catálogo de produtos (CSV)")
+def export_products(
+    active_only: bool = False,
+    delimiter: str = Query(",", pattern="^[,;]$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("admin", "gerente"))
+):
+    """
+    **Exportar Catálogo de Produtos**
+
+    Gera um CSV com todos os produtos da empresa (categoria, estoque e preços).
+    O cabeçalho é o mesmo da importação, então o arquivo pode ser reimportado.
+
+    **Parâmetros:**
+    - `active_only`: Exportar apenas produtos ativos (padrão: False)
+    - `delimiter`: `,` (padrão) ou `;` (Excel em português)
+
+    **Requer:** Admin ou Gerente
+    """
+    rows = iter_product_rows(_session_factory(db), current_user.company_id, active_only)
+    return _csv_response(iter_csv(PRODUCT_EXPORT_HEADER, rows, delimiter), "produtos")
+
+
+@router.get("/customers", summary="Exportar clientes (CSV)")
+def export_customers(
+    include_debt: bool = False,
+    delimiter: str = Query(",", pattern="^[,;]$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("admin", "gerente"))
+):
+    """
+    **Exportar Clientes**
+
+    Gera um CSV com todos os clientes da empresa.
+
+    **Parâmetros:**
+    - `include_debt`: Incluir colunas `total_debito` e `total_vencido` (calculadas por lote)
+    - `delimiter`: `,` (padrão) ou `;` (Excel em português)
+
+    **Requer:** Admin ou Gerente
+    """
+    header = CUSTOMER_EXPORT_HEADER + (CUSTOMER_DEBT_HEADER if include_debt else [])
+    rows = iter_customer_rows(_session_factory(db), current_user.company_id, include_debt)
+    return _csv_response(iter_csv(header, rows, delimiter), "clientes")
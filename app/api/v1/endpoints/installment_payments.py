@@ -1,23 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
 from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy import case, func, insert, literal
+from sqlalchemy.orm.exc import StaleDataError
+from typing import Annotated, Callable, Optional
 from datetime import datetime
 import sys
-from decimal import Decimal, ROUND_HALF_UP
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.deps import get_current_user
 from app.core.messages import Messages
+from app.core.money import from_cents, to_cents
 from app.models.user import User
+from app.models.customer import Customer
 from app.models.installment import Installment, InstallmentStatus
 from app.models.installment_payment import InstallmentPayment, InstallmentPaymentStatus
 from app.schemas.installment_payment import (
     InstallmentPaymentCreate,
     InstallmentPaymentOut,
-    InstallmentDetailOut
+    InstallmentDetailOut,
+    PaymentAllocationCreate,
+    PaymentAllocationOut
 )
 from app.schemas.installment import InstallmentOut
 from app.api.v1.endpoints.installments import _calculate_installment_balance
+from app.schemas.pagination import keyset_paginate, paginate_cursor
+from app.services.idempotency_service import IDEMPOTENCY_HEADER, run_idempotent
 
 router = APIRouter()
 
@@ -37,6 +45,8 @@ def paginate(data: list, total: int, skip: int, limit: int) -> dict:
              summary="Registrar pagamento de parcela")
 def create_installment_payment(
         payment_data: InstallmentPaymentCreate,
+        response: Response = None,
+        idempotency_key: Annotated[Optional[str], Header(alias=IDEMPOTENCY_HEADER)] = None,
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -50,7 +60,29 @@ def create_installment_payment(
         "amount": 100.00,
         "payment_method": "cash"
     }
-\`\`\`    """
+\`\`\`
+    Envie o header **Idempotency-Key** para que reenvios devolvam o mesmo
+    pagamento sem registrá-lo duas vezes.
+    """
+    return run_idempotent(
+        db,
+        current_user.company_id,
+        "POST /installment-payments",
+        idempotency_key,
+        payment_data.model_dump(mode="json"),
+        lambda complete: _create_installment_payment(payment_data, current_user, db, complete),
+        lambda payment: payment.model_dump(mode="json"),
+        response
+    )
+
+
+def _create_installment_payment(
+        payment_data: InstallmentPaymentCreate,
+        current_user: User,
+        db: Session,
+        complete: Callable[[InstallmentPaymentOut], None]
+) -> InstallmentPaymentOut:
+    """Registra o pagamento e marca a parcela como paga quando quitada"""
 
     if not payment_data.installment_id:
         raise HTTPException(
@@ -58,8 +90,46 @@ def create_installment_payment(
             detail=Messages.PAYMENT_INSTALLMENT_ID_REQUIRED
         )
 
+    return _register_payment(payment_data.installment_id, payment_data, current_user, db, complete)
+
+
+def _register_payment(
+        installment_id: int,
+        payment_data: InstallmentPaymentCreate,
+        current_user: User,
+        db: Session,
+        complete: Optional[Callable[[InstallmentPaymentOut], None]] = None
+) -> InstallmentPaymentOut:
+    """
+    Registra o pagamento sem bloquear a parcela (controle otimista por versão).
+
+    Se outro pagamento alterar a parcela entre a leitura do saldo e o commit,
+    o UPDATE da versão não encontra a linha (StaleDataError): desfaz, relê o
+    saldo e tenta de novo até PAYMENT_MAX_RETRIES vezes.
+    """
+    for _ in range(settings.PAYMENT_MAX_RETRIES + 1):
+        try:
+            return _apply_payment(installment_id, payment_data, current_user, db, complete)
+        except StaleDataError:
+            db.rollback()
+
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=Messages.PAYMENT_CONFLICT
+    )
+
+
+def _apply_payment(
+        installment_id: int,
+        payment_data: InstallmentPaymentCreate,
+        current_user: User,
+        db: Session,
+        complete: Optional[Callable[[InstallmentPaymentOut], None]] = None
+) -> InstallmentPaymentOut:
+    """Uma tentativa de pagamento: valida o saldo lido, insere o pagamento e incrementa a versão da parcela"""
+
     installment = db.query(Installment).filter(
-        Installment.id == payment_data.installment_id
+        Installment.id == installment_id
     ).first()
 
     if not installment:
@@ -90,11 +160,10 @@ def create_installment_payment(
             detail="Esta parcela já está totalmente paga"
         )
 
-    # CHANGE: Usar Decimal para evitar problemas de precisão com ponto flutuante
-    amount_decimal = Decimal(str(amount)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-    remaining_decimal = Decimal(str(remaining_amount)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    # Comparações em centavos inteiros (sem erro de ponto flutuante)
+    amount_cents = to_cents(amount)
 
-    if amount_decimal > remaining_decimal:
+    if amount_cents > to_cents(remaining_amount):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=Messages.format(Messages.PAYMENT_AMOUNT_EXCEEDS, amount=amount, remaining=remaining_amount)
@@ -102,105 +171,195 @@ def create_installment_payment(
 
     db_payment = InstallmentPayment(
         installment_id=installment.id,
-        amount_paid=amount,
+        amount_paid=from_cents(amount_cents),
         status=InstallmentPaymentStatus.COMPLETED,
         company_id=current_user.company_id
     )
     db.add(db_payment)
 
     # CHANGE: Calcula novo total após adicionar pagamento, e persiste status PAID no banco se necessário
-    new_total_paid = total_paid + amount
-    amount_float = float(installment.amount)
-
-    # Usar Decimal para comparação precisa
-    new_total_decimal = Decimal(str(new_total_paid)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-    amount_decimal_compare = Decimal(str(amount_float)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-
-    if new_total_decimal >= amount_decimal_compare:
+    if to_cents(total_paid) + amount_cents >= to_cents(installment.amount):
         installment.status = InstallmentStatus.PAID
 
-    db.commit()
+    # Sempre gera o UPDATE ... WHERE version = <lida>, mesmo em pagamento parcial
+    installment.updated_at = datetime.utcnow()
+
+    db.flush()
     db.refresh(db_payment)
+    payment_out = InstallmentPaymentOut.model_validate(db_payment)
+    if complete:
+        complete(payment_out)
+    db.commit()
 
-    response = InstallmentPaymentOut.model_validate(db_payment)
-    return response
+    return payment_out
 
 
-@router.post("/{installment_id}/pay", response_model=InstallmentPaymentOut, status_code=status.HTTP_201_CREATED,
-             summary="Registrar pagamento parcial")
-def register_installment_payment(
-        installment_id: int,
-        payment: InstallmentPaymentCreate,
+@router.post("/allocate", response_model=PaymentAllocationOut, status_code=status.HTTP_201_CREATED,
+             summary="Distribuir pagamento entre parcelas do cliente")
+def allocate_customer_payment(
+        allocation_data: PaymentAllocationCreate,
+        response: Response = None,
+        idempotency_key: Annotated[Optional[str], Header(alias=IDEMPOTENCY_HEADER)] = None,
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
-    """Endpoint alternativo para registrar pagamento (mantido para compatibilidade com testes)"""
-
-    installment = db.query(Installment).filter(
-        Installment.id == installment_id
-    ).first()
+    """
+    Distribuir Pagamento entre Parcelas
 
-    if not installment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=Messages.INSTALLMENT_NOT_FOUND
-        )
+    Aplica o valor recebido nas parcelas em aberto do cliente, da que vence
+    primeiro para a última (FIFO). A última parcela atingida pode ficar com
+    pagamento parcial. O valor não pode exceder o saldo devedor do cliente.
 
-    if installment.company_id != current_user.company_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=Messages.RESOURCE_NOT_FOUND
-        )
+    **Corpo da requisição:**
+    ```json
+    {
+        "customer_id": 12,
+        "amount": 250.00
+    }
+    ```
+    Envie o header **Idempotency-Key** para que reenvios não registrem o pagamento duas vezes.
+    """
+    return run_idempotent(
+        db,
+        current_user.company_id,
+        "POST /installment-payments/allocate",
+        idempotency_key,
+        allocation_data.model_dump(mode="json"),
+        lambda complete: _allocate_customer_payment(allocation_data, current_user, db, complete),
+        lambda result: PaymentAllocationOut.model_validate(result).model_dump(mode="json"),
+        response
+    )
 
-    amount = payment.amount_paid or payment.amount
 
-    if amount is None or amount <= 0:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="O valor do pagamento deve ser maior que zero"
-        )
+def _allocate_customer_payment(
+        allocation_data: PaymentAllocationCreate,
+        current_user: User,
+        db: Session,
+        complete: Callable[[dict], None]
+) -> dict:
+    """Bloqueia as parcelas em aberto uma vez, insere os pagamentos em lote e quita as parcelas cobertas"""
 
-    total_paid, remaining_amount = _calculate_installment_balance(installment)
+    customer = db.query(Customer.id).filter(
+        Customer.id == allocation_data.customer_id,
+        Customer.company_id == current_user.company_id
+    ).first()
 
-    if remaining_amount <= 0:
+    if not customer:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Esta parcela já está totalmente paga"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=Messages.CUSTOMER_NOT_FOUND
         )
 
-    # CHANGE: Usar Decimal para evitar problemas de precisão com ponto flutuante
-    amount_decimal = Decimal(str(amount)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-    remaining_decimal = Decimal(str(remaining_amount)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-
-    if amount_decimal > remaining_decimal:
+    installments = db.query(Installment).filter(
+        Installment.customer_id == allocation_data.customer_id,
+        Installment.company_id == current_user.company_id,
+        Installment.status.in_([InstallmentStatus.PENDING, InstallmentStatus.OVERDUE])
+    ).order_by(
+        Installment.due_date, Installment.installment_number, Installment.id
+    ).with_for_update().all()
+
+    paid_by_installment = dict(
+        db.query(
+            InstallmentPayment.installment_id,
+            func.sum(InstallmentPayment.amount_paid)
+        ).filter(
+            InstallmentPayment.installment_id.in_([i.id for i in installments]),
+            InstallmentPayment.status == InstallmentPaymentStatus.COMPLETED
+        ).group_by(InstallmentPayment.installment_id).all()
+    ) if installments else {}
+
+    balances = []
+    for installment in installments:
+        remaining = to_cents(installment.amount) - to_cents(paid_by_installment.get(installment.id))
+        if remaining > 0:
+            balances.append((installment, remaining))
+
+    amount = to_cents(allocation_data.amount)
+    total_debt = sum(remaining for _, remaining in balances)
+
+    if amount > total_debt:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=Messages.format(Messages.PAYMENT_AMOUNT_EXCEEDS, amount=amount, remaining=remaining_amount)
+            detail=Messages.format(Messages.PAYMENT_AMOUNT_EXCEEDS,
+                                   amount=from_cents(amount), remaining=from_cents(total_debt))
         )
 
-    db_payment = InstallmentPayment(
-        installment_id=installment_id,
-        amount_paid=amount,
-        status=InstallmentPaymentStatus.COMPLETED,
-        company_id=current_user.company_id
+    # FIFO: da parcela que vence primeiro para a última
+    allocations = []
+    left = amount
+    for installment, remaining in balances:
+        if left <= 0:
+            break
+        applied = min(left, remaining)
+        left -= applied
+        allocations.append((installment, applied, remaining - applied))
+
+    payment_ids = dict(
+        (installment_id, payment_id)
+        for payment_id, installment_id in db.execute(
+            insert(InstallmentPayment).returning(InstallmentPayment.id, InstallmentPayment.installment_id),
+            [
+                {
+                    "installment_id": installment.id,
+                    "company_id": current_user.company_id,
+                    "amount_paid": from_cents(applied),
+                    "status": InstallmentPaymentStatus.COMPLETED
+                }
+                for installment, applied, _ in allocations
+            ]
+        ).all()
     )
-    db.add(db_payment)
 
-    # CHANGE: Calcula novo total após adicionar pagamento, e persiste status PAID no banco se necessário
-    new_total_paid = total_paid + amount
-    amount_float = float(installment.amount)
+    # Um único UPDATE: quita as parcelas cobertas e incrementa a versão de todas as atingidas,
+    # para que pagamentos otimistas concorrentes (que leram a versão anterior) refaçam a leitura
+    settled_ids = [installment.id for installment, _, left_after in allocations if left_after <= 0]
+    if allocations:
+        db.query(Installment).filter(
+            Installment.id.in_([installment.id for installment, _, _ in allocations])
+        ).update({
+            Installment.version: Installment.version + 1,
+            Installment.status: case(
+                (Installment.id.in_(settled_ids), literal(InstallmentStatus.PAID, Installment.status.type)),
+                else_=Installment.status
+            )
+        }, synchronize_session="fetch")
+
+    result = {
+        "customer_id": allocation_data.customer_id,
+        "amount": from_cents(amount),
+        "remaining_debt": from_cents(total_debt - amount),
+        "allocations": [
+            {
+                "payment_id": payment_ids[installment.id],
+                "installment_id": installment.id,
+                "sale_id": installment.sale_id,
+                "installment_number": installment.installment_number,
+                "due_date": installment.due_date,
+                "amount_paid": from_cents(applied),
+                "remaining_amount": from_cents(left_after),
+                "status": InstallmentStatus.PAID.value if left_after <= 0 else installment.effective_status.value
+            }
+            for installment, applied, left_after in allocations
+        ]
+    }
 
-    # Usar Decimal para comparação precisa
-    new_total_decimal = Decimal(str(new_total_paid)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-    amount_decimal_compare = Decimal(str(amount_float)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    complete(result)
+    db.commit()
 
-    if new_total_decimal >= amount_decimal_compare:
-        installment.status = InstallmentStatus.PAID
+    return result
 
-    db.commit()
-    db.refresh(db_payment)
 
-    return InstallmentPaymentOut.model_validate(db_payment)
+@router.post("/{installment_id}/pay", response_model=InstallmentPaymentOut, status_code=status.HTTP_201_CREATED,
+             summary="Registrar pagamento parcial")
+def register_installment_payment(
+        installment_id: int,
+        payment: InstallmentPaymentCreate,
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """Endpoint alternativo para registrar pagamento (mantido para compatibilidade com testes)"""
+
+    return _register_payment(installment_id, payment, current_user, db)
 
 
 @router.get("/installments/{installment_id}/payments", summary="Listar pagamentos de uma parcela")
@@ -290,7 +449,8 @@ def get_installment_detail(
     payments_data = [InstallmentPaymentOut.model_validate(p).model_dump() for p in payments]
 
     # CHANGE: Se remaining_amount é 0, o status deve ser "paid" independentemente do banco
-    response_status = installment.status.value
+    # Demais casos: status calculado na leitura (vencida sem depender do job noturno)
+    response_status = installment.effective_status.value
     if remaining_amount == 0.0:
         response_status = InstallmentStatus.PAID.value
 
@@ -316,6 +476,7 @@ def list_all_payments(
         skip: int = Query(0, ge=0),
         limit: int = Query(100, ge=1, le=1000),
         installment_id: Optional[int] = None,
+        cursor: Optional[str] = None,
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -326,6 +487,7 @@ def list_all_payments(
     - `skip`: Quantidade de registros a pular (padrão: 0)
     - `limit`: Quantidade máxima de registros (padrão: 100, máximo: 1000)
     - `installment_id`: Filtrar por parcela específica (opcional)
+    - `cursor`: Ativa a paginação por cursor (`cursor=` na primeira página, depois o `next_cursor` recebido)
     """
     query = db.query(InstallmentPayment).filter(
         InstallmentPayment.company_id == current_user.company_id
@@ -334,6 +496,13 @@ def list_all_payments(
     if installment_id:
         query = query.filter(InstallmentPayment.installment_id == installment_id)
 
+    if cursor is not None:
+        payments, next_cursor = keyset_paginate(
+            query, [InstallmentPayment.paid_at, InstallmentPayment.id], cursor, limit, descending=True
+        )
+        payments_data = [InstallmentPaymentOut.model_validate(p).model_dump() for p in payments]
+        return paginate_cursor(payments_data, limit, next_cursor, cursor)
+
     query = query.order_by(InstallmentPayment.paid_at.desc())
 
     total = query.count()
@@ -3,17 +3,17 @@ from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_
 from typing import List, Optional
 from datetime import datetime, date
-from decimal import Decimal, ROUND_HALF_UP
 
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_role
 from app.core.messages import Messages
+from app.core.money import balance_from_cents, to_cents
 from app.models.user import User
 from app.models.installment import Installment, InstallmentStatus
 from app.models.installment_payment import InstallmentPayment, InstallmentPaymentStatus
 from app.models.customer import Customer
 from app.schemas.installment import InstallmentOut
-from app.schemas.pagination import paginate
+from app.schemas.pagination import paginate, fetch_page, keyset_paginate, paginate_cursor
 
 router = APIRouter()
 
@@ -35,26 +35,13 @@ def _calculate_installment_balance(installment: Installment) -> tuple[float, flo
     if installment.status == InstallmentStatus.PAID:
         return float(installment.amount), 0.0
 
-    # Cálculo normal baseado em pagamentos registrados
-    total_paid = sum(
-        float(p.amount_paid) for p in installment.payments
+    # Cálculo normal baseado em pagamentos registrados (centavos inteiros)
+    paid_cents = sum(
+        to_cents(p.amount_paid) for p in installment.payments
         if p.status == InstallmentPaymentStatus.COMPLETED
     )
 
-    # CHANGE: Usar Decimal para evitar erro de arredondamento em ponto flutuante
-    amount_decimal = Decimal(str(installment.amount))
-    total_paid_decimal = Decimal(str(total_paid)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-    remaining_decimal = (amount_decimal - total_paid_decimal).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-
-    # Se o valor restante é menor que 0.01 (erro de arredondamento), considerar como 0
-    if remaining_decimal <= Decimal('0.01') and remaining_decimal >= Decimal('0'):
-        return float(total_paid_decimal), 0.0
-
-    # Se o valor restante for negativo por erro de arredondamento, ajustar
-    if remaining_decimal < 0:
-        return float(amount_decimal), 0.0
-
-    return float(total_paid_decimal), float(remaining_decimal)
+    return balance_from_cents(to_cents(installment.amount), paid_cents)
 
 
 def _enrich_installment_with_balance(installment: Installment) -> dict:
@@ -63,6 +50,7 @@ def _enrich_installment_with_balance(installment: Installment) -> dict:
     Reutilizável para manter consistência em toda API.
     """
     data = InstallmentOut.model_validate(installment).model_dump()
+    data["status"] = installment.effective_status
     total_paid, remaining = _calculate_installment_balance(installment)
     data["total_paid"] = total_paid
     data["remaining_amount"] = remaining
@@ -104,6 +92,9 @@ def filter_installments(
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         overdue: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        estimate_total: bool = False,
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -118,6 +109,9 @@ def filter_installments(
     - `start_date`: Data inicial (formato: YYYY-MM-DD)
     - `end_date`: Data final (formato: YYYY-MM-DD)
     - `overdue`: Filtrar apenas vencidas (true/false)
+    - `cursor`: Ativa a paginação por cursor (`cursor=` na primeira página, depois o `next_cursor` recebido)
+    - `with_total`: Calcular o total (padrão: true; false evita o COUNT e `has_next` vem de limit+1)
+    - `estimate_total`: Total aproximado pelas estatísticas do banco
     """
     try:
         query = db.query(Installment).options(
@@ -130,7 +124,7 @@ def filter_installments(
         if status_value:
             try:
                 status_enum = InstallmentStatus(status_value.lower())
-                query = query.filter(Installment.status == status_enum)
+                query = query.filter(Installment.has_status(status_enum))
             except ValueError:
                 # Se status inválido, apenas ignora filtro ou retorna vazio? Retornar erro 400 é correto, mas vamos proteger o crash
                 raise HTTPException(400, detail=Messages.INSTALLMENT_INVALID_STATUS)
@@ -145,27 +139,26 @@ def filter_installments(
             query = query.filter(Installment.due_date <= end_date)
 
         if overdue is True:
-            today = date.today()
-            query = query.filter(
-                Installment.status == InstallmentStatus.OVERDUE,
-                Installment.due_date < today
+            query = query.filter(Installment.is_overdue)
+
+        if cursor is not None:
+            installments, next_cursor = keyset_paginate(
+                query, [Installment.due_date, Installment.id], cursor, limit
+            )
+            return paginate_cursor(
+                [_enrich_installment_with_balance(i) for i in installments], limit, next_cursor, cursor
             )
 
         query = query.order_by(Installment.due_date.asc())
 
-        total = query.count()
-
-        query = query.offset(skip)
+        installments, total, has_next = fetch_page(query, skip, limit, with_total, estimate_total)
 
         if limit is None:
-            installments = query.all()
-            limit = total if total > 0 else 1
-        else:
-            installments = query.limit(limit).all()
+            limit = total if total else 1
 
         installments_data = [_enrich_installment_with_balance(i) for i in installments]
 
-        return paginate(installments_data, total, skip, limit)
+        return paginate(installments_data, total, skip, limit, has_next)
     except HTTPException:
         raise
     except Exception as e:
@@ -187,16 +180,13 @@ def list_overdue_installments(
     - `skip`: Pular N registros (padrão: 0)
     - `limit`: Quantidade de registros (opcional, se não informado retorna todos)
     """
-    today = date.today()
-
     try:
         query = (
             db.query(Installment)
             .options(joinedload(Installment.payments))
             .filter(
                 Installment.company_id == current_user.company_id,
-                Installment.status == InstallmentStatus.OVERDUE,
-                Installment.due_date < today,
+                Installment.is_overdue,
             )
             .order_by(Installment.due_date.asc())
         )
@@ -226,6 +216,9 @@ def list_installments(
         customer_id: Optional[int] = None,
         status_filter: Optional[str] = None,
         search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        estimate_total: bool = False,
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -238,6 +231,9 @@ def list_installments(
     - `customer_id`: Filtrar por cliente (opcional)
     - `status_filter`: Filtrar por status (opcional)
     - `search`: Buscar por nome do cliente ou email (opcional)
+    - `cursor`: Ativa a paginação por cursor (`cursor=` na primeira página, depois o `next_cursor` recebido)
+    - `with_total`: Calcular o total (padrão: true; false evita o COUNT e `has_next` vem de limit+1)
+    - `estimate_total`: Total aproximado pelas estatísticas do banco
     """
     try:
         query = db.query(Installment).options(
@@ -253,7 +249,7 @@ def list_installments(
         if status_filter:
             try:
                 status_enum = InstallmentStatus(status_filter.lower())
-                query = query.filter(Installment.status == status_enum)
+                query = query.filter(Installment.has_status(status_enum))
             except ValueError:
                 raise HTTPException(400, detail=Messages.INSTALLMENT_INVALID_STATUS)
 
@@ -267,21 +263,24 @@ def list_installments(
                 )
             )
 
+        if cursor is not None:
+            installments, next_cursor = keyset_paginate(
+                query, [Installment.due_date, Installment.id], cursor, limit
+            )
+            return paginate_cursor(
+                [_enrich_installment_with_balance(i) for i in installments], limit, next_cursor, cursor
+            )
+
         query = query.order_by(Installment.due_date.asc())
 
-        total = query.count()
-
-        query = query.offset(skip)
+        installments, total, has_next = fetch_page(query, skip, limit, with_total, estimate_total)
 
         if limit is None:
-            installments = query.all()
-            limit = total if total > 0 else 1
-        else:
-            installments = query.limit(limit).all()
+            limit = total if total else 1
 
         installments_data = [_enrich_installment_with_balance(i) for i in installments]
 
-        return paginate(installments_data, total, skip, limit)
+        return paginate(installments_data, total, skip, limit, has_next)
     except HTTPException:
         raise
     except Exception as e:
@@ -388,7 +387,7 @@ def list_overdue_installments_compat(
     """
     query = db.query(Installment).filter(
         Installment.company_id == current_user.company_id,
-        Installment.status == InstallmentStatus.OVERDUE
+        Installment.is_overdue
     ).order_by(Installment.due_date.asc())
 
     total = query.count()
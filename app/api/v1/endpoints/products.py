@@ -10,7 +10,7 @@ from app.models.user import User
 from app.models.product import Product
 from app.models.company import Company
 from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse, CategoryInProduct
-from app.schemas.pagination import PaginatedResponse, paginate
+from app.schemas.pagination import PaginatedResponse, paginate, keyset_paginate, paginate_cursor
 from app.core.storage_local import save_company_file
 from app.core.datetime_utils import get_now_fortaleza_naive
 
@@ -315,12 +315,21 @@ def get_products_on_sale(
     return paginate(products_data, total, skip, limit)
 
 
+def _product_with_category(product: Product) -> dict:
+    product_dict = ProductResponse.model_validate(product).model_dump()
+    # Adicionar informações completas da categoria se existir
+    if product.category:
+        product_dict["category"] = CategoryInProduct.model_validate(product.category).model_dump()
+    return product_dict
+
+
 @router.get("/", summary="Listar produtos da empresa")
 def list_products(
         skip: int = 0,
         limit: Optional[int] = None,
         active_only: bool = True,  # Alterado para True - padrão é mostrar apenas ativos
         show_inactive: bool = False,
+        cursor: Optional[str] = None,
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -336,8 +345,10 @@ def list_products(
     - `show_inactive`: Se True, retorna apenas produtos inativos (padrão: False)
     - `skip`: Pular N registros (padrão: 0)
     - `limit`: Quantidade de registros (opcional, se não informado retorna todos)
+    - `cursor`: Ativa a paginação por cursor (`cursor=` na primeira página, depois o `next_cursor` recebido)
 
     **Resposta:** Lista de produtos com marca e imagem
+    (no modo cursor, resposta paginada com `next_cursor`)
 
     **Nota:** Para buscar produtos durante vendas, use /search
     """
@@ -352,6 +363,13 @@ def list_products(
         query = query.filter(Product.is_active == True)
     # Se nenhum dos dois, mostra todos (ativos e inativos)
 
+    if cursor is not None:
+        limit = min(limit, 1000) if limit else None
+        products, next_cursor = keyset_paginate(query, [Product.id], cursor, limit)
+        return paginate_cursor(
+            [_product_with_category(product) for product in products], limit, next_cursor, cursor
+        )
+
     total = query.count()
 
     if limit is None:
@@ -362,15 +380,7 @@ def list_products(
             limit = 1000
         products = query.offset(skip).limit(limit).all()
 
-    products_data = []
-    for product in products:
-        product_dict = ProductResponse.model_validate(product).model_dump()
-        # Adicionar informações completas da categoria se existir
-        if product.category:
-            product_dict["category"] = CategoryInProduct.model_validate(product.category).model_dump()
-        products_data.append(product_dict)
-
-    return products_data
+    return [_product_with_category(product) for product in products]
 
 
 @router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED, summary="Criar novo produto")
@@ -2,20 +2,27 @@
 Endpoint de Importação em Massa de Produtos
 Permite importar centenas de produtos via arquivo CSV
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, BackgroundTasks, Query
+from sqlalchemy.orm import Session, sessionmaker
 from typing import List, Dict, Any
 import csv
 import io
 import os
-from datetime import datetime
 
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_role
 from app.models.user import User
-from app.models.product import Product
 from app.models.category import Category
-from app.api.v1.endpoints.products import generate_sku
+from app.models.import_job import ImportJob, ImportJobStatus
+from app.services.product_import_service import (
+    missing_header_fields,
+    load_category_map,
+    build_product_from_row,
+    spool_upload,
+    read_spooled_header,
+    run_import_job,
+    job_to_dict,
+)
 
 from pydantic import BaseModel
 
@@ -28,47 +35,6 @@ class ImportTemplateResponse(BaseModel):
     instrucoes: Dict[str, Any]
 
 
-def parse_bool(value: str) -> bool:
-    """Converte string para boolean"""
-    if not value or value.strip() == '':
-        return False
-    return value.lower() in ('true', 'sim', 'yes', '1', 't', 's', 'y')
-
-
-def parse_float(value: str, field_name: str, line_number: int) -> float:
-    """Converte string para float com validação"""
-    if not value or value.strip() == '':
-        raise ValueError(f"Linha {line_number}: Campo '{field_name}' é obrigatório")
-    
-    try:
-        # Aceita tanto vírgula quanto ponto como separador decimal
-        value_clean = value.replace(',', '.')
-        result = float(value_clean)
-        if result < 0:
-            raise ValueError(f"Linha {line_number}: '{field_name}' não pode ser negativo")
-        return result
-    except ValueError as e:
-        if "could not convert" in str(e):
-            raise ValueError(f"Linha {line_number}: '{field_name}' deve ser um número válido")
-        raise
-
-
-def parse_int(value: str, field_name: str, line_number: int, default: int = 0) -> int:
-    """Converte string para int com validação"""
-    if not value or value.strip() == '':
-        return default
-    
-    try:
-        result = int(value)
-        if result < 0:
-            raise ValueError(f"Linha {line_number}: '{field_name}' não pode ser negativo")
-        return result
-    except ValueError as e:
-        if "invalid literal" in str(e):
-            raise ValueError(f"Linha {line_number}: '{field_name}' deve ser um número inteiro válido")
-        raise
-
-
 @router.post("/import", summary="Importar produtos em massa via CSV")
 async def import_products(
     file: UploadFile = File(...),
@@ -117,15 +83,13 @@ async def import_products(
     csv_reader = csv.DictReader(csv_file)
     
     # Validar cabeçalho
-    required_fields = {'nome', 'marca', 'categoria', 'preco_custo', 'preco_venda'}
     if not csv_reader.fieldnames:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Arquivo CSV vazio ou sem cabeçalho"
         )
     
-    header_fields = set(field.lower().strip() for field in csv_reader.fieldnames)
-    missing_fields = required_fields - header_fields
+    missing_fields = missing_header_fields(csv_reader.fieldnames)
     
     if missing_fields:
         raise HTTPException(
@@ -134,11 +98,7 @@ async def import_products(
         )
     
     # Buscar todas as categorias da empresa uma vez (otimização)
-    categories = db.query(Category).filter(
-        Category.company_id == current_user.company_id,
-        Category.is_active == True
-    ).all()
-    category_map = {cat.name.lower().strip(): cat.id for cat in categories}
+    categories, category_map = load_category_map(db, current_user.company_id)
     
     # Processar linhas
     results = {
@@ -157,80 +117,16 @@ async def import_products(
         line_number += 1
         
         try:
-            # Normalizar chaves do dicionário (lowercase e strip)
-            row_normalized = {k.lower().strip(): v.strip() if v else '' for k, v in row.items()}
-            
-            # Validar campos obrigatórios
-            if not row_normalized.get('nome'):
-                raise ValueError(f"Linha {line_number}: Campo 'nome' é obrigatório")
-            
-            if not row_normalized.get('marca'):
-                raise ValueError(f"Linha {line_number}: Campo 'marca' é obrigatório")
-            
-            if not row_normalized.get('categoria'):
-                raise ValueError(f"Linha {line_number}: Campo 'categoria' é obrigatório")
-            
-            # Validar categoria existe
-            category_name = row_normalized['categoria'].lower().strip()
-            category_id = category_map.get(category_name)
-            
-            if not category_id:
-                available_categories = ', '.join(sorted(set(cat.name for cat in categories)))
-                raise ValueError(
-                    f"Linha {line_number}: Categoria '{row_normalized['categoria']}' não encontrada. "
-                    f"Categorias disponíveis: {available_categories}"
-                )
-            
-            # Parse de valores
-            preco_custo = parse_float(row_normalized.get('preco_custo', ''), 'preco_custo', line_number)
-            preco_venda = parse_float(row_normalized.get('preco_venda', ''), 'preco_venda', line_number)
-            estoque = parse_int(row_normalized.get('estoque', '0'), 'estoque', line_number, default=0)
-            estoque_minimo = parse_int(row_normalized.get('estoque_minimo', '0'), 'estoque_minimo', line_number, default=0)
-            ativo = parse_bool(row_normalized.get('ativo', 'false'))
-            em_promocao = parse_bool(row_normalized.get('em_promocao', 'false'))
-            
-            # Validar preço promocional se em promoção
-            preco_promocional = None
-            if em_promocao:
-                preco_promo_str = row_normalized.get('preco_promocional', '')
-                if not preco_promo_str:
-                    raise ValueError(f"Linha {line_number}: 'preco_promocional' é obrigatório quando 'em_promocao' é true")
-                preco_promocional = parse_float(preco_promo_str, 'preco_promocional', line_number)
-            
-            # Gerar SKU se não fornecido
-            sku = row_normalized.get('sku', '').strip()
-            if not sku:
-                sku = generate_sku(
-                    db=db,
-                    company_id=current_user.company_id,
-                    product_name=row_normalized['nome'],
-                    category_id=category_id
-                )
-            
-            # Criar produto
-            product = Product(
-                name=row_normalized['nome'],
-                brand=row_normalized['marca'],
-                description=row_normalized.get('descricao', ''),
-                category_id=category_id,
-                cost_price=preco_custo,
-                sale_price=preco_venda,
-                stock_quantity=estoque,
-                min_stock=estoque_minimo,
-                sku=sku,
-                barcode=row_normalized.get('codigo_barras', ''),
-                is_active=ativo,
-                is_on_sale=em_promocao,
-                promotional_price=preco_promocional,
-                company_id=current_user.company_id
+            product = build_product_from_row(
+                db, row, line_number, current_user.company_id, categories, category_map
             )
             
             db.add(product)
             results["sucessos"] += 1
             results["detalhes"]["criados"].append({
                 "linha": line_number,
-                "nome": row_normalized['nome'],
-                "sku": sku
+                "nome": product.name,
+                "sku": product.sku
             })
             
         except ValueError as e:
@@ -262,6 +158,135 @@ async def import_products(
     return results
 
 
+@router.post("/import/jobs", status_code=status.HTTP_202_ACCEPTED, summary="Importar produtos via CSV em background")
+async def create_import_job(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    current_user: User = Depends(require_role("admin", "gerente")),
+    db: Session = Depends(get_db)
+):
+    """
+    **Importar Produtos em Background (Arquivos Grandes)**
+    
+    O arquivo é salvo em disco e processado em lotes por um worker em background.
+    A resposta é imediata e traz o `job_id`; acompanhe o progresso (linhas processadas,
+    erros e vazão) em `GET /products-import/import/jobs/{job_id}`.
+    
+    O resultado final tem o mesmo formato da importação síncrona e fica disponível
+    após a conclusão.
+    
+    **Requer:** Admin ou Gerente
+    """
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Apenas arquivos CSV são permitidos"
+        )
+    
+    try:
+        spooled = await spool_upload(file, current_user.company_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    # Validar cabeçalho antes de aceitar o job
+    try:
+        fieldnames = read_spooled_header(spooled["path"], spooled["encoding"])
+        error_detail = None
+        if not fieldnames:
+            error_detail = "Arquivo CSV vazio ou sem cabeçalho"
+        else:
+            missing_fields = missing_header_fields(fieldnames)
+            if missing_fields:
+                error_detail = f"Campos obrigatórios faltando no CSV: {', '.join(missing_fields)}"
+    except Exception:
+        error_detail = "Não foi possível ler o arquivo CSV"
+    
+    if error_detail:
+        os.remove(spooled["path"])
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error_detail
+        )
+    
+    job = ImportJob(
+        company_id=current_user.company_id,
+        user_id=current_user.id,
+        filename=file.filename,
+        file_path=spooled["path"],
+        encoding=spooled["encoding"],
+        estimated_rows=spooled["estimated_rows"],
+        status=ImportJobStatus.PENDING
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    
+    # O worker usa sua própria sessão, ligada ao mesmo engine da requisição
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+    background_tasks.add_task(run_import_job, job.id, session_factory)
+    
+    return {
+        "job_id": job.id,
+        "status": job.status.value,
+        "estimated_rows": job.estimated_rows,
+        "status_url": f"/api/v1/products-import/import/jobs/{job.id}"
+    }
+
+
+@router.get("/import/jobs", summary="Listar jobs de importação da empresa")
+def list_import_jobs(
+    skip: int = Query(0, ge=0, description="Pular N registros"),
+    limit: int = Query(20, ge=1, le=100, description="Quantidade de registros (máximo 100)"),
+    current_user: User = Depends(require_role("admin", "gerente")),
+    db: Session = Depends(get_db)
+):
+    """
+    Lista os jobs de importação da empresa (mais recentes primeiro), sem o resultado detalhado.
+    """
+    jobs = db.query(ImportJob).filter(
+        ImportJob.company_id == current_user.company_id
+    ).order_by(ImportJob.id.desc()).offset(skip).limit(limit).all()
+    
+    jobs_data = []
+    for job in jobs:
+        job_dict = job_to_dict(job)
+        job_dict.pop("result")
+        job_dict.pop("errors")
+        jobs_data.append(job_dict)
+    
+    return jobs_data
+
+
+@router.get("/import/jobs/{job_id}", summary="Status e resultado de um job de importação")
+def get_import_job(
+    job_id: int,
+    current_user: User = Depends(require_role("admin", "gerente")),
+    db: Session = Depends(get_db)
+):
+    """
+    **Progresso do Job de Importação**
+    
+    Retorna status (`pending`, `running`, `completed`, `failed`), linhas processadas,
+    sucessos, erros até o momento, percentual estimado e vazão (linhas/segundo).
+    Quando concluído, `result` traz o mesmo conteúdo da importação síncrona.
+    """
+    job = db.query(ImportJob).filter(
+        ImportJob.id == job_id,
+        ImportJob.company_id == current_user.company_id
+    ).first()
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job de importação não encontrado"
+        )
+    
+    return job_to_dict(job)
+
+
 from .template_helper import generate_default_template
 
 @router.get("/import/template", response_model=ImportTemplateResponse, summary="Download template CSV para importação")
@@ -0,0 +1,151 @@
+"""
+Endpoints do Profiler de Requisições (v1)
+Relatórios de perfil, regras de amostragem e diagnóstico de memória - apenas Super Admin
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from app.core.deps import require_role
+from app.core.memory import (
+    GROUP_BY,
+    memory_status,
+    route_stats,
+    snapshot_diff,
+    start_tracing,
+    stop_tracing,
+    take_baseline,
+)
+from app.core.profiler import add_rule, active_rules, list_reports, read_report, remove_rule
+from app.models.user import User
+
+router = APIRouter()
+
+
+class ProfilingRuleCreate(BaseModel):
+    path_prefix: str = Field(..., min_length=1, description="Prefixo do caminho, ex: /api/v1/reports/sales-summary")
+    company_id: Optional[int] = Field(None, description="Empresa a perfilar (vazio = todas)")
+    sample_rate: float = Field(1.0, gt=0, le=1, description="Fração das requisições perfiladas")
+    ttl_minutes: int = Field(60, ge=1, le=24 * 60, description="Validade da regra")
+
+
+@router.get("/reports", response_model=List[dict], summary="Listar relatórios de perfil")
+def get_profile_reports(
+    current_user: User = Depends(require_role("super_admin"))
+):
+    """
+    Relatórios gravados, do mais recente ao mais antigo.
+
+    Para perfilar uma requisição, envie o header `X-Profile: 1` com o token de um
+    Super Admin; o id do relatório volta no header `X-Profile-Id`.
+    """
+    return list_reports()
+
+
+@router.get("/reports/{report_id}", response_class=PlainTextResponse, summary="Árvore de chamadas do relatório")
+def get_profile_report(
+    report_id: str,
+    current_user: User = Depends(require_role("super_admin"))
+):
+    content = read_report(report_id)
+    if content is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Relatório não encontrado")
+    return content
+
+
+@router.get("/rules", response_model=List[dict], summary="Listar regras de amostragem ativas")
+def get_profiling_rules(
+    current_user: User = Depends(require_role("super_admin"))
+):
+    return active_rules()
+
+
+@router.post("/rules", response_model=dict, status_code=status.HTTP_201_CREATED,
+             summary="Criar regra de amostragem por rota/empresa")
+def create_profiling_rule(
+    rule_data: ProfilingRuleCreate,
+    current_user: User = Depends(require_role("super_admin"))
+):
+    """
+    Perfila as requisições cujo caminho começa com `path_prefix` (e da empresa
+    `company_id`, se informada) na fração `sample_rate`, até expirar.
+    """
+    return add_rule(rule_data.path_prefix, rule_data.company_id, rule_data.sample_rate, rule_data.ttl_minutes)
+
+
+@router.delete("/rules/{rule_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Remover regra de amostragem")
+def delete_profiling_rule(
+    rule_id: str,
+    current_user: User = Depends(require_role("super_admin"))
+):
+    if not remove_rule(rule_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Regra não encontrada")
+
+
+# ============================================
+# MEMÓRIA (tracemalloc) - valores do worker que atendeu a requisição
+# ============================================
+
+@router.get("/memory", response_model=dict, summary="Estado do diagnóstico de memória")
+def get_memory_status(
+    current_user: User = Depends(require_role("super_admin"))
+):
+    return memory_status()
+
+
+@router.post("/memory/start", response_model=dict, summary="Ligar o tracemalloc")
+def start_memory_tracing(
+    frames: Optional[int] = Query(None, ge=1, le=50, description="Frames guardados por alocação"),
+    current_user: User = Depends(require_role("super_admin"))
+):
+    """
+    Liga o tracemalloc neste worker. As alocações ficam mais lentas enquanto
+    estiver ligado: desligue com `/memory/stop` ao terminar.
+    """
+    start_tracing(frames)
+    return memory_status()
+
+
+@router.post("/memory/stop", response_model=dict, summary="Desligar o tracemalloc")
+def stop_memory_tracing(
+    current_user: User = Depends(require_role("super_admin"))
+):
+    stop_tracing()
+    return memory_status()
+
+
+@router.post("/memory/snapshot", response_model=dict, summary="Gravar snapshot de referência")
+def take_memory_snapshot(
+    current_user: User = Depends(require_role("super_admin"))
+):
+    """Snapshot usado como base pelo `/memory/diff`"""
+    if not memory_status()["tracing"]:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="tracemalloc desligado")
+    return take_baseline()
+
+
+@router.get("/memory/diff", response_model=dict, summary="Diferença de memória desde o snapshot")
+def get_memory_diff(
+    limit: int = Query(25, ge=1, le=200),
+    group_by: str = Query("lineno", description="lineno, filename ou traceback"),
+    current_user: User = Depends(require_role("super_admin"))
+):
+    """
+    Locais que mais cresceram desde o snapshot de referência. Sem referência,
+    lista os maiores volumes alocados no momento.
+    """
+    if group_by not in GROUP_BY:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="group_by inválido")
+    if not memory_status()["tracing"]:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="tracemalloc desligado")
+    return snapshot_diff(limit, group_by)
+
+
+@router.get("/memory/routes", response_model=List[dict], summary="Pico de alocação por rota")
+def get_memory_routes(
+    current_user: User = Depends(require_role("super_admin"))
+):
+    """Requisições amostradas (MEMORY_SAMPLE_RATE) desde que o worker subiu"""
+    return route_stats()
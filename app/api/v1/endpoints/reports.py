@@ -3,7 +3,7 @@ Endpoints de Relatórios (v1)
 Vendas, lucros, produtos, cancelamentos, vencidos, baixo estoque
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from typing import Optional
 from datetime import datetime, date, timedelta
 from sqlalchemy import func
@@ -14,9 +14,13 @@ from app.core.deps import get_current_user, require_role
 from app.models.user import User
 from app.models.sale import Sale, SaleItem, SaleStatus
 from app.models.product import Product
-from app.models.installment import Installment, InstallmentStatus
+from app.models.product_daily_sales import ProductDailySales
+from app.models.installment import Installment
 from app.models.installment_payment import InstallmentPayment, InstallmentPaymentStatus
 from app.services.reports_service import ReportsService
+from app.services.sales_rollup_service import rebuild_rollup, rebuild_customer_stats
+from app.services.receivables_aging_service import get_aging_snapshot, serialize_snapshot
+from app.services.cash_flow_service import get_cash_flow_forecast
 from app.api.v1.endpoints.installments import _calculate_installment_balance
 from app.schemas.pagination import paginate
 
@@ -229,9 +233,17 @@ def report_profit(
     ).scalar() or 0.0
 
     # 2. Total Cost
-    # Junta Sale -> SaleItem e soma (unit_cost_price * quantity)
-    # Usa COALESCE(unit_cost_price, product.cost_price, 0) para fallback seguro
-    total_cost = db.query(
+    # Soma o custo gravado na venda (Sale.total_cost)
+    total_cost = db.query(func.sum(Sale.total_cost)).filter(
+        Sale.company_id == current_user.company_id,
+        Sale.created_at >= start_date,
+        Sale.created_at < end_date,
+        Sale.status != SaleStatus.CANCELLED
+    ).scalar() or 0.0
+
+    # Vendas sem snapshot (anteriores à migração): Sale -> SaleItem com
+    # COALESCE(unit_cost_price, product.cost_price, 0) para fallback seguro
+    total_cost += db.query(
         func.sum(
             func.coalesce(SaleItem.unit_cost_price, Product.cost_price, 0.0) * SaleItem.quantity
         )
@@ -241,7 +253,8 @@ def report_profit(
         Sale.company_id == current_user.company_id,
         Sale.created_at >= start_date,
         Sale.created_at < end_date,
-        Sale.status != SaleStatus.CANCELLED
+        Sale.status != SaleStatus.CANCELLED,
+        Sale.total_cost.is_(None)
     ).scalar() or 0.0
 
     # 3. Produtos sem custo (Warning)
@@ -303,20 +316,22 @@ def report_sold_products(
             # Em vez de erro, retorna vazio para não quebrar o frontend
             return {"period": period, "products": []}
 
+        # Lido do consolidado diário (produto x dia), não dos itens de cada venda
         items = db.query(
-            SaleItem.product_id,
+            ProductDailySales.product_id,
             Product.name,
-            func.sum(SaleItem.quantity).label("quantity"),
-            func.sum(SaleItem.total_price).label("revenue")
-        ).join(Sale, Sale.id == SaleItem.sale_id).join(
-            Product, Product.id == SaleItem.product_id
+            func.sum(ProductDailySales.quantity).label("quantity"),
+            func.sum(ProductDailySales.revenue).label("revenue")
+        ).join(
+            Product, Product.id == ProductDailySales.product_id
         ).filter(
-            Sale.company_id == current_user.company_id,
-            Sale.created_at >= start_date,
-            Sale.created_at < end_date,
-            Sale.status != SaleStatus.CANCELLED
-        ).group_by(SaleItem.product_id, Product.name).order_by(
-            func.sum(SaleItem.quantity).desc()
+            ProductDailySales.company_id == current_user.company_id,
+            ProductDailySales.day >= start_date,
+            ProductDailySales.day < end_date
+        ).group_by(ProductDailySales.product_id, Product.name).having(
+            func.sum(ProductDailySales.quantity) > 0
+        ).order_by(
+            func.sum(ProductDailySales.quantity).desc(), ProductDailySales.product_id
         ).limit(limit).all()
 
         return {
@@ -336,6 +351,65 @@ def report_sold_products(
         return {"period": period, "products": []}
 
 
+@router.post("/sold-products/rebuild", summary="Recalcular consolidado de produtos vendidos")
+def rebuild_sold_products(
+    start_date: Optional[date] = Query(None, description="Data inicial (inclusiva)"),
+    end_date: Optional[date] = Query(None, description="Data final (inclusiva)"),
+    current_user: User = Depends(require_role("admin")),
+    db: Session = Depends(get_db)
+):
+    """
+    **Recalcular Consolidado Diário de Produtos**
+
+    Refaz o consolidado (produto x dia) usado pelos rankings de produtos mais vendidos
+    a partir das vendas do intervalo. Sem datas, recalcula todo o histórico da empresa.
+
+    **PERMISSÃO:** Admin
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Data inicial deve ser anterior à data final"
+        )
+
+    rows = rebuild_rollup(
+        db,
+        current_user.company_id,
+        start_date,
+        end_date + timedelta(days=1) if end_date else None
+    )
+    db.commit()
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "rows": rows
+    }
+
+
+@router.post("/customer-products/rebuild", summary="Recalcular produtos comprados por cliente")
+def rebuild_customer_products(
+    customer_id: Optional[int] = Query(None, description="Recalcular apenas um cliente"),
+    current_user: User = Depends(require_role("admin")),
+    db: Session = Depends(get_db)
+):
+    """
+    **Recalcular Produtos Comprados por Cliente**
+
+    Refaz as estatísticas cliente x produto usadas em /sales/by-customer/{id}/products
+    a partir das vendas concluídas. Sem customer_id, recalcula a empresa inteira.
+
+    **PERMISSÃO:** Admin
+    """
+    rows = rebuild_customer_stats(db, current_user.company_id, customer_id)
+    db.commit()
+
+    return {
+        "customer_id": customer_id,
+        "rows": rows
+    }
+
+
 @router.get("/canceled-sales", summary="Vendas canceladas")
 def report_canceled_sales(
     period: str = "month",
@@ -413,12 +487,9 @@ def report_overdue(
 
     **PERMISSÃO:** Admin, Gerente e Vendedor
     """
-    today = date.today()
-
     overdue = db.query(Installment).filter(
         Installment.company_id == current_user.company_id,
-        Installment.status == InstallmentStatus.OVERDUE,
-        Installment.due_date < today
+        Installment.is_overdue
     ).all()
 
     total_overdue = sum(_calculate_installment_balance(i)[1] for i in overdue)
@@ -432,6 +503,49 @@ def report_overdue(
     }
 
 
+@router.get("/receivables-aging", summary="Aging de contas a receber")
+def report_receivables_aging(
+    refresh: bool = Query(False, description="Recalcular agora em vez de usar a foto do dia"),
+    current_user: User = Depends(require_role("admin", "gerente")),
+    db: Session = Depends(get_db)
+):
+    """
+    **Aging de Contas a Receber**
+
+    Saldo em aberto das parcelas (descontados os pagamentos) por faixa:
+    `future` (a vencer), `current` (vence hoje), `days_1_30`, `days_31_60`,
+    `days_61_90` e `days_90_plus` (dias de atraso).
+
+    Lido da foto diária gerada pelo job noturno; calculado na hora se ainda
+    não existir ou com `refresh=true`.
+
+    **PERMISSÃO:** Admin e Gerente
+    """
+    snapshot = get_aging_snapshot(db, current_user.company_id, refresh=refresh)
+    return serialize_snapshot(snapshot)
+
+
+@router.get("/cash-flow-forecast", summary="Previsão de recebimentos")
+def report_cash_flow_forecast(
+    granularity: str = Query("week", pattern="^(day|week|month)$", description="Faixa: day, week ou month"),
+    periods: int = Query(12, ge=1, le=120, description="Quantidade de faixas a partir da atual"),
+    current_user: User = Depends(require_role("admin", "gerente")),
+    db: Session = Depends(get_db)
+):
+    """
+    **Previsão de Recebimentos do Crediário**
+
+    Saldo em aberto (valor - pagamentos) das parcelas pendentes/vencidas somado por
+    data de vencimento e agrupado em faixas de dia, semana (segunda a domingo) ou mês.
+    Parcelas vencidas entram na faixa atual (`overdue_amount` mostra quanto delas).
+
+    O resultado fica em cache por empresa até o próximo pagamento ou alteração de parcela.
+
+    **PERMISSÃO:** Admin e Gerente
+    """
+    return get_cash_flow_forecast(db, current_user.company_id, granularity, periods)
+
+
 @router.get("/overdue-customers", summary="Clientes com parcelas vencidas")
 def report_overdue_customers(
     current_user: User = Depends(require_role("admin", "gerente", "vendedor")),
@@ -458,13 +572,10 @@ def report_overdue_customers(
     **Exemplo:** GET /reports/overdue-customers
     """
     try:
-        today = date.today()
-        
-        # Buscar todas as parcelas com status OVERDUE
+        # Buscar todas as parcelas vencidas (status calculado pelo vencimento)
         overdue_installments = db.query(Installment).filter(
             Installment.company_id == current_user.company_id,
-            Installment.status == InstallmentStatus.OVERDUE,
-            Installment.due_date < today
+            Installment.is_overdue
         ).all()
         
         # Agrupar por cliente
@@ -640,12 +751,13 @@ def report_sales_summary(
             }
 
         # Buscar todas as vendas COMPLETED no período
-        sales = db.query(Sale).filter(
+        period_filter = (
             Sale.company_id == current_user.company_id,
             Sale.created_at >= datetime.combine(query_start, datetime.min.time()),
             Sale.created_at < datetime.combine(query_end + timedelta(days=1), datetime.min.time()),
             Sale.status == SaleStatus.COMPLETED
-        ).all()
+        )
+        sales = db.query(Sale).options(selectinload(Sale.customer)).filter(*period_filter).all()
 
         # Calcular métricas
         total_revenue = 0.0
@@ -653,23 +765,20 @@ def report_sales_summary(
         total_cost = 0.0
         sales_count = len(sales)
         sales_data = []
-        products_without_cost = set()  # Produtos sem preço de custo
 
         for sale in sales:
             # Somar receita e desconto
             total_revenue += sale.total_amount
             total_discount += sale.discount_amount
 
-            # Calcular custo total usando custo do produto
-            for item in sale.items:
-                # MELHORIA #1: Usar custo histórico
-                cost_price = item.unit_cost_price if item.unit_cost_price is not None else (item.product.cost_price or 0.0)
-                
-                # Registrar produtos sem preço de custo
-                if cost_price == 0.0:
-                    products_without_cost.add((item.product.id, item.product.name))
-                
-                total_cost += float(cost_price) * item.quantity
+            # Custo gravado na venda; vendas sem snapshot calculam pelos itens
+            if sale.total_cost is not None:
+                total_cost += float(sale.total_cost)
+            else:
+                for item in sale.items:
+                    # MELHORIA #1: Usar custo histórico
+                    cost_price = item.unit_cost_price if item.unit_cost_price is not None else (item.product.cost_price or 0.0)
+                    total_cost += float(cost_price) * item.quantity
 
             # Adicionar venda ao array
             sales_data.append({
@@ -683,6 +792,15 @@ def report_sales_summary(
         margin_percentage = (profit / total_revenue * 100) if total_revenue > 0 else 0.0
         average_ticket = (total_revenue / sales_count) if sales_count > 0 else 0.0
         
+        # Produtos sem preço de custo (consulta única, sem percorrer os itens)
+        products_without_cost = db.query(Product.id, Product.name)\
+            .join(SaleItem, SaleItem.product_id == Product.id)\
+            .join(Sale, SaleItem.sale_id == Sale.id)\
+            .filter(
+                *period_filter,
+                func.coalesce(SaleItem.unit_cost_price, Product.cost_price, 0.0) == 0.0
+            ).distinct().all()
+        
         # Preparar mensagem de aviso se houver produtos sem custo
         warning = None
         if products_without_cost:
@@ -2,27 +2,50 @@
 Endpoints de Vendas (v1)
 Suporta cash, credit e PIX com gestão automática de estoque e parcelas
 """
-from typing import List, Optional
-from datetime import date, timedelta
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func, desc
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Annotated, Callable, List, Optional
+from datetime import date, datetime, timedelta
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import and_, or_, func, desc, case, insert, select, update
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
 
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_role
+from app.core.money import from_cents, split_cents, to_cents
 from app.models.user import User
 from app.models.sale import Sale, PaymentType, SaleStatus, SaleItem
 from app.models.product import Product
 from app.models.customer import Customer
 from app.models.installment import Installment, InstallmentStatus
 from app.models.stock_movement import StockMovement, MovementType
-from app.schemas.sale import SaleCreate, SaleResponse
-from app.schemas.pagination import paginate
+from app.models.product_daily_sales import ProductDailySales
+from app.models.customer_product_stats import CustomerProductStats
+from app.schemas.sale import SaleCreate, SaleResponse, SaleBatchCreate, SaleBatchResponse
+from app.schemas.pagination import paginate, fetch_page, keyset_paginate, paginate_cursor
+from app.services.idempotency_service import IDEMPOTENCY_HEADER, run_idempotent
+from app.services.sales_rollup_service import (
+    apply_sales_to_rollup,
+    add_sales_to_customer_stats,
+    rebuild_customer_stats
+)
 from app.api.v1.endpoints.installments import _calculate_installment_balance, _enrich_installment_with_balance
 
 router = APIRouter()
 
 
+def _sale_out_options() -> list:
+    """
+    Grafo de carregamento usado na serialização via SaleOut (SaleResponse).
+    Cada relacionamento é carregado com um SELECT ... IN por página, em vez de
+    uma consulta por venda/item/parcela (N+1).
+    """
+    return [
+        selectinload(Sale.items).selectinload(SaleItem.product),
+        selectinload(Sale.customer),
+        selectinload(Sale.installments).selectinload(Installment.payments),
+        selectinload(Sale.installments).selectinload(Installment.customer),
+    ]
+
+
 def get_date_range(period: str, start_date: Optional[date] = None, end_date: Optional[date] = None):
     """Helper para obter range de datas baseado no período"""
     today = date.today()
@@ -49,225 +72,305 @@ def get_date_range(period: str, start_date: Optional[date] = None, end_date: Opt
 @router.post("/", response_model=SaleResponse, status_code=status.HTTP_201_CREATED, summary="Registrar nova venda")
 def create_sale(
     sale_data: SaleCreate,
+    response: Response = None,
+    idempotency_key: Annotated[Optional[str], Header(alias=IDEMPOTENCY_HEADER)] = None,
     current_user: User = Depends(require_role("admin", "gerente", "vendedor")),
     db: Session = Depends(get_db)
 ):
-    """Registrar Nova Venda com validação completa"""
+    """
+    Registrar Nova Venda com validação completa
+
+    Envie o header **Idempotency-Key** para que reenvios (timeout, retry do app)
+    devolvam a mesma venda sem baixar o estoque novamente.
+    """
+    return run_idempotent(
+        db,
+        current_user.company_id,
+        "POST /sales",
+        idempotency_key,
+        sale_data.model_dump(mode="json"),
+        lambda complete: _create_sale(sale_data, current_user, db, complete),
+        lambda sale: SaleResponse.model_validate(sale).model_dump(mode="json"),
+        response
+    )
+
+
+def _validate_sale_customer(customer: Optional[Customer], sale_data: SaleCreate) -> None:
+    """Cliente existe, está ativo e, no crediário, tem cadastro completo"""
+    if not customer:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Cliente não encontrado"
+        )
     
-    try:
-        # Validar cliente com lock
-        customer = db.query(Customer).filter(
-            Customer.id == sale_data.customer_id,
-            Customer.company_id == current_user.company_id
-        ).with_for_update().first()
+    if not customer.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cliente está inativo e não pode realizar compras"
+        )
+    
+    # Validar dados completos do cliente para vendas a crediário
+    if sale_data.payment_type == "credit":
+        missing_fields = []
+        if not customer.cpf:
+            missing_fields.append("CPF")
+        if not customer.phone:
+            missing_fields.append("Telefone")
+        if not customer.address:
+            missing_fields.append("Endereço")
         
-        if not customer:
+        if missing_fields:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Cliente não encontrado"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Para vendas a crediário, o cliente precisa ter: {', '.join(missing_fields)}"
+            )
+
+
+def _validate_sale_items(sale_data: SaleCreate, products: dict, available: dict):
+    """
+    Valida os itens contra os produtos bloqueados e reserva o estoque em available
+    (product_id -> quantidade disponível), que só é alterado se todos os itens forem válidos.
+
+    Returns:
+        (itens, subtotal, custo total)
+    """
+    subtotal_cents = 0
+    total_cost_cents = 0
+    sale_items = []
+    reserved = {}
+    
+    if not sale_data.items or len(sale_data.items) == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Venda deve ter pelo menos 1 item"
+        )
+    
+    for item_data in sale_data.items:
+        # Validar quantidade
+        if item_data.quantity <= 0 or item_data.quantity > 10000:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Quantidade deve estar entre 1 e 10.000 unidades"
             )
         
-        if not customer.is_active:
+        # CORREÇÃO #4: Validar preço de venda
+        if item_data.unit_price <= 0:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cliente está inativo e não pode realizar compras"
+                detail="Preço de venda deve ser maior que zero"
             )
         
-        # Validar dados completos do cliente para vendas a crediário
-        if sale_data.payment_type == "credit":
-            missing_fields = []
-            if not customer.cpf:
-                missing_fields.append("CPF")
-            if not customer.phone:
-                missing_fields.append("Telefone")
-            if not customer.address:
-                missing_fields.append("Endereço")
-            
-            if missing_fields:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Para vendas a crediário, o cliente precisa ter: {', '.join(missing_fields)}"
-                )
-        
-        # Validar e processar itens
-        subtotal = 0.0
-        sale_items = []
+        product = products.get(item_data.product_id)
         
-        if not sale_data.items or len(sale_data.items) == 0:
+        if not product:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Venda deve ter pelo menos 1 item"
+                detail=f"Produto {item_data.product_id} não encontrado"
             )
         
-        for item_data in sale_data.items:
-            # Validar quantidade
-            if item_data.quantity <= 0 or item_data.quantity > 10000:
-                raise HTTPException(
-                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                    detail="Quantidade deve estar entre 1 e 10.000 unidades"
-                )
-            
-            # CORREÇÃO #4: Validar preço de venda
-            if item_data.unit_price <= 0:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Preço de venda deve ser maior que zero"
-                )
-            
-            product = db.query(Product).filter(
-                Product.id == item_data.product_id,
-                Product.company_id == current_user.company_id
-            ).with_for_update().first()
-            
-            if not product:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Produto {item_data.product_id} não encontrado"
-                )
-            
-            if not product.is_active:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Produto {product.name} está inativo e não pode ser vendido"
-                )
-            
-            if product.stock_quantity < item_data.quantity:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Estoque insuficiente para {product.name}. Disponível: {product.stock_quantity}"
-                )
-            
-            item_total = item_data.unit_price * item_data.quantity
-            subtotal += item_total
-            
-            sale_items.append({
-                "product": product,
-                "data": item_data,
-                "total": item_total
-            })
-        
-        # Validar desconto
-        if sale_data.discount_amount < 0:
+        if not product.is_active:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Desconto não pode ser negativo"
+                detail=f"Produto {product.name} está inativo e não pode ser vendido"
             )
         
-        if sale_data.discount_amount > subtotal:
+        stock = available[product.id] - reserved.get(product.id, 0)
+        if stock < item_data.quantity:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Desconto não pode ser maior que o subtotal"
+                detail=f"Estoque insuficiente para {product.name}. Disponível: {stock}"
             )
+        reserved[product.id] = reserved.get(product.id, 0) + item_data.quantity
         
-        # Validar quantidade de parcelas
-        if sale_data.payment_type == PaymentType.CREDIT:
-            if not sale_data.installments_count or sale_data.installments_count < 1:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Crediário requer no mínimo 1 parcela"
-                )
-            if sale_data.installments_count > 60:
-                raise HTTPException(
-                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                    detail="Máximo de 60 parcelas permitidas"
-                )
-        
-        total_amount = subtotal - sale_data.discount_amount
-        
-        # CORREÇÃO #3: Validar que total não fica negativo OU ZERO
-        if total_amount <= 0:
+        item_total_cents = to_cents(item_data.unit_price) * item_data.quantity
+        subtotal_cents += item_total_cents
+        total_cost_cents += to_cents(product.cost_price) * item_data.quantity
+        
+        sale_items.append({
+            "product": product,
+            "data": item_data,
+            "total": from_cents(item_total_cents)
+        })
+    
+    for product_id, quantity in reserved.items():
+        available[product_id] -= quantity
+    
+    return sale_items, from_cents(subtotal_cents), from_cents(total_cost_cents)
+
+
+def _validate_sale_totals(sale_data: SaleCreate, subtotal: float) -> float:
+    """Valida desconto e parcelas; retorna o valor total da venda"""
+    # Validar desconto
+    if sale_data.discount_amount < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Desconto não pode ser negativo"
+        )
+    
+    if sale_data.discount_amount > subtotal:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Desconto não pode ser maior que o subtotal"
+        )
+    
+    # Validar quantidade de parcelas
+    if sale_data.payment_type == PaymentType.CREDIT:
+        if not sale_data.installments_count or sale_data.installments_count < 1:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Valor total deve ser maior que zero"
+                detail="Crediário requer no mínimo 1 parcela"
+            )
+        if sale_data.installments_count > 60:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Máximo de 60 parcelas permitidas"
             )
+    
+    total_amount = from_cents(to_cents(subtotal) - to_cents(sale_data.discount_amount))
+    
+    # CORREÇÃO #3: Validar que total não fica negativo OU ZERO
+    if total_amount <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Valor total deve ser maior que zero"
+        )
+    
+    return total_amount
+
+
+def _new_sale(sale_data: SaleCreate, customer: Customer, current_user: User,
+              subtotal: float, total_amount: float, total_cost: float) -> Sale:
+    return Sale(
+        customer_id=customer.id,
+        company_id=current_user.company_id,
+        user_id=current_user.id,
+        payment_type=sale_data.payment_type,
+        subtotal=subtotal,
+        discount_amount=sale_data.discount_amount,
+        total_amount=total_amount,
+        total_cost=total_cost,
+        total_profit=from_cents(to_cents(subtotal) - to_cents(total_cost)),
+        installments_count=sale_data.installments_count,
+        notes=sale_data.notes,
+        status=SaleStatus.COMPLETED
+    )
+
+
+def _sale_children(sale: Sale, sale_data: SaleCreate, sale_items: list, current_user: User, stock: dict) -> list:
+    """
+    Monta itens, movimentos de estoque e parcelas de uma venda já com id.
+    stock (product_id -> estoque corrente) é atualizado item a item para registrar
+    previous_stock/new_stock na auditoria; o débito no produto é feito pelo chamador.
+    """
+    rows = []
+    
+    for item_info in sale_items:
+        product = item_info["product"]
+        quantity = item_info["data"].quantity
         
-        # Criar venda
-        sale = Sale(
-            customer_id=customer.id,
-            company_id=current_user.company_id,
+        rows.append(SaleItem(
+            sale_id=sale.id,
+            product_id=product.id,
+            quantity=quantity,
+            unit_price=item_info["data"].unit_price,
+            total_price=item_info["total"],
+            unit_cost_price=product.cost_price or 0.0  # Salva o custo historico
+        ))
+        
+        # Registrar movimento de estoque para auditoria
+        previous_stock = stock[product.id]
+        stock[product.id] = previous_stock - quantity
+        rows.append(StockMovement(
+            product_id=product.id,
             user_id=current_user.id,
-            payment_type=sale_data.payment_type,
-            subtotal=subtotal,
-            discount_amount=sale_data.discount_amount,
-            total_amount=total_amount,
-            installments_count=sale_data.installments_count,
-            notes=sale_data.notes,
-            status=SaleStatus.COMPLETED
-        )
+            company_id=current_user.company_id,
+            movement_type=MovementType.SALE,
+            quantity=-quantity,
+            previous_stock=previous_stock,
+            new_stock=stock[product.id],
+            reference_type="sale",
+            reference_id=sale.id,
+            notes=f"Venda #{sale.id} - {quantity} unidades"
+        ))
+    
+    # Gerar parcelas para crediário
+    if sale_data.payment_type == PaymentType.CREDIT:
+        num_installments = sale_data.installments_count or 1
+        if num_installments < 1:
+            num_installments = 1
+        
+        # Valor de cada parcela em centavos; a última compensa o arredondamento
+        amounts = split_cents(sale.total_amount, num_installments)
+        
+        for i, amount in enumerate(amounts):
+            # MELHORIA #8: Data de vencimento personalizada
+            if sale_data.first_due_date:
+                # Se for a primeira parcela (i=0), usa a data exata
+                # Se for as seguintes, soma 30 dias * i a partir da primeira data
+                if i == 0:
+                    due_date = sale_data.first_due_date
+                else:
+                    due_date = sale_data.first_due_date + timedelta(days=30 * i)
+            else:
+                # Comportamento padrão: 30 dias a partir de hoje
+                due_date = date.today() + timedelta(days=30 * (i + 1))
+            
+            rows.append(Installment(
+                sale_id=sale.id,
+                customer_id=sale.customer_id,
+                company_id=current_user.company_id,
+                installment_number=i + 1,
+                amount=amount,
+                due_date=due_date,
+                status=InstallmentStatus.PENDING
+            ))
+    
+    return rows
+
+
+def _create_sale(sale_data: SaleCreate, current_user: User, db: Session,
+                 complete: Callable[[Sale], None]) -> Sale:
+    """Cria a venda, baixa o estoque e gera as parcelas (uma transação; complete antes do commit)"""
+    
+    try:
+        # Validar cliente com lock
+        customer = db.query(Customer).filter(
+            Customer.id == sale_data.customer_id,
+            Customer.company_id == current_user.company_id
+        ).with_for_update().first()
+        
+        _validate_sale_customer(customer, sale_data)
+        
+        # Validar e processar itens
+        products = {}
+        for item_data in sale_data.items:
+            if item_data.product_id not in products:
+                products[item_data.product_id] = db.query(Product).filter(
+                    Product.id == item_data.product_id,
+                    Product.company_id == current_user.company_id
+                ).with_for_update().first()
+        stock = {product_id: product.stock_quantity for product_id, product in products.items() if product}
+        sale_items, subtotal, total_cost = _validate_sale_items(sale_data, products, dict(stock))
+        total_amount = _validate_sale_totals(sale_data, subtotal)
         
+        # Criar venda
+        sale = _new_sale(sale_data, customer, current_user, subtotal, total_amount, total_cost)
         db.add(sale)
         db.flush()
         
+        db.add_all(_sale_children(sale, sale_data, sale_items, current_user, stock))
+        
+        # Debitar estoque
         for item_info in sale_items:
-            sale_item = SaleItem(
-                sale_id=sale.id,
-                product_id=item_info["product"].id,
-                quantity=item_info["data"].quantity,
-                unit_price=item_info["data"].unit_price,
-                total_price=item_info["total"],
-                unit_cost_price=item_info["product"].cost_price or 0.0  # Salva o custo historico
-            )
-            db.add(sale_item)
-            
-            # Debitar estoque
-            previous_stock = item_info["product"].stock_quantity
-            item_info["product"].stock_quantity -= item_info["data"].quantity
-            new_stock = item_info["product"].stock_quantity
-            
-            # Registrar movimento de estoque para auditoria
-            stock_movement = StockMovement(
-                product_id=item_info["product"].id,
-                user_id=current_user.id,
-                company_id=current_user.company_id,
-                movement_type=MovementType.SALE,
-                quantity=-item_info["data"].quantity,
-                previous_stock=previous_stock,
-                new_stock=new_stock,
-                reference_type="sale",
-                reference_id=sale.id,
-                notes=f"Venda #{sale.id} - {item_info['data'].quantity} unidades"
-            )
-            db.add(stock_movement)
+            item_info["product"].stock_quantity = stock[item_info["product"].id]
         
-        # Gerar parcelas para crediário
-        if sale_data.payment_type == PaymentType.CREDIT:
-            num_installments = sale_data.installments_count or 1
-            if num_installments < 1:
-                num_installments = 1
-            
-            # Calcular valor de cada parcela
-            base_amount = total_amount / num_installments
-            
-            for i in range(num_installments):
-                # Ajustar última parcela para compensar arredondamentos
-                if i == num_installments - 1:
-                    amount = total_amount - (base_amount * (num_installments - 1))
-                else:
-                    amount = base_amount
-                
-                # MELHORIA #8: Data de vencimento personalizada
-                if sale_data.first_due_date:
-                    # Se for a primeira parcela (i=0), usa a data exata
-                    # Se for as seguintes, soma 30 dias * i a partir da primeira data
-                    if i == 0:
-                        due_date = sale_data.first_due_date
-                    else:
-                        due_date = sale_data.first_due_date + timedelta(days=30 * i)
-                else:
-                    # Comportamento padrão: 30 dias a partir de hoje
-                    due_date = date.today() + timedelta(days=30 * (i + 1))
-                
-                installment = Installment(
-                    sale_id=sale.id,
-                    customer_id=customer.id,
-                    company_id=current_user.company_id,
-                    installment_number=i + 1,
-                    amount=amount,
-                    due_date=due_date,
-                    status=InstallmentStatus.PENDING
-                )
-                db.add(installment)
+        db.flush()
+        apply_sales_to_rollup(db, [sale.id])
+        add_sales_to_customer_stats(db, [sale.id])
         
+        db.flush()
+        db.refresh(sale)
+        complete(sale)
         db.commit()
         db.refresh(sale)
         
@@ -284,6 +387,136 @@ def create_sale(
         )
 
 
+@router.post("/batch", response_model=SaleBatchResponse, summary="Registrar vendas em lote (sincronização offline)")
+def create_sales_batch(
+    batch: SaleBatchCreate,
+    response: Response = None,
+    idempotency_key: Annotated[Optional[str], Header(alias=IDEMPOTENCY_HEADER)] = None,
+    current_user: User = Depends(require_role("admin", "gerente", "vendedor")),
+    db: Session = Depends(get_db)
+):
+    """
+    Registrar Vendas em Lote
+
+    Recebe as vendas acumuladas por um PDV offline e as processa em uma transação:
+    clientes e produtos envolvidos são bloqueados uma única vez, cada venda é validada
+    na ordem enviada contra o estoque restante das anteriores e o débito de estoque é
+    aplicado de forma agregada por produto.
+
+    **Falhas parciais:**
+    - Por padrão, vendas inválidas voltam como `rejected` (com o motivo) e as demais são gravadas
+    - Com `all_or_nothing=true`, qualquer rejeição impede a gravação do lote inteiro
+      e as vendas válidas voltam como `skipped`
+    - Erro inesperado ao gravar desfaz o lote inteiro (500)
+
+    Envie o header **Idempotency-Key** para reenviar o mesmo lote com segurança.
+    """
+    return run_idempotent(
+        db,
+        current_user.company_id,
+        "POST /sales/batch",
+        idempotency_key,
+        batch.model_dump(mode="json"),
+        lambda complete: _create_sales_batch(batch, current_user, db, complete),
+        lambda result: SaleBatchResponse.model_validate(result).model_dump(mode="json"),
+        response
+    )
+
+
+def _create_sales_batch(batch: SaleBatchCreate, current_user: User, db: Session,
+                        complete: Callable[[dict], None]) -> dict:
+    """Valida todas as vendas do lote e grava as aceitas com um único commit"""
+    
+    try:
+        customer_ids = {entry.customer_id for entry in batch.sales}
+        customers = db.query(Customer).filter(
+            Customer.id.in_(customer_ids),
+            Customer.company_id == current_user.company_id
+        ).order_by(Customer.id).with_for_update().all()
+        customers = {customer.id: customer for customer in customers}
+        
+        # Todos os produtos do lote em uma consulta; a ordem por id mantém a
+        # mesma sequência de locks entre lotes concorrentes
+        product_ids = {item.product_id for entry in batch.sales for item in entry.items}
+        products = db.query(Product).filter(
+            Product.id.in_(product_ids),
+            Product.company_id == current_user.company_id
+        ).order_by(Product.id).with_for_update().all()
+        products = {product.id: product for product in products}
+        stock = {product_id: product.stock_quantity for product_id, product in products.items()}
+        available = dict(stock)
+        
+        results = []
+        accepted = []
+        
+        for index, entry in enumerate(batch.sales):
+            result = {"index": index, "client_reference": entry.client_reference}
+            try:
+                customer = customers.get(entry.customer_id)
+                _validate_sale_customer(customer, entry)
+                sale_items, subtotal, total_cost = _validate_sale_items(entry, products, available)
+                total_amount = _validate_sale_totals(entry, subtotal)
+            except HTTPException as e:
+                result.update(status="rejected", error=e.detail)
+            else:
+                sale = _new_sale(entry, customer, current_user, subtotal, total_amount, total_cost)
+                accepted.append((result, entry, sale, sale_items))
+                result.update(status="created", total_amount=total_amount)
+            results.append(result)
+        
+        rejected = len(results) - len(accepted)
+        
+        if rejected and batch.all_or_nothing:
+            for result, *_ in accepted:
+                result.update(status="skipped", total_amount=None)
+            accepted = []
+        
+        if accepted:
+            # Um flush para todas as vendas (ids) e outro para itens, movimentos e parcelas
+            db.add_all([sale for _, _, sale, _ in accepted])
+            db.flush()
+            
+            children = []
+            for result, entry, sale, sale_items in accepted:
+                children.extend(_sale_children(sale, entry, sale_items, current_user, stock))
+                result["sale_id"] = sale.id
+            db.add_all(children)
+            
+            # Débito agregado: um UPDATE por produto com o total vendido no lote
+            for product_id, quantity in stock.items():
+                if products[product_id].stock_quantity != quantity:
+                    products[product_id].stock_quantity = quantity
+            
+            db.flush()
+            sale_ids = [sale.id for _, _, sale, _ in accepted]
+            apply_sales_to_rollup(db, sale_ids)
+            add_sales_to_customer_stats(db, sale_ids)
+        
+        outcome = {
+            "created": len(accepted),
+            "rejected": rejected,
+            "results": results
+        }
+        
+        if accepted:
+            complete(outcome)
+            db.commit()
+        else:
+            db.rollback()
+        
+        return outcome
+        
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao processar lote de vendas: {str(e)}"
+        )
+
+
 @router.get("/products/top-sellers", summary="Produtos mais vendidos")
 def get_top_selling_products(
     customer_id: Optional[int] = Query(None, description="Filtrar por cliente (opcional)"),
@@ -303,35 +536,45 @@ def get_top_selling_products(
         if not date_start or not date_end:
             return []
         
-        from sqlalchemy import func, desc
-        
-        # Query para top sellers
-        query = db.query(
-            Product.id,
-            Product.name,
-            func.count(Sale.id).label("purchase_count"),
-            func.sum(SaleItem.quantity).label("quantity_sold"),
-            func.sum(SaleItem.total_price).label("revenue")
-        ).join(SaleItem, Product.id == SaleItem.product_id)\
-         .join(Sale, SaleItem.sale_id == Sale.id)\
-         .filter(
-            Product.company_id == current_user.company_id,
-            Sale.company_id == current_user.company_id,
-            Sale.status == SaleStatus.COMPLETED,
-            Sale.created_at >= datetime.combine(date_start, datetime.min.time()),
-            Sale.created_at < datetime.combine(date_end, datetime.min.time())
-         )
-        
         if customer_id:
-            query = query.filter(Sale.customer_id == customer_id)
-        
-        query = query.group_by(Product.id, Product.name)
+            # O consolidado diário não separa por cliente: agrega os itens das vendas
+            query = db.query(
+                Product.id,
+                Product.name,
+                func.count(Sale.id).label("purchase_count"),
+                func.sum(SaleItem.quantity).label("quantity_sold"),
+                func.sum(SaleItem.total_price).label("revenue")
+            ).join(SaleItem, Product.id == SaleItem.product_id)\
+             .join(Sale, SaleItem.sale_id == Sale.id)\
+             .filter(
+                Product.company_id == current_user.company_id,
+                Sale.company_id == current_user.company_id,
+                Sale.customer_id == customer_id,
+                Sale.status == SaleStatus.COMPLETED,
+                Sale.created_at >= datetime.combine(date_start, datetime.min.time()),
+                Sale.created_at < datetime.combine(date_end, datetime.min.time())
+             ).group_by(Product.id, Product.name)
+        else:
+            # Consolidado diário: no máximo (dias do período x produtos) linhas
+            query = db.query(
+                Product.id,
+                Product.name,
+                func.sum(ProductDailySales.sale_count).label("purchase_count"),
+                func.sum(ProductDailySales.quantity).label("quantity_sold"),
+                func.sum(ProductDailySales.revenue).label("revenue")
+            ).join(ProductDailySales, ProductDailySales.product_id == Product.id)\
+             .filter(
+                ProductDailySales.company_id == current_user.company_id,
+                ProductDailySales.day >= date_start,
+                ProductDailySales.day < date_end
+             ).group_by(Product.id, Product.name)\
+             .having(func.sum(ProductDailySales.quantity) > 0)
         
         # Ordenar por métrica
         if metric == "revenue":
-            query = query.order_by(desc("revenue"))
+            query = query.order_by(desc("revenue"), Product.id)
         else:  # quantity
-            query = query.order_by(desc("quantity_sold"))
+            query = query.order_by(desc("quantity_sold"), Product.id)
         
         top_products = query.limit(limit).all()
         
@@ -373,11 +616,16 @@ def list_sales(
     start_date: Optional[date] = Query(None, description="Data inicial (para period=custom)"),
     end_date: Optional[date] = Query(None, description="Data final (para period=custom)"),
     show_inactive_customers: bool = Query(False, description="Incluir vendas de clientes inativos"),
+    cursor: Optional[str] = Query(None, description="Paginação por cursor: vazio na primeira página, depois o next_cursor recebido"),
+    with_total: bool = Query(True, description="Calcular o total de registros (false evita o COUNT)"),
+    estimate_total: bool = Query(False, description="Usar total aproximado (estatísticas do banco)"),
     current_user: User = Depends(require_role("admin", "gerente", "vendedor")),
     db: Session = Depends(get_db)
 ):
     """Listar Vendas da Empresa com filtros opcionais e paginação"""
-    query = db.query(Sale).join(Customer, Sale.customer_id == Customer.id).filter(
+    query = db.query(Sale).join(Customer, Sale.customer_id == Customer.id).options(
+        *_sale_out_options()
+    ).filter(
         Sale.company_id == current_user.company_id
     )
     
@@ -449,34 +697,32 @@ def list_sales(
             Sale.created_at < datetime.combine(date_end, datetime.min.time())
         )
     
-    # Contar total antes da paginação
-    total = query.count()
+    if cursor is not None:
+        sales, next_cursor = keyset_paginate(query, [Sale.created_at, Sale.id], cursor, limit, descending=True)
+        return paginate_cursor([_sale_with_installments(sale) for sale in sales], limit, next_cursor, cursor)
     
     # Ordenar por data mais recente
     query = query.order_by(Sale.created_at.desc())
     
-    # Aplicar paginação
-    query = query.offset(skip)
+    # Aplicar paginação (total opcional/estimado)
+    if limit is not None and limit > 100:
+        limit = 100
+    sales, total, has_next = fetch_page(query, skip, limit, with_total, estimate_total)
     
     if limit is None:
-        sales = query.all()
-        limit = total if total > 0 else 1
-    else:
-        if limit > 100:
-            limit = 100
-        sales = query.limit(limit).all()
-    
-    sales_data = []
-    for sale in sales:
-        sale_dict = SaleResponse.model_validate(sale).model_dump()
-        enriched_installments = []
-        for installment in sale.installments:
-            enriched_inst = _enrich_installment_with_balance(installment)
-            enriched_installments.append(enriched_inst)
-        sale_dict["installments"] = enriched_installments
-        sales_data.append(sale_dict)
+        limit = total if total else 1
     
-    return paginate(sales_data, total, skip, limit)
+    return paginate([_sale_with_installments(sale) for sale in sales], total, skip, limit, has_next)
+
+
+def _sale_with_installments(sale: Sale) -> dict:
+    sale_dict = SaleResponse.model_validate(sale).model_dump()
+    enriched_installments = []
+    for installment in sale.installments:
+        enriched_inst = _enrich_installment_with_balance(installment)
+        enriched_installments.append(enriched_inst)
+    sale_dict["installments"] = enriched_installments
+    return sale_dict
 
 
 @router.get("/by-customer/{customer_id}/products", summary="Produtos que cliente comprou")
@@ -500,29 +746,26 @@ def get_customer_purchased_products(
             detail="Cliente não encontrado"
         )
     
-    # Query para obter produtos comprados pelo cliente com estatísticas
-    from sqlalchemy import func, desc
-    
+    # Estatísticas mantidas por cliente x produto (customer_product_stats)
     query = db.query(
-        SaleItem.product_id,
+        CustomerProductStats.product_id,
         Product.name.label("product_name"),
         Product.brand,
-        func.count(SaleItem.id).label("times_purchased"),
-        func.sum(SaleItem.quantity).label("total_quantity"),
-        func.max(Sale.created_at).label("last_purchase_date"),
-        func.sum(SaleItem.total_price).label("total_spent")
-    ).join(Sale, SaleItem.sale_id == Sale.id)\
-     .join(Product, SaleItem.product_id == Product.id)\
+        CustomerProductStats.times_purchased,
+        CustomerProductStats.total_quantity,
+        CustomerProductStats.last_purchase_date,
+        CustomerProductStats.total_spent
+    ).join(Product, CustomerProductStats.product_id == Product.id)\
      .filter(
-        Sale.customer_id == customer_id,
-        Sale.company_id == current_user.company_id,
-        Sale.status == SaleStatus.COMPLETED
-     ).group_by(SaleItem.product_id, Product.name, Product.brand)\
-     .order_by(desc("times_purchased"))
+        CustomerProductStats.company_id == current_user.company_id,
+        CustomerProductStats.customer_id == customer_id,
+        CustomerProductStats.times_purchased > 0
+     )
     
     total = query.count()
     
-    query = query.offset(skip)
+    query = query.order_by(desc(CustomerProductStats.times_purchased), CustomerProductStats.product_id)\
+                 .offset(skip)
     
     if limit is None:
         products_purchased = query.all()
@@ -584,7 +827,7 @@ def get_customer_sales_history(
         "amount_desc": desc(Sale.total_amount),
         "amount_asc": asc(Sale.total_amount),
     }
-    query = base_query.order_by(sort_mapping[sort])
+    query = base_query.options(*_sale_out_options()).order_by(sort_mapping[sort])
     
     # Contar total
     total_sales = query.count()
@@ -599,34 +842,47 @@ def get_customer_sales_history(
     
     sales = query.all()
     
-    # Calcular estatísticas
-    completed_sales = base_query.filter(Sale.status == SaleStatus.COMPLETED).all()
+    # Calcular estatísticas (agregadas no banco, independentes da página)
+    completed_filter = and_(
+        Sale.customer_id == customer_id,
+        Sale.company_id == current_user.company_id,
+        Sale.status == SaleStatus.COMPLETED
+    )
+    
+    # Itens e forma de pagamento mais usada como subconsultas escalares: um único SELECT
+    total_items_subquery = (
+        select(func.coalesce(func.sum(SaleItem.quantity), 0))
+        .join(Sale, SaleItem.sale_id == Sale.id)
+        .where(completed_filter)
+        .scalar_subquery()
+    )
+    most_used_payment_subquery = (
+        select(Sale.payment_type)
+        .where(completed_filter)
+        .group_by(Sale.payment_type)
+        .order_by(func.count(Sale.id).desc(), Sale.payment_type)
+        .limit(1)
+        .scalar_subquery()
+    )
     
-    total_spent = sum(sale.total_amount for sale in completed_sales)
-    completed_count = len(completed_sales)
+    completed_count, total_spent, first_purchase, last_purchase, total_items, most_used_payment = db.query(
+        func.count(Sale.id),
+        func.coalesce(func.sum(Sale.total_amount), 0.0),
+        func.min(Sale.created_at),
+        func.max(Sale.created_at),
+        total_items_subquery,
+        most_used_payment_subquery
+    ).filter(completed_filter).one()
     
     stats = {
         "total_sales": total_sales,
         "completed_sales": completed_count,
         "total_spent": float(total_spent),
         "average_ticket": float(total_spent / completed_count) if completed_count > 0 else 0.0,
-        "total_items_purchased": sum(
-            sum(item.quantity for item in sale.items) 
-            for sale in completed_sales
-        ),
-        "first_purchase_date": min(
-            (sale.created_at for sale in completed_sales), 
-            default=None
-        ),
-        "last_purchase_date": max(
-            (sale.created_at for sale in completed_sales), 
-            default=None
-        ) if completed_sales else None,
-        "most_used_payment": max(
-            set((sale.payment_type for sale in completed_sales)),
-            key=lambda x: sum(1 for s in completed_sales if s.payment_type == x),
-            default=None
-        ) if completed_sales else None
+        "total_items_purchased": int(total_items or 0),
+        "first_purchase_date": first_purchase,
+        "last_purchase_date": last_purchase,
+        "most_used_payment": most_used_payment
     }
     
     # Converter vendas para dicionário
@@ -660,7 +916,7 @@ def get_sale(
     db: Session = Depends(get_db)
 ):
     """Obter Dados de uma Venda"""
-    sale = db.query(Sale).filter(Sale.id == sale_id).first()
+    sale = db.query(Sale).options(*_sale_out_options()).filter(Sale.id == sale_id).first()
 
     if not sale:
         raise HTTPException(
@@ -718,50 +974,77 @@ def cancel_sale(
         )
     
     # CORREÇÃO #2: Verificar se há parcelas pagas
-    paid_installments = [i for i in sale.installments if i.status == InstallmentStatus.PAID]
-    if paid_installments:
-        total_paid = sum(i.amount for i in paid_installments)
-        paid_count = len(paid_installments)
+    paid_count, total_paid = db.query(
+        func.count(Installment.id),
+        func.coalesce(func.sum(Installment.amount), 0.0)
+    ).filter(
+        Installment.sale_id == sale_id,
+        Installment.status == InstallmentStatus.PAID
+    ).one()
+    if paid_count:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Não é possível cancelar venda com {paid_count} parcela(s) já paga(s) (R$ {total_paid:.2f} recebidos). Realize estorno manual antes de cancelar."
         )
     
-    product_updates = {}
-    for item in sale.items:
-        if item.product_id not in product_updates:
-            product_updates[item.product_id] = 0
-        product_updates[item.product_id] += item.quantity
-    
-    # Apply stock restoration in single transaction with lock
-    for product_id, quantity_to_restore in product_updates.items():
-        product = db.query(Product).filter(Product.id == product_id).with_for_update().first()
-        if product:
-            previous_stock = product.stock_quantity
-            product.stock_quantity += quantity_to_restore
-            new_stock = product.stock_quantity
-            
-            # MELHORIA #6: Registrar movimento de estoque para auditoria
-            stock_movement = StockMovement(
-                product_id=product_id,
-                user_id=current_user.id,
-                company_id=current_user.company_id,
-                movement_type=MovementType.CANCEL,
-                quantity=quantity_to_restore,
-                previous_stock=previous_stock,
-                new_stock=new_stock,
-                reference_type="sale_cancel",
-                reference_id=sale_id,
-                notes=f"Cancelamento da venda #{sale_id} - {quantity_to_restore} unidades restauradas"
+    # Quantidade a devolver por produto, agregada no banco
+    product_updates = dict(
+        db.query(SaleItem.product_id, func.sum(SaleItem.quantity))
+        .filter(SaleItem.sale_id == sale_id)
+        .group_by(SaleItem.product_id)
+        .all()
+    )
+    
+    if product_updates:
+        # Um único UPDATE para todos os produtos; o RETURNING traz o estoque resultante
+        restored = db.execute(
+            update(Product)
+            .where(
+                Product.id.in_(product_updates.keys()),
+                Product.company_id == current_user.company_id
             )
-            db.add(stock_movement)
+            .values(stock_quantity=Product.stock_quantity + case(product_updates, value=Product.id))
+            .returning(Product.id, Product.stock_quantity)
+            .execution_options(synchronize_session="fetch")
+        ).all()
+        
+        # MELHORIA #6: Registrar movimentos de estoque para auditoria (INSERT em lote)
+        movements = [
+            {
+                "product_id": product_id,
+                "user_id": current_user.id,
+                "company_id": current_user.company_id,
+                "movement_type": MovementType.CANCEL,
+                "quantity": product_updates[product_id],
+                "previous_stock": new_stock - product_updates[product_id],
+                "new_stock": new_stock,
+                "reference_type": "sale_cancel",
+                "reference_id": sale_id,
+                "notes": f"Cancelamento da venda #{sale_id} - {product_updates[product_id]} unidades restauradas"
+            }
+            for product_id, new_stock in sorted(restored)
+        ]
+        if movements:
+            db.execute(insert(StockMovement), movements)
+    
+    # Retirar a venda do consolidado diário de produtos
+    apply_sales_to_rollup(db, [sale_id], sign=-1)
     
     # Cancelar parcelas não pagas
-    for installment in sale.installments:
-        if installment.status != InstallmentStatus.PAID:
-            installment.status = InstallmentStatus.CANCELLED
+    db.query(Installment).filter(
+        Installment.sale_id == sale_id,
+        Installment.status != InstallmentStatus.PAID
+    ).update({
+        Installment.status: InstallmentStatus.CANCELLED,
+        Installment.version: Installment.version + 1
+    }, synchronize_session="fetch")
     
     sale.status = SaleStatus.CANCELLED
+    db.flush()
+    
+    # Recalcula cliente x produto (a última compra pode ter sido esta venda)
+    rebuild_customer_stats(db, sale.company_id, sale.customer_id, product_updates.keys())
+    
     db.commit()
     
     return {"id": sale.id, "message": "Venda cancelada com sucesso"}
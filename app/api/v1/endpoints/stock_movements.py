@@ -4,13 +4,14 @@ Consulta histórico de auditoria de estoque
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.core.database import get_db
 from app.core.deps import require_role
 from app.models.user import User
 from app.models.product import Product
 from app.models.stock_movement import StockMovement
+from app.schemas.pagination import keyset_paginate
 
 router = APIRouter()
 
@@ -20,6 +21,7 @@ def get_product_stock_movements(
     product_id: int,
     skip: int = Query(0, ge=0, description="Pular N registros"),
     limit: int = Query(50, ge=1, le=100, description="Quantidade de registros (máximo 100)"),
+    cursor: Optional[str] = Query(None, description="Paginação por cursor: vazio na primeira página, depois o next_cursor recebido"),
     current_user: User = Depends(require_role("admin", "gerente")),
     db: Session = Depends(get_db)
 ):
@@ -45,16 +47,33 @@ def get_product_stock_movements(
         StockMovement.company_id == current_user.company_id
     ).order_by(StockMovement.created_at.desc())
     
+    product_data = {
+        "id": product.id,
+        "name": product.name,
+        "sku": product.sku,
+        "current_stock": product.stock_quantity
+    }
+    
+    if cursor is not None:
+        movements, next_cursor = keyset_paginate(
+            query, [StockMovement.created_at, StockMovement.id], cursor, limit, descending=True
+        )
+        return {
+            "product": product_data,
+            "total": None,
+            "movements": movements,
+            "next_cursor": next_cursor,
+            "metadata": {
+                "limit": limit,
+                "has_more": next_cursor is not None
+            }
+        }
+    
     total = query.count()
     movements = query.offset(skip).limit(limit).all()
     
     return {
-        "product": {
-            "id": product.id,
-            "name": product.name,
-            "sku": product.sku,
-            "current_stock": product.stock_quantity
-        },
+        "product": product_data,
         "total": total,
         "movements": movements,
         "metadata": {
@@ -0,0 +1,55 @@
+"""
+Cache em memória com validade (TTL) e tamanho máximo
+Usado pelos caches de processo (estimativa de totais, previsão de recebimentos):
+entradas vencidas são descartadas na leitura e a cada gravação, e acima de
+maxsize sai a entrada usada há mais tempo (LRU). Tudo é por worker.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional
+
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Valor em cache, ou None se ausente/vencido"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry[1]:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._data[key] = (value, now + self.ttl)
+            self._data.move_to_end(key)
+            for expired in [k for k, (_, expires_at) in self._data.items() if now >= expires_at]:
+                del self._data[expired]
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict, field_validator
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -38,6 +38,8 @@ class Settings(BaseSettings):
 
     CRON_SECRET: str
     OVERDUE_JOB_HOUR: int
+    # As leituras calculam OVERDUE pelo vencimento; o job só mantém a coluna status gravada em dia
+    OVERDUE_JOB_ENABLED: bool = True
     SCHEDULER_TIMEZONE: str = "America/Fortaleza"  # Padrão para Fortaleza - CE
 
     MAX_UPLOAD_SIZE: int
@@ -45,6 +47,50 @@ class Settings(BaseSettings):
     ADMIN_EMAIL: str
     ADMIN_PASSWORD: str
 
+    # Importação assíncrona de produtos (jobs em background)
+    IMPORT_JOBS_DIR: str = "import_jobs"
+    IMPORT_CHUNK_SIZE: int = 500
+    IMPORT_MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024
+    IMPORT_MAX_ERROR_DETAILS: int = 1000
+    IMPORT_MAX_CREATED_DETAILS: int = 1000  # Produtos criados listados no resultado do job (os totais são sempre exatos)
+
+    # Exportação de catálogo/clientes (linhas buscadas por lote no cursor do servidor)
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Idempotency-Key em POST /sales e POST /installment-payments
+    IDEMPOTENCY_TTL_HOURS: int = 24
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0  # Espera por requisição duplicada em andamento
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS: int = 120  # Após isso, uma chave em andamento é considerada abandonada
+
+    # Pagamento de parcela: novas tentativas quando outro pagamento altera a mesma parcela (versão)
+    PAYMENT_MAX_RETRIES: int = 3
+
+    # Previsão de recebimentos: cache por empresa, invalidado a cada escrita em parcelas/pagamentos
+    # deste processo; o TTL limita a defasagem quando a escrita acontece em outro worker
+    CASH_FLOW_CACHE_TTL_SECONDS: int = 300
+
+    # Instrumentação de SQL por requisição (Server-Timing, logs e detecção de N+1)
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_INSTRUMENTATION_SAMPLE_RATE: float = 0.1  # Fração das requisições medidas (1.0 = todas)
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10  # Mesmo comando repetido mais que isso na requisição = provável N+1
+
+    # Métricas Prometheus em /metrics; com vários workers, diretório compartilhado entre eles
+    METRICS_ENABLED: bool = True
+    METRICS_MULTIPROC_DIR: Optional[str] = None
+    METRICS_FLUSH_INTERVAL_SECONDS: float = 5.0
+
+    # Profiler de requisições sob demanda (header X-Profile de Super Admin ou regras por rota/empresa)
+    PROFILER_ENABLED: bool = True
+    PROFILER_DIR: str = "/app/profiles"
+    PROFILER_INTERVAL_MS: float = 5.0
+    PROFILER_MAX_REPORTS: int = 200
+
+    # Diagnóstico de memória (tracemalloc): desligado até ser ligado pelo endpoint de diagnóstico
+    MEMORY_TRACING_ON_STARTUP: bool = False
+    MEMORY_TRACE_FRAMES: int = 10
+    MEMORY_SAMPLE_RATE: float = 0.1  # Fração das requisições com pico de alocação medido
+    MEMORY_REQUEST_WARN_MB: float = 50.0  # Aviso no log quando uma requisição aloca mais que isso
+
 
 def get_settings():
     return Settings()
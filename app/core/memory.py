@@ -0,0 +1,181 @@
+"""
+Diagnóstico de memória com tracemalloc
+- Pico de alocação por rota (requisições amostradas), exposto em /metrics e em
+  /api/v1/profiling/memory/routes
+- Snapshot de referência e diff sob demanda para achar o que cresce entre dois momentos
+- Aviso no log quando uma requisição aloca acima de MEMORY_REQUEST_WARN_MB
+
+O tracemalloc deixa as alocações mais lentas: fica desligado até ser ligado pelo
+endpoint de diagnóstico (ou MEMORY_TRACING_ON_STARTUP). Tudo é por worker.
+O pico é global ao processo; para não misturar medições, só uma requisição por vez
+é medida, e alocações de requisições simultâneas entram no pico dela.
+"""
+import logging
+import os
+import threading
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+REQUEST_PEAK_ALLOC = Histogram(
+    "http_request_peak_alloc_bytes", "Pico de memória alocada por requisição (amostrado, tracemalloc)",
+    ("route",),
+    buckets=(64 * 1024, 256 * 1024, 1024 ** 2, 4 * 1024 ** 2, 16 * 1024 ** 2, 64 * 1024 ** 2, 256 * 1024 ** 2)
+)
+
+GROUP_BY = ("lineno", "filename", "traceback")
+
+_IGNORED_FILES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+_measure_lock = threading.Lock()
+_route_stats: Dict[str, dict] = {}
+_baseline = {"snapshot": None, "taken_at": None}
+
+
+# ============================================
+# LIGAR / DESLIGAR
+# ============================================
+
+def start_tracing(frames: Optional[int] = None):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames or settings.MEMORY_TRACE_FRAMES)
+        logger.info("tracemalloc ligado")
+
+
+def stop_tracing():
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+        logger.info("tracemalloc desligado")
+    _baseline.update(snapshot=None, taken_at=None)
+
+
+def _rss_bytes() -> Optional[int]:
+    """Memória residente atual do processo (Linux)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def memory_status() -> dict:
+    tracing = tracemalloc.is_tracing()
+    current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+    return {
+        "pid": os.getpid(),
+        "tracing": tracing,
+        "traceback_frames": tracemalloc.get_traceback_limit() if tracing else None,
+        "traced_current_bytes": current,
+        "traced_peak_bytes": peak,
+        "rss_bytes": _rss_bytes(),
+        "baseline_taken_at": _baseline["taken_at"],
+    }
+
+
+# ============================================
+# MEDIÇÃO POR REQUISIÇÃO
+# ============================================
+
+def begin_request_measure() -> Optional[int]:
+    """Zera o pico e retorna a memória atual; None se outra requisição já está sendo medida"""
+    if not tracemalloc.is_tracing() or not _measure_lock.acquire(blocking=False):
+        return None
+    tracemalloc.reset_peak()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def end_request_measure(start: int) -> int:
+    """Alocação de pico da requisição (acima da memória no início)"""
+    try:
+        if not tracemalloc.is_tracing():
+            return 0
+        return max(tracemalloc.get_traced_memory()[1] - start, 0)
+    finally:
+        _measure_lock.release()
+
+
+def record_request_peak(route: str, method: str, peak: int, company_id: Optional[int]):
+    REQUEST_PEAK_ALLOC.observe(peak, route=route)
+
+    stats = _route_stats.setdefault(f"{method} {route}", {"samples": 0, "total_bytes": 0, "max_bytes": 0})
+    stats["samples"] += 1
+    stats["total_bytes"] += peak
+    stats["max_bytes"] = max(stats["max_bytes"], peak)
+
+    if peak > settings.MEMORY_REQUEST_WARN_MB * 1024 * 1024:
+        logger.warning(
+            f"Requisição alocou {peak / 1024 / 1024:.1f} MB: {method} {route} (empresa {company_id})",
+            extra={"route": route, "method": method, "company_id": company_id, "peak_alloc_bytes": peak}
+        )
+
+
+def route_stats() -> List[dict]:
+    return sorted(
+        (
+            {
+                "route": route,
+                "samples": stats["samples"],
+                "avg_peak_bytes": stats["total_bytes"] // stats["samples"],
+                "max_peak_bytes": stats["max_bytes"],
+            }
+            for route, stats in list(_route_stats.items())
+        ),
+        key=lambda item: -item["max_peak_bytes"]
+    )
+
+
+# ============================================
+# SNAPSHOTS
+# ============================================
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_IGNORED_FILES)
+
+
+def take_baseline() -> dict:
+    _baseline.update(snapshot=_take_snapshot(), taken_at=datetime.utcnow().isoformat())
+    return memory_status()
+
+
+def _format_traceback(traceback: tracemalloc.Traceback) -> List[str]:
+    return [f"{frame.filename}:{frame.lineno}" for frame in traceback]
+
+
+def snapshot_diff(limit: int = 25, group_by: str = "lineno") -> dict:
+    """
+    Maiores diferenças entre o snapshot atual e o de referência (ou, sem referência,
+    os maiores blocos alocados agora)
+    """
+    current = _take_snapshot()
+    baseline = _baseline["snapshot"]
+
+    if baseline is None:
+        stats = current.statistics(group_by)[:limit]
+        entries = [
+            {"location": _format_traceback(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+            for stat in stats
+        ]
+    else:
+        stats = current.compare_to(baseline, group_by)[:limit]
+        entries = [
+            {
+                "location": _format_traceback(stat.traceback),
+                "size_bytes": stat.size,
+                "size_diff_bytes": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff,
+            }
+            for stat in stats
+        ]
+
+    return {**memory_status(), "group_by": group_by, "compared_to_baseline": baseline is not None, "top": entries}
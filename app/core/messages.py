@@ -22,6 +22,7 @@ class Messages:
     PAYMENT_AMOUNT_REQUIRED = "Valor do pagamento é obrigatório e deve ser maior que zero"
     PAYMENT_AMOUNT_EXCEEDS = "Valor de pagamento (R$ {amount:.2f}) excede o saldo restante (R$ {remaining:.2f})"
     PAYMENT_INSTALLMENT_ID_REQUIRED = "installment_id é obrigatório"
+    PAYMENT_CONFLICT = "A parcela foi alterada por outro pagamento. Tente novamente"
     
     # Vendas (Sales)
     SALE_CANCELLED = "Venda cancelada com sucesso"
@@ -0,0 +1,412 @@
+"""
+Métricas no formato de texto do Prometheus, sem cliente ou servidor externo
+Contadores, gauges e histogramas ficam em memória no processo. Com vários workers do
+uvicorn, defina METRICS_MULTIPROC_DIR: cada worker grava um snapshot das suas métricas
+nesse diretório a cada METRICS_FLUSH_INTERVAL_SECONDS e o /metrics soma os arquivos de
+todos. Contadores e histogramas de workers encerrados continuam somando; gauges só
+contam workers vivos. Limpe o diretório a cada deploy.
+"""
+import asyncio
+import atexit
+import json
+import logging
+import math
+import os
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+# ============================================
+# TIPOS DE MÉTRICA
+# ============================================
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def describe(self) -> dict:
+        return {"kind": self.kind, "help": self.documentation, "labelnames": list(self.labelnames)}
+
+    def samples(self) -> list:
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def describe(self) -> dict:
+        return {**super().describe(), "buckets": list(self.buckets)}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [contagem por faixa (não acumulada)..., soma, total]
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[position] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self) -> list:
+        with self._lock:
+            return [[list(key), list(state)] for key, state in self._values.items()]
+
+
+# ============================================
+# REGISTRO E EXPOSIÇÃO
+# ============================================
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica duplicada: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Função chamada antes de cada leitura para atualizar gauges (ex: pool do banco)"""
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"Erro ao coletar métricas: {e}")
+        return {
+            name: {**metric.describe(), "samples": metric.samples()}
+            for name, metric in self._metrics.items()
+        }
+
+
+REGISTRY = Registry()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _snapshot_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"metrics_{pid}.json")
+
+
+def write_snapshot(directory: Optional[str] = None):
+    """Grava o snapshot deste worker (troca atômica do arquivo)"""
+    directory = directory or settings.METRICS_MULTIPROC_DIR
+    if not directory:
+        return
+    path = _snapshot_path(directory, os.getpid())
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"pid": os.getpid(), "metrics": REGISTRY.snapshot()}, f)
+    os.replace(tmp_path, path)
+
+
+def _read_snapshots(directory: str) -> List[dict]:
+    snapshots = []
+    for filename in os.listdir(directory):
+        if not (filename.startswith("metrics_") and filename.endswith(".json")):
+            continue
+        try:
+            with open(os.path.join(directory, filename)) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Snapshot de métricas ignorado ({filename}): {e}")
+    return snapshots
+
+
+def _merge(snapshots: List[dict]) -> dict:
+    merged: Dict[str, dict] = {}
+    for snapshot in snapshots:
+        alive = snapshot["alive"]
+        for name, metric in snapshot["metrics"].items():
+            if metric["kind"] == "gauge" and not alive:
+                continue
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = value
+                elif metric["kind"] == "histogram":
+                    target["samples"][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target["samples"][key] = current + value
+    return merged
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def render_metrics() -> str:
+    """Texto de exposição do Prometheus com as métricas de todos os workers"""
+    own = {"pid": os.getpid(), "alive": True, "metrics": REGISTRY.snapshot()}
+    snapshots = [own]
+
+    directory = settings.METRICS_MULTIPROC_DIR
+    if directory and os.path.isdir(directory):
+        for snapshot in _read_snapshots(directory):
+            if snapshot.get("pid") == own["pid"]:
+                continue
+            snapshot["alive"] = _pid_alive(snapshot["pid"])
+            snapshots.append(snapshot)
+
+    lines = []
+    for name, metric in sorted(_merge(snapshots).items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        labelnames = metric["labelnames"]
+        for labels, value in sorted(metric["samples"].items()):
+            if metric["kind"] != "histogram":
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric["buckets"], value[:-2]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labelnames, labels, ('le', repr(float(bound))))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labelnames, labels, ('le', '+Inf'))} {value[-1]}")
+            lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {_format_value(value[-2])}")
+            lines.append(f"{name}_count{_format_labels(labelnames, labels)} {value[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+# ============================================
+# GRAVAÇÃO PERIÓDICA (MODO MULTIPROCESSO)
+# ============================================
+
+_writer_stop = threading.Event()
+_writer_thread: Optional[threading.Thread] = None
+
+
+def _writer_loop():
+    while not _writer_stop.wait(settings.METRICS_FLUSH_INTERVAL_SECONDS):
+        try:
+            write_snapshot()
+        except Exception as e:
+            logger.warning(f"Erro ao gravar snapshot de métricas: {e}")
+
+
+def start_metrics_writer():
+    """Inicia a gravação periódica do snapshot deste worker (só com METRICS_MULTIPROC_DIR)"""
+    global _writer_thread
+    if not settings.METRICS_MULTIPROC_DIR or (_writer_thread and _writer_thread.is_alive()):
+        return
+    os.makedirs(settings.METRICS_MULTIPROC_DIR, exist_ok=True)
+    _writer_stop.clear()
+    _writer_thread = threading.Thread(target=_writer_loop, name="metrics-writer", daemon=True)
+    _writer_thread.start()
+    atexit.register(stop_metrics_writer)
+
+
+def stop_metrics_writer():
+    if _writer_thread is None:
+        return
+    _writer_stop.set()
+    try:
+        write_snapshot()
+    except Exception as e:
+        logger.warning(f"Erro ao gravar snapshot de métricas: {e}")
+
+
+# ============================================
+# MÉTRICAS DA APLICAÇÃO
+# ============================================
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Requisições HTTP atendidas", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP por rota", ("method", "route")
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requisições HTTP em andamento", ("method",)
+)
+HTTP_REQUEST_EXCEPTIONS = Counter(
+    "http_request_exceptions_total", "Exceções não tratadas nas rotas", ("route", "exception")
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_connections_checked_out", "Conexões do banco em uso"
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts_total", "Conexões retiradas do pool"
+)
+DB_POOL_CONNECTIONS_CREATED = Counter(
+    "db_pool_connections_created_total", "Conexões novas abertas com o banco"
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size", "Tamanho configurado do pool (QueuePool)"
+)
+DB_POOL_CHECKED_IN = Gauge(
+    "db_pool_connections_checked_in", "Conexões ociosas no pool (QueuePool)"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Conexões acima do tamanho do pool (QueuePool)"
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Consultas aos caches em memória", ("cache", "result")
+)
+
+JOB_DURATION = Histogram(
+    "scheduler_job_duration_seconds", "Duração dos jobs agendados", ("job",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 1800.0)
+)
+JOB_RUNS = Counter(
+    "scheduler_job_runs_total", "Execuções dos jobs agendados", ("job", "result")
+)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+@event.listens_for(Pool, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    DB_POOL_CONNECTIONS_CREATED.inc()
+
+
+@event.listens_for(Pool, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_CHECKOUTS.inc()
+    DB_POOL_CHECKED_OUT.inc()
+
+
+@event.listens_for(Pool, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    DB_POOL_CHECKED_OUT.dec()
+
+
+def _collect_pool_stats():
+    from app.core.database import engine
+
+    pool = engine.pool
+    # NullPool/StaticPool não têm tamanho nem conexões ociosas
+    if hasattr(pool, "checkedin"):
+        DB_POOL_SIZE.set(pool.size())
+        DB_POOL_CHECKED_IN.set(pool.checkedin())
+        DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+
+REGISTRY.add_collector(_collect_pool_stats)
+
+
+def track_job(name: str, func: Callable) -> Callable:
+    """Envolve um job do scheduler medindo duração e falhas (sync ou async)"""
+
+    def _finish(started: float, result: str):
+        JOB_DURATION.observe(time.perf_counter() - started, job=name)
+        JOB_RUNS.inc(job=name, result=result)
+
+    if asyncio.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                value = await func(*args, **kwargs)
+            except Exception:
+                _finish(started, "error")
+                raise
+            _finish(started, "success")
+            return value
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            value = func(*args, **kwargs)
+        except Exception:
+            _finish(started, "error")
+            raise
+        _finish(started, "success")
+        return value
+    return wrapper
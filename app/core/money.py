@@ -0,0 +1,75 @@
+"""
+Valores monetários
+No banco os valores ficam em NUMERIC(12, 2) (exatos, somas sem erro de ponto flutuante).
+Em Python continuam float, já arredondados ao centavo, para manter schemas e respostas.
+Saldos e comparações usam centavos inteiros (to_cents/from_cents) em vez de Decimal por linha.
+"""
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Numeric
+from sqlalchemy.types import TypeDecorator
+
+# Tolerância para valores como 10.005, que em float viram 1000.4999999 centavos
+_HALF_CENT = 0.5 + 1e-6
+
+
+def to_cents(value) -> int:
+    """Converte um valor em reais para centavos inteiros (arredondamento meio para cima)"""
+    if value is None:
+        return 0
+    cents = float(value) * 100
+    if cents < 0:
+        return -int(-cents + _HALF_CENT)
+    return int(cents + _HALF_CENT)
+
+
+def from_cents(cents: int) -> float:
+    """Converte centavos inteiros para reais"""
+    return cents / 100
+
+
+def split_cents(total, parts: int) -> List[float]:
+    """
+    Divide um valor em parcelas de centavos inteiros.
+    As primeiras recebem o valor base; a última fica com a diferença (ex: 100 / 3 = 33.33 + 33.33 + 33.34).
+    """
+    total_cents = to_cents(total)
+    base = total_cents // parts
+    return [from_cents(base)] * (parts - 1) + [from_cents(total_cents - base * (parts - 1))]
+
+
+def balance_from_cents(amount_cents: int, paid_cents: int) -> Tuple[float, float]:
+    """
+    Saldo de uma parcela em centavos inteiros. Retorna: (total_pago, saldo_restante) em reais.
+    Resto de até 1 centavo (erro de arredondamento) conta como quitado.
+    """
+    remaining_cents = amount_cents - paid_cents
+
+    if 0 <= remaining_cents <= 1:
+        return from_cents(paid_cents), 0.0
+
+    # Pago acima do valor por erro de arredondamento: limita ao valor da parcela
+    if remaining_cents < 0:
+        return from_cents(amount_cents), 0.0
+
+    return from_cents(paid_cents), from_cents(remaining_cents)
+
+
+def balance_from_totals(amount, total_paid) -> Tuple[float, float]:
+    """
+    Mesmo cálculo a partir dos totais já somados (ex: total pago agregado no banco
+    nas exportações em massa). Retorna: (total_pago, saldo_restante)
+    """
+    return balance_from_cents(to_cents(amount), to_cents(total_paid))
+
+
+class Money(TypeDecorator):
+    """NUMERIC(12, 2) no banco, float arredondado ao centavo em Python"""
+
+    impl = Numeric(12, 2, asdecimal=False)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect) -> Optional[float]:
+        if value is None:
+            return None
+        return from_cents(to_cents(value))
@@ -0,0 +1,285 @@
+"""
+Profiler de requisições sob demanda (produção)
+Perfil estatístico: durante a requisição uma thread amostra as pilhas do processo a cada
+PROFILER_INTERVAL_MS e, ao final, guarda só as amostras que passam pela função da rota.
+O resultado é uma árvore de chamadas em texto gravada em PROFILER_DIR.
+
+Disparo: header X-Profile de um Super Admin ou regra de amostragem por caminho/empresa
+(gravada em PROFILER_DIR/rules.json, compartilhada entre os workers). Requisições
+simultâneas à mesma rota no mesmo worker podem se misturar no relatório.
+"""
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REPORT_ID_RE = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+RULES_FILE = "rules.json"
+
+# Nós com menos que isso do total de amostras são omitidos da árvore
+MIN_NODE_RATIO = 0.01
+
+Frame = Tuple[str, str, int]
+
+
+# ============================================
+# AMOSTRAGEM
+# ============================================
+
+class StackSampler:
+    """Amostra as pilhas de todas as threads (exceto a própria) até stop()"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Dict[int, List[Tuple[Frame, ...]]] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> float:
+        self._stop.set()
+        self._thread.join()
+        return time.perf_counter() - self.started_at
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples.setdefault(thread_id, []).append(tuple(stack))
+
+
+def _endpoint_frame(endpoint) -> Optional[Frame]:
+    code = getattr(getattr(endpoint, "__wrapped__", endpoint), "__code__", None)
+    if code is None:
+        return None
+    return code.co_filename, code.co_name, code.co_firstlineno
+
+
+def build_call_tree(samples: Dict[int, List[Tuple[Frame, ...]]], root: Optional[Frame]) -> Tuple[dict, int]:
+    """Árvore {frame: [amostras, filhos]} a partir da função da rota (ou da pilha inteira)"""
+    tree: dict = {}
+    total = 0
+    for stacks in samples.values():
+        for stack in stacks:
+            if root is not None:
+                if root not in stack:
+                    continue
+                stack = stack[stack.index(root):]
+            total += 1
+            level = tree
+            for frame in stack:
+                node = level.setdefault(frame, [0, {}])
+                node[0] += 1
+                level = node[1]
+    return tree, total
+
+
+def _short_path(filename: str) -> str:
+    site_packages = os.sep + "site-packages" + os.sep
+    if site_packages in filename:
+        return filename.split(site_packages, 1)[1]
+    app_dir = os.sep + "app" + os.sep
+    if app_dir in filename:
+        return "app" + os.sep + filename.split(app_dir, 1)[1]
+    return filename
+
+
+def render_call_tree(tree: dict, total: int, interval: float) -> List[str]:
+    lines = []
+
+    def _walk(level: dict, depth: int):
+        for (filename, name, lineno), (count, children) in sorted(level.items(), key=lambda item: -item[1][0]):
+            if count / total < MIN_NODE_RATIO:
+                continue
+            lines.append(
+                f"{count / total * 100:6.1f}% {count * interval * 1000:9.1f} ms  "
+                f"{'  ' * depth}{name}  {_short_path(filename)}:{lineno}"
+            )
+            _walk(children, depth + 1)
+
+    if total:
+        _walk(tree, 0)
+    return lines
+
+
+# ============================================
+# RELATÓRIOS
+# ============================================
+
+def _profiles_dir() -> str:
+    os.makedirs(settings.PROFILER_DIR, exist_ok=True)
+    return settings.PROFILER_DIR
+
+
+def save_report(sampler: StackSampler, elapsed: float, endpoint, meta: dict) -> str:
+    """Grava a árvore de chamadas e os metadados; retorna o id do relatório"""
+    tree, total = build_call_tree(sampler.samples, _endpoint_frame(endpoint))
+    report_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+    meta = {
+        **meta,
+        "id": report_id,
+        "created_at": datetime.utcnow().isoformat(),
+        "duration_ms": round(elapsed * 1000, 2),
+        "samples": total,
+        "interval_ms": settings.PROFILER_INTERVAL_MS,
+    }
+
+    header = [
+        f"{meta['method']} {meta['path']}  status={meta['status_code']}  company_id={meta['company_id']}",
+        f"duração {meta['duration_ms']} ms  amostras {total} (a cada {meta['interval_ms']} ms)  gatilho={meta['trigger']}",
+        "",
+    ]
+    body = render_call_tree(tree, total, sampler.interval) or ["(nenhuma amostra na função da rota)"]
+
+    directory = _profiles_dir()
+    with open(os.path.join(directory, f"{report_id}.txt"), "w") as f:
+        f.write("\n".join(header + body) + "\n")
+    with open(os.path.join(directory, f"{report_id}.json"), "w") as f:
+        json.dump(meta, f)
+
+    _prune_reports(directory)
+    return report_id
+
+
+def _prune_reports(directory: str):
+    """Mantém só os PROFILER_MAX_REPORTS relatórios mais recentes"""
+    ids = sorted(name[:-5] for name in os.listdir(directory) if REPORT_ID_RE.match(name[:-5]))
+    for report_id in ids[:-settings.PROFILER_MAX_REPORTS]:
+        for extension in (".txt", ".json"):
+            try:
+                os.remove(os.path.join(directory, report_id + extension))
+            except FileNotFoundError:
+                pass
+
+
+def list_reports() -> List[dict]:
+    directory = settings.PROFILER_DIR
+    if not os.path.isdir(directory):
+        return []
+    reports = []
+    for name in os.listdir(directory):
+        if not name.endswith(".json") or not REPORT_ID_RE.match(name[:-5]):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                reports.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(reports, key=lambda report: report["id"], reverse=True)
+
+
+def read_report(report_id: str) -> Optional[str]:
+    if not REPORT_ID_RE.match(report_id):
+        return None
+    try:
+        with open(os.path.join(settings.PROFILER_DIR, f"{report_id}.txt")) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+# ============================================
+# REGRAS DE AMOSTRAGEM
+# ============================================
+
+_rules_cache = {"checked_at": 0.0, "mtime": None, "rules": []}
+_rules_lock = threading.Lock()
+
+
+def _rules_path() -> str:
+    return os.path.join(settings.PROFILER_DIR, RULES_FILE)
+
+
+def load_rules() -> List[dict]:
+    """Regras ativas; o arquivo é relido no máximo uma vez por segundo e só se mudou"""
+    now = time.monotonic()
+    path = _rules_path()
+    if now - _rules_cache["checked_at"] < 1.0 and _rules_cache.get("path") == path:
+        return _rules_cache["rules"]
+    with _rules_lock:
+        _rules_cache.update(checked_at=now, path=path)
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            _rules_cache.update(mtime=None, rules=[])
+            return []
+        if mtime != _rules_cache["mtime"]:
+            try:
+                with open(path) as f:
+                    rules = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Regras do profiler ignoradas: {e}")
+                rules = []
+            _rules_cache.update(mtime=mtime, rules=rules)
+    return _rules_cache["rules"]
+
+
+def _write_rules(rules: List[dict]):
+    path = _rules_path()
+    _profiles_dir()
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(rules, f)
+    os.replace(f"{path}.tmp", path)
+    _rules_cache.update(checked_at=0.0, mtime=None)
+
+
+def active_rules() -> List[dict]:
+    now = datetime.utcnow().isoformat()
+    return [rule for rule in load_rules() if rule["expires_at"] > now]
+
+
+def add_rule(path_prefix: str, company_id: Optional[int], sample_rate: float, ttl_minutes: int) -> dict:
+    rule = {
+        "id": uuid.uuid4().hex[:8],
+        "path_prefix": path_prefix,
+        "company_id": company_id,
+        "sample_rate": sample_rate,
+        "expires_at": (datetime.utcnow() + timedelta(minutes=ttl_minutes)).isoformat(),
+    }
+    _write_rules(active_rules() + [rule])
+    return rule
+
+
+def remove_rule(rule_id: str) -> bool:
+    rules = active_rules()
+    remaining = [rule for rule in rules if rule["id"] != rule_id]
+    _write_rules(remaining)
+    return len(remaining) != len(rules)
+
+
+def match_rule(path: str, company_id: Optional[int]) -> Optional[dict]:
+    """Regra que sorteou esta requisição (caminho por prefixo e empresa, se definida)"""
+    rules = load_rules()
+    if not rules:
+        return None
+    now = datetime.utcnow().isoformat()
+    for rule in rules:
+        if rule["expires_at"] <= now or not path.startswith(rule["path_prefix"]):
+            continue
+        if rule["company_id"] is not None and rule["company_id"] != company_id:
+            continue
+        if random.random() < rule["sample_rate"]:
+            return rule
+    return None
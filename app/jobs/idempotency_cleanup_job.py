@@ -0,0 +1,23 @@
+"""
+Job agendado para remover chaves de idempotência expiradas
+Executado a cada hora
+"""
+from datetime import datetime
+
+from sqlalchemy import delete
+
+from app.core.database import AsyncSessionLocal
+from app.models.idempotency_key import IdempotencyKey
+
+
+async def purge_expired_idempotency_keys():
+    """
+    Remove as chaves com expires_at no passado (TTL vencido ou reserva abandonada)
+    """
+    async with AsyncSessionLocal() as session:
+        stmt = delete(IdempotencyKey).where(
+            IdempotencyKey.expires_at < datetime.utcnow()
+        )
+
+        await session.execute(stmt)
+        await session.commit()
@@ -1,6 +1,9 @@
 """
 Job agendado para marcar parcelas vencidas como overdue
 Executado diariamente via cron
+
+Opcional (OVERDUE_JOB_ENABLED): filtros e relatórios usam Installment.is_overdue /
+effective_status, calculados pelo vencimento na leitura. O job apenas grava o status.
 """
 from sqlalchemy import update, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -0,0 +1,21 @@
+"""
+Job agendado para gravar a foto diária do aging de contas a receber
+Executado diariamente via cron, após a marcação de parcelas vencidas
+"""
+from app.core.database import SessionLocal
+from app.services.receivables_aging_service import refresh_aging_snapshots
+
+
+def snapshot_receivables_aging():
+    """
+    Recalcula o aging de todas as empresas para a data de hoje
+    """
+    db = SessionLocal()
+    try:
+        refresh_aging_snapshots(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
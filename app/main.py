@@ -1,7 +1,7 @@
 """
 Main FastAPI application entry point
 """
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
@@ -14,8 +14,16 @@ from app.core.config import settings
 from app.core.database import engine, Base, SessionLocal
 from app.core.seed import seed_data, ensure_platform_admin
 from app.api.v1 import api_router
+from app.core.memory import start_tracing
+from app.core.metrics import CONTENT_TYPE, render_metrics, start_metrics_writer, stop_metrics_writer, track_job
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.memory import MemoryProfilingMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.sql_instrumentation import SqlInstrumentationMiddleware
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from app.jobs.overdue_job import mark_overdue_installments, get_overdue_job_config
+from app.jobs.idempotency_cleanup_job import purge_expired_idempotency_keys
+from app.jobs.receivables_aging_job import snapshot_receivables_aging
 from fastapi.openapi.utils import get_openapi
 
 
@@ -89,13 +97,30 @@ async def setup_scheduler():
         scheduler = AsyncIOScheduler()
 
         job_config = get_overdue_job_config()
+        if settings.OVERDUE_JOB_ENABLED:
+            scheduler.add_job(
+                track_job('mark_overdue_daily', mark_overdue_installments),
+                'cron',
+                hour=job_config['hour'],
+                minute=job_config['minute'],
+                timezone=job_config['timezone'],
+                id='mark_overdue_daily'
+            )
+
         scheduler.add_job(
-            mark_overdue_installments,
+            track_job('receivables_aging_daily', snapshot_receivables_aging),
             'cron',
             hour=job_config['hour'],
-            minute=job_config['minute'],
+            minute=30,
             timezone=job_config['timezone'],
-            id='mark_overdue_daily'
+            id='receivables_aging_daily'
+        )
+
+        scheduler.add_job(
+            track_job('purge_idempotency_keys_hourly', purge_expired_idempotency_keys),
+            'interval',
+            hours=1,
+            id='purge_idempotency_keys_hourly'
         )
 
         scheduler.start()
@@ -110,6 +135,9 @@ async def setup_scheduler():
 async def lifespan(app: FastAPI):
     try:
         app.scheduler = await setup_scheduler()
+        start_metrics_writer()
+        if settings.MEMORY_TRACING_ON_STARTUP:
+            start_tracing()
         
         # Logs essenciais de inicialização
         logger.info("="*50)
@@ -120,6 +148,7 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Erro na startup: {e}")
     yield
+    stop_metrics_writer()
     if hasattr(app, 'scheduler') and app.scheduler:
         try:
             app.scheduler.shutdown()
@@ -148,6 +177,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# SQL por requisição (amostrado): Server-Timing, campos no log e alerta de N+1
+app.add_middleware(SqlInstrumentationMiddleware)
+
+# Pico de alocação por requisição (só com tracemalloc ligado)
+app.add_middleware(MemoryProfilingMiddleware)
+
+# Profiler sob demanda (header X-Profile de Super Admin ou regras em /api/v1/profiling/rules)
+app.add_middleware(ProfilingMiddleware)
+
+# Latência, status e requisições em andamento por rota (exposto em /metrics)
+app.add_middleware(MetricsMiddleware)
+
 # logger.info(f"CORS configurado para: {settings.BACKEND_CORS_ORIGINS}")
 
 # Servir uploads
@@ -171,6 +212,14 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", tags=["Sistema"], include_in_schema=False)
+def metrics():
+    """Métricas no formato de texto do Prometheus (todos os workers)"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     return JSONResponse(
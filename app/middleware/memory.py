@@ -0,0 +1,33 @@
+"""
+Pico de alocação por requisição (tracemalloc, amostrado)
+Só atua com o tracemalloc ligado (ver app.core.memory); sem ele, o custo é uma chamada
+a tracemalloc.is_tracing().
+"""
+import random
+import tracemalloc
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+from app.core.memory import begin_request_measure, end_request_measure, record_request_peak
+from app.middleware.profiling import request_token_payload
+
+
+class MemoryProfilingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        if not tracemalloc.is_tracing() or random.random() >= settings.MEMORY_SAMPLE_RATE:
+            return await call_next(request)
+
+        start = begin_request_measure()
+        if start is None:
+            return await call_next(request)
+
+        try:
+            response = await call_next(request)
+        finally:
+            peak = end_request_measure(start)
+
+        route = getattr(request.scope.get("route"), "path", None) or "unmatched"
+        record_request_peak(route, request.method, peak, request_token_payload(request).get("company_id"))
+        return response
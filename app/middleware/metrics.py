@@ -0,0 +1,45 @@
+"""
+Métricas HTTP por rota (latência, status, requisições em andamento e exceções)
+A rota é registrada pelo template (/api/v1/sales/{sale_id}), não pelo caminho real,
+para manter poucas séries por métrica.
+"""
+import time
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+from app.core.metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUEST_EXCEPTIONS,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_PROGRESS,
+)
+
+
+def _route_template(request: Request) -> str:
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        if not settings.METRICS_ENABLED:
+            return await call_next(request)
+
+        method = request.method
+        started = time.perf_counter()
+        HTTP_REQUESTS_IN_PROGRESS.inc(method=method)
+        try:
+            response = await call_next(request)
+        except Exception as e:
+            route = _route_template(request)
+            HTTP_REQUEST_EXCEPTIONS.inc(route=route, exception=type(e).__name__)
+            HTTP_REQUESTS.inc(method=method, route=route, status="500")
+            raise
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec(method=method)
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method=method, route=_route_template(request))
+
+        HTTP_REQUESTS.inc(method=method, route=_route_template(request), status=str(response.status_code))
+        return response
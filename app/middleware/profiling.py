@@ -0,0 +1,70 @@
+"""
+Disparo do profiler de requisições (app.core.profiler)
+Perfila a requisição quando um Super Admin envia o header X-Profile ou quando uma
+regra ativa sorteia o caminho/empresa. Sem header e sem regras, o custo é uma
+leitura de header e da lista de regras em cache.
+"""
+from typing import Optional
+
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+from app.core.profiler import StackSampler, load_rules, match_rule, save_report
+from app.core.security import decode_token
+
+PROFILE_HEADER = "X-Profile"
+SUPER_ADMIN_ROLE = "Super Admin"
+
+
+def request_token_payload(request: Request) -> dict:
+    """Payload do JWT de acesso (assinatura verificada), ou {} sem token válido"""
+    authorization = request.headers.get("authorization", "")
+    if not authorization.lower().startswith("bearer "):
+        return {}
+    payload = decode_token(authorization[7:].strip())
+    if not payload or payload.get("type") != "access":
+        return {}
+    return payload
+
+
+def _trigger(request: Request, payload: dict) -> Optional[str]:
+    if request.headers.get(PROFILE_HEADER):
+        # Só Super Admin pode pedir o perfil pelo header (papel vem do JWT assinado)
+        return "header" if payload.get("role") == SUPER_ADMIN_ROLE else None
+    rule = match_rule(request.url.path, payload.get("company_id"))
+    return f"rule:{rule['id']}" if rule else None
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        if not settings.PROFILER_ENABLED or not (request.headers.get(PROFILE_HEADER) or load_rules()):
+            return await call_next(request)
+
+        payload = request_token_payload(request)
+        trigger = _trigger(request, payload)
+        if trigger is None:
+            return await call_next(request)
+
+        sampler = StackSampler(settings.PROFILER_INTERVAL_MS / 1000)
+        sampler.start()
+        try:
+            response = await call_next(request)
+        except Exception:
+            sampler.stop()
+            raise
+        elapsed = sampler.stop()
+
+        route = request.scope.get("route")
+        report_id = await run_in_threadpool(save_report, sampler, elapsed, request.scope.get("endpoint"), {
+            "method": request.method,
+            "path": request.url.path,
+            "route": getattr(route, "path", None),
+            "status_code": response.status_code,
+            "company_id": payload.get("company_id"),
+            "user_id": payload.get("user_id") or payload.get("sub"),
+            "trigger": trigger,
+        })
+        response.headers["X-Profile-Id"] = report_id
+        return response
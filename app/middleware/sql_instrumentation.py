@@ -0,0 +1,164 @@
+"""
+Instrumentação de SQL por requisição
+Conta comandos, soma o tempo de banco e agrupa comandos repetidos (fingerprint) da
+requisição atual. Expõe o resultado no header Server-Timing e em campos do log JSON,
+e aponta prováveis N+1 (mesmo comando executado mais que SQL_N_PLUS_ONE_THRESHOLD
+vezes) com o ponto do código que disparou a consulta.
+
+Só as requisições sorteadas (SQL_INSTRUMENTATION_SAMPLE_RATE) são medidas; nas demais
+os eventos do SQLAlchemy retornam logo na primeira linha.
+"""
+import logging
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["RequestSqlStats"]] = ContextVar("request_sql_stats", default=None)
+
+# Listas de IN expandidas e literais variam entre execuções do mesmo comando
+_IN_LIST_RE = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)\s*,)+\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)\s*\)")
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_SPACES_RE = re.compile(r"\s+")
+
+_SKIPPED_PATHS = (
+    os.sep + "sqlalchemy" + os.sep,
+    os.sep + "starlette" + os.sep,
+    os.sep + "anyio" + os.sep,
+    __file__,
+)
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Forma normalizada do comando: IN (?, ?, ?) vira IN (?) e números viram ?"""
+    normalized = _IN_LIST_RE.sub("(?)", statement)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    return _SPACES_RE.sub(" ", normalized).strip()
+
+
+def _call_site() -> Optional[str]:
+    """Primeiro frame fora do SQLAlchemy/Starlette: quem disparou a consulta"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not any(part in filename for part in _SKIPPED_PATHS):
+            return f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+class RequestSqlStats:
+    """Totais de SQL de uma requisição"""
+
+    __slots__ = ("statements", "duration", "fingerprints", "n_plus_one", "threshold")
+
+    def __init__(self, threshold: int):
+        self.statements = 0
+        self.duration = 0.0
+        self.fingerprints: Counter = Counter()
+        self.n_plus_one: Dict[str, dict] = {}
+        self.threshold = threshold
+
+    def record(self, statement: str, elapsed: float):
+        self.statements += 1
+        self.duration += elapsed
+
+        key = fingerprint(statement)
+        self.fingerprints[key] += 1
+        count = self.fingerprints[key]
+
+        # O ponto de chamada só é calculado uma vez, quando o limite é ultrapassado
+        if count == self.threshold + 1:
+            self.n_plus_one[key] = {"statement": key[:300], "call_site": _call_site()}
+        if key in self.n_plus_one:
+            self.n_plus_one[key]["count"] = count
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.statements} SQL"'
+
+    def log_fields(self) -> dict:
+        return {
+            "sql_count": self.statements,
+            "sql_time_ms": round(self.duration * 1000, 2),
+            "sql_distinct": len(self.fingerprints),
+            "sql_n_plus_one": list(self.n_plus_one.values()),
+        }
+
+
+def current_sql_stats() -> Optional[RequestSqlStats]:
+    return _current.get()
+
+
+@contextmanager
+def track_sql(threshold: Optional[int] = None):
+    """Mede o SQL executado no bloco (usado pelo middleware e por jobs/testes)"""
+    stats = RequestSqlStats(settings.SQL_N_PLUS_ONE_THRESHOLD if threshold is None else threshold)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is None:
+        return
+    conn.info.setdefault("sql_instrumentation_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    starts = conn.info.get("sql_instrumentation_start")
+    if not starts:
+        return
+    stats.record(statement, time.perf_counter() - starts.pop())
+
+
+class SqlInstrumentationMiddleware(BaseHTTPMiddleware):
+    """Ativa a medição nas requisições sorteadas e publica os totais"""
+
+    async def dispatch(self, request: Request, call_next):
+        if not settings.SQL_INSTRUMENTATION_ENABLED or random.random() >= settings.SQL_INSTRUMENTATION_SAMPLE_RATE:
+            return await call_next(request)
+
+        started = time.perf_counter()
+        with track_sql() as stats:
+            response = await call_next(request)
+        total = time.perf_counter() - started
+
+        response.headers.append("Server-Timing", stats.server_timing())
+        response.headers.append("Server-Timing", f"app;dur={total * 1000:.2f}")
+
+        fields = {
+            "method": request.method,
+            "path": request.url.path,
+            "status_code": response.status_code,
+            "duration_ms": round(total * 1000, 2),
+            **stats.log_fields(),
+        }
+        if stats.n_plus_one:
+            logger.warning("Possível N+1 na requisição", extra=fields)
+        else:
+            logger.info("SQL da requisição", extra=fields)
+
+        return response
@@ -16,6 +16,8 @@ class Customer(Base):
         UniqueConstraint('email', 'company_id', name='uq_customer_email_company'),
         # Constraint de CPF único por empresa
         UniqueConstraint('cpf', 'company_id', name='uq_customer_cpf_company'),
+        # Listagem por empresa com paginação por cursor (id)
+        Index('ix_customers_company_id_id', 'company_id', 'id'),
     )
     
     id = Column(Integer, primary_key=True, index=True)
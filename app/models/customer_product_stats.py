@@ -0,0 +1,28 @@
+"""
+Modelo CustomerProductStats - Produtos Comprados por Cliente
+Uma linha por (empresa, cliente, produto) com os totais das vendas concluídas.
+Mantido por create_sale/cancel_sale e usado em /sales/by-customer/{id}/products
+"""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+
+from app.core.database import Base
+from app.core.money import Money
+
+
+class CustomerProductStats(Base):
+    __tablename__ = "customer_product_stats"
+    __table_args__ = (
+        UniqueConstraint('company_id', 'customer_id', 'product_id', name='uq_customer_product_stats'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Multi-tenant
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+
+    times_purchased = Column(Integer, nullable=False, default=0)  # Itens de venda com o produto
+    total_quantity = Column(Integer, nullable=False, default=0)
+    total_spent = Column(Money, nullable=False, default=0.0)
+    last_purchase_date = Column(DateTime, nullable=True)
@@ -0,0 +1,38 @@
+"""
+Modelo IdempotencyKey - Chaves de Idempotência
+Guarda a primeira resposta de POST /sales e POST /installment-payments por
+Idempotency-Key, para que reenvios do cliente não repitam a operação
+"""
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, UniqueConstraint, func
+import enum
+
+from app.core.database import Base
+
+
+class IdempotencyStatus(str, enum.Enum):
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # Uma chave por empresa e endpoint; o INSERT concorrente perde na constraint
+        UniqueConstraint('company_id', 'endpoint', 'key', name='uq_idempotency_company_endpoint_key'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Multi-tenant
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+
+    key = Column(String(255), nullable=False)
+    endpoint = Column(String(100), nullable=False)
+    request_hash = Column(String(64), nullable=False)  # SHA-256 do corpo da requisição
+
+    status = Column(Enum(IdempotencyStatus), default=IdempotencyStatus.IN_PROGRESS, nullable=False)
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)  # JSON da primeira resposta
+
+    created_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,52 @@
+"""
+Modelo ImportJob - Jobs de Importação de Produtos em Background
+Guarda o progresso e o resultado final de cada importação via CSV
+"""
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, func
+from sqlalchemy.orm import relationship
+import enum
+
+from app.core.database import Base
+
+
+class ImportJobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Multi-tenant
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    # Arquivo enviado (salvo em disco até o fim do processamento)
+    filename = Column(String(255), nullable=False)
+    file_path = Column(String(500), nullable=True)
+    encoding = Column(String(20), default="utf-8-sig")
+
+    status = Column(Enum(ImportJobStatus), default=ImportJobStatus.PENDING, nullable=False)
+
+    # Progresso
+    estimated_rows = Column(Integer, default=0)
+    processed_rows = Column(Integer, default=0)
+    success_count = Column(Integer, default=0)
+    error_count = Column(Integer, default=0)
+
+    errors = Column(Text, nullable=True)  # JSON com os erros por linha (limitado)
+    result = Column(Text, nullable=True)  # JSON com o resultado final (mesmo formato da importação síncrona)
+    error_message = Column(Text, nullable=True)  # Falha fatal do job
+
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    # Relacionamentos
+    company = relationship("Company")
+    user = relationship("User")
@@ -1,11 +1,15 @@
 """
 Modelo Installment - Parcelas de Crediário
 """
-from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, Enum, Date, func
+from datetime import date
+
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum, Date, Index, and_, case, func, literal
+from sqlalchemy.ext.hybrid import hybrid_method, hybrid_property
 from sqlalchemy.orm import relationship
 import enum
 
 from app.core.database import Base
+from app.core.money import Money
 
 
 class InstallmentStatus(str, enum.Enum):
@@ -15,8 +19,17 @@ class InstallmentStatus(str, enum.Enum):
     CANCELLED = "cancelled"
 
 
+# Parcelas em aberto: viram OVERDUE na leitura quando due_date < hoje
+OPEN_STATUSES = (InstallmentStatus.PENDING, InstallmentStatus.OVERDUE)
+
+
 class Installment(Base):
     __tablename__ = "installments"
+    __table_args__ = (
+        Index('ix_installments_company_status_due_date', 'company_id', 'status', 'due_date'),
+        Index('ix_installments_customer_due_date', 'customer_id', 'due_date'),
+        Index('ix_installments_sale_id', 'sale_id'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -25,7 +38,7 @@ class Installment(Base):
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     
     installment_number = Column(Integer, nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)
     
     due_date = Column(Date, nullable=False)
     paid_at = Column(DateTime, nullable=True)
@@ -35,8 +48,52 @@ class Installment(Base):
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     
+    # Controle otimista de concorrência: todo UPDATE pelo ORM confere e incrementa a versão
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
+    __mapper_args__ = {"version_id_col": version}
+    
     # Relacionamentos
     sale = relationship("Sale", back_populates="installments")
     customer = relationship("Customer", back_populates="installments")
     company = relationship("Company")
     payments = relationship("InstallmentPayment", back_populates="installment", cascade="all, delete-orphan")
+    
+    @hybrid_property
+    def is_overdue(self) -> bool:
+        """Em aberto e com vencimento anterior a hoje (não depende do job noturno)"""
+        return self.status in OPEN_STATUSES and self.due_date < date.today()
+    
+    @is_overdue.expression
+    def is_overdue(cls):
+        # status IN (...) AND due_date < hoje: usa ix_installments_company_status_due_date
+        return and_(cls.status.in_(OPEN_STATUSES), cls.due_date < date.today())
+    
+    @hybrid_property
+    def effective_status(self) -> InstallmentStatus:
+        """Status calculado na leitura: PENDING/OVERDUE conforme o vencimento, demais como gravados"""
+        if self.status in OPEN_STATUSES:
+            return InstallmentStatus.OVERDUE if self.due_date < date.today() else InstallmentStatus.PENDING
+        return self.status
+    
+    @effective_status.expression
+    def effective_status(cls):
+        # Para ordenação e agregação (GROUP BY); em filtros prefira has_status()
+        return case(
+            (cls.is_overdue, literal(InstallmentStatus.OVERDUE, cls.status.type)),
+            (cls.status.in_(OPEN_STATUSES), literal(InstallmentStatus.PENDING, cls.status.type)),
+            else_=cls.status
+        )
+    
+    @hybrid_method
+    def has_status(self, status: InstallmentStatus) -> bool:
+        return self.effective_status == status
+    
+    @has_status.expression
+    def has_status(cls, status: InstallmentStatus):
+        """Filtro pelo status calculado, escrito para aproveitar o índice (company_id, status, due_date)"""
+        if status == InstallmentStatus.OVERDUE:
+            return cls.is_overdue
+        if status == InstallmentStatus.PENDING:
+            return and_(cls.status.in_(OPEN_STATUSES), cls.due_date >= date.today())
+        return cls.status == status
@@ -2,11 +2,12 @@
 Modelo InstallmentPayment - Registro de Pagamentos Parciais de Parcelas
 Permite que um cliente pague uma parcela em múltiplas vezes (parcialmente)
 """
-from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, Enum, String, func
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum, Index, String, func
 from sqlalchemy.orm import relationship
 import enum
 
 from app.core.database import Base
+from app.core.money import Money
 
 
 class InstallmentPaymentStatus(str, enum.Enum):
@@ -23,6 +24,9 @@ class InstallmentPayment(Base):
     Exemplo: Parcela de R$ 200,00 pode ter 2 pagamentos de R$ 100,00
     """
     __tablename__ = "installment_payments"
+    __table_args__ = (
+        Index('ix_installment_payments_installment_id', 'installment_id'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -31,7 +35,7 @@ class InstallmentPayment(Base):
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     
     # Dados do pagamento
-    amount_paid = Column(Float, nullable=False)  # Valor pago nesta transação
+    amount_paid = Column(Money, nullable=False)  # Valor pago nesta transação
     
     # payment_method = Column(String(50), default="cash")
     
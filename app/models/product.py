@@ -2,7 +2,7 @@
 Modelo Product - Produtos
 Cada produto pertence a uma empresa
 """
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, func, CheckConstraint
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, func, CheckConstraint, Index, text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -14,6 +14,11 @@ class Product(Base):
     __table_args__ = (
         CheckConstraint('stock_quantity >= 0', name='check_stock_non_negative'),
         CheckConstraint('min_stock >= 0', name='check_min_stock_non_negative'),
+        # Parcial: estoque baixo só consulta produtos ativos
+        Index('ix_products_company_active_stock', 'company_id', 'stock_quantity',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active')),
+        # Busca e listagem do catálogo (ordenadas por nome)
+        Index('ix_products_company_name', 'company_id', 'name'),
     )
     
     id = Column(Integer, primary_key=True, index=True)
@@ -0,0 +1,29 @@
+"""
+Modelo ProductDailySales - Consolidado Diário de Vendas por Produto
+Uma linha por (empresa, produto, dia) com os totais das vendas não canceladas.
+Mantido por create_sale/cancel_sale e usado pelos rankings de produtos mais vendidos
+"""
+from sqlalchemy import Column, Integer, Date, ForeignKey, Index, UniqueConstraint
+
+from app.core.database import Base
+from app.core.money import Money
+
+
+class ProductDailySales(Base):
+    __tablename__ = "product_daily_sales"
+    __table_args__ = (
+        UniqueConstraint('company_id', 'product_id', 'day', name='uq_product_daily_sales_company_product_day'),
+        Index('ix_product_daily_sales_company_day', 'company_id', 'day'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Multi-tenant
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    day = Column(Date, nullable=False)  # Data de Sale.created_at
+
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Money, nullable=False, default=0.0)  # Soma de SaleItem.total_price
+    cost = Column(Money, nullable=False, default=0.0)  # Soma do custo histórico dos itens
+    sale_count = Column(Integer, nullable=False, default=0)  # Vendas distintas com o produto
@@ -0,0 +1,41 @@
+"""
+Modelo ReceivablesAgingSnapshot - Aging de Contas a Receber
+Foto diária, por empresa, do saldo em aberto das parcelas por faixa de atraso
+"""
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, UniqueConstraint, func
+
+from app.core.database import Base
+from app.core.money import Money
+
+
+class ReceivablesAgingSnapshot(Base):
+    __tablename__ = "receivables_aging_snapshots"
+    __table_args__ = (
+        UniqueConstraint('company_id', 'snapshot_date', name='uq_receivables_aging_company_date'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Multi-tenant
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    snapshot_date = Column(Date, nullable=False, index=True)
+
+    # A vencer (vencimento depois da data do snapshot)
+    future_count = Column(Integer, nullable=False, default=0)
+    future_amount = Column(Money, nullable=False, default=0.0)
+
+    # Vence na data do snapshot
+    current_count = Column(Integer, nullable=False, default=0)
+    current_amount = Column(Money, nullable=False, default=0.0)
+
+    # Vencidas, por dias de atraso
+    days_1_30_count = Column(Integer, nullable=False, default=0)
+    days_1_30_amount = Column(Money, nullable=False, default=0.0)
+    days_31_60_count = Column(Integer, nullable=False, default=0)
+    days_31_60_amount = Column(Money, nullable=False, default=0.0)
+    days_61_90_count = Column(Integer, nullable=False, default=0)
+    days_61_90_amount = Column(Money, nullable=False, default=0.0)
+    days_90_plus_count = Column(Integer, nullable=False, default=0)
+    days_90_plus_amount = Column(Money, nullable=False, default=0.0)
+
+    created_at = Column(DateTime, server_default=func.now())
@@ -2,11 +2,12 @@
 Modelo Sale e SaleItem - Vendas
 Suporta vendas à vista (cash), crediário (credit) e PIX
 """
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum, func
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Index, func
 from sqlalchemy.orm import relationship
 import enum
 
 from app.core.database import Base
+from app.core.money import Money
 
 
 class PaymentType(str, enum.Enum):
@@ -23,6 +24,11 @@ class SaleStatus(str, enum.Enum):
 
 class Sale(Base):
     __tablename__ = "sales"
+    __table_args__ = (
+        Index('ix_sales_company_status_created_at', 'company_id', 'status', 'created_at'),
+        Index('ix_sales_company_created_at', 'company_id', 'created_at'),
+        Index('ix_sales_customer_created_at', 'customer_id', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -36,9 +42,13 @@ class Sale(Base):
     status = Column(Enum(SaleStatus), default=SaleStatus.PENDING)
     
     # Valores
-    subtotal = Column(Float, default=0.0)
-    discount_amount = Column(Float, default=0.0)
-    total_amount = Column(Float, nullable=False)
+    subtotal = Column(Money, default=0.0)
+    discount_amount = Column(Money, default=0.0)
+    total_amount = Column(Money, nullable=False)
+    
+    # Snapshot de custo e lucro gravado na criação da venda (evita recalcular pelos itens)
+    total_cost = Column(Money, nullable=True)
+    total_profit = Column(Money, nullable=True)
     
     # Crediário
     installments_count = Column(Integer, default=1)
@@ -61,7 +71,13 @@ class Sale(Base):
         """
         Calcula o lucro real da venda
         Fórmula: Soma(preço_vendido - preço_custo) por cada item
+        
+        Usa o valor gravado em total_profit quando existir; o cálculo pelos
+        itens fica apenas para vendas sem snapshot.
         """
+        if self.total_profit is not None:
+            return self.total_profit
+        
         total_profit = 0.0
         for item in self.items:
             # unit_price é o preço pelo qual foi vendido (normal ou promocional)
@@ -88,6 +104,10 @@ class Sale(Base):
 
 class SaleItem(Base):
     __tablename__ = "sale_items"
+    __table_args__ = (
+        Index('ix_sale_items_sale_id', 'sale_id'),
+        Index('ix_sale_items_product_id', 'product_id'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -95,12 +115,12 @@ class SaleItem(Base):
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     
     quantity = Column(Integer, nullable=False)
-    unit_price = Column(Float, nullable=False)
-    total_price = Column(Float, nullable=False)
+    unit_price = Column(Money, nullable=False)
+    total_price = Column(Money, nullable=False)
     
     # Relacionamentos
     sale = relationship("Sale", back_populates="items")
     product = relationship("Product", back_populates="sale_items")
     
     # Historico de custo e lucro
-    unit_cost_price = Column(Float, nullable=True, default=0.0)  # Custo unitário no momento da venda
+    unit_cost_price = Column(Money, nullable=True, default=0.0)  # Custo unitário no momento da venda
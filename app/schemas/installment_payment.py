@@ -3,7 +3,7 @@ Schemas Pydantic para InstallmentPayment
 Pagamentos parciais de parcelas
 """
 from pydantic import BaseModel, Field, ConfigDict, computed_field, field_validator, model_validator, field_serializer
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 from app.models.installment_payment import InstallmentPaymentStatus
 from app.core.datetime_utils import localize_to_fortaleza
@@ -68,6 +68,37 @@ class InstallmentPaymentCreate(BaseModel):
     )
 
 
+class PaymentAllocationCreate(BaseModel):
+    """
+    Schema para distribuir um valor recebido entre as parcelas em aberto do cliente,
+    da mais antiga para a mais nova (FIFO por vencimento).
+    """
+    customer_id: int = Field(description="ID do cliente", examples=[12])
+    amount: float = Field(description="Valor recebido", gt=0, examples=[250.00])
+
+    model_config = ConfigDict(extra='forbid')
+
+
+class PaymentAllocationItem(BaseModel):
+    """Parte do valor aplicada em uma parcela"""
+    payment_id: int
+    installment_id: int
+    sale_id: int
+    installment_number: int
+    due_date: date
+    amount_paid: float = Field(description="Valor aplicado nesta parcela")
+    remaining_amount: float = Field(description="Saldo da parcela após o pagamento")
+    status: str
+
+
+class PaymentAllocationOut(BaseModel):
+    """Resultado da distribuição do valor recebido"""
+    customer_id: int
+    amount: float
+    remaining_debt: float = Field(description="Saldo devedor do cliente após o pagamento")
+    allocations: list[PaymentAllocationItem]
+
+
 class InstallmentPaymentOut(BaseModel):
     """Schema para retornar dados de um pagamento"""
     id: int
@@ -1,6 +1,15 @@
-from typing import Generic, TypeVar, List
+from typing import Generic, TypeVar, List, Optional, Sequence
 from pydantic import BaseModel, Field, ConfigDict
 from math import ceil
+from datetime import date, datetime
+import base64
+import json
+
+from fastapi import HTTPException, status
+from sqlalchemy import literal, tuple_, text
+
+from app.core.cache import TTLCache
+from app.core.metrics import record_cache
 
 T = TypeVar('T')
 
@@ -12,6 +21,7 @@ class PaginationMetadata(BaseModel):
     total_pages: int = Field(..., description="Total de páginas")
     has_next: bool = Field(..., description="Tem próxima página")
     has_prev: bool = Field(..., description="Tem página anterior")
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página (modo cursor)")
 
 class PaginatedResponse(BaseModel, Generic[T]):
     """Resposta paginada genérica"""
@@ -21,21 +31,27 @@ class PaginatedResponse(BaseModel, Generic[T]):
     total: int = Field(..., description="Total de registros")
     metadata: PaginationMetadata = Field(..., description="Metadados de paginação")
 
-def paginate(data: List[T], total: int, skip: int, limit: int) -> dict:
+def paginate(data: List[T], total: Optional[int], skip: int, limit: int, has_next: Optional[bool] = None) -> dict:
     """
     Função auxiliar para criar resposta paginada
     
     Args:
         data: Lista de dados da página atual
-        total: Total de registros no banco
+        total: Total de registros no banco (None quando with_total=false)
         skip: Quantidade de registros pulados
         limit: Quantidade de registros por página
+        has_next: Se informado (fetch_page com limit+1), prevalece sobre o cálculo pelo total
     
     Returns:
         Dicionário com items e metadata (compatível com testes)
     """
     page = (skip // limit) + 1 if limit > 0 else 1
-    total_pages = ceil(total / limit) if limit > 0 else 1
+    total_pages = None
+    if total is not None:
+        total_pages = ceil(total / limit) if limit > 0 else 1
+    
+    if has_next is None:
+        has_next = total_pages is not None and page < total_pages
     
     return {
         "items": data,
@@ -45,7 +61,191 @@ def paginate(data: List[T], total: int, skip: int, limit: int) -> dict:
             "page": page,
             "per_page": limit,
             "total_pages": total_pages,
-            "has_next": page < total_pages,
+            "has_next": has_next,
             "has_prev": page > 1
         }
     }
+
+
+# ============================================
+# TOTAIS OPCIONAIS / ESTIMADOS
+# ============================================
+
+ESTIMATE_CACHE_TTL = 60  # segundos
+ESTIMATE_CACHE_MAXSIZE = 1024  # consultas distintas (filtros/páginas) guardadas
+_estimate_cache = TTLCache(ESTIMATE_CACHE_MAXSIZE, ESTIMATE_CACHE_TTL)
+
+
+def estimate_count(query) -> int:
+    """
+    Total aproximado usando as estatísticas do planner do PostgreSQL (EXPLAIN),
+    sem percorrer as linhas. O valor fica em cache por ESTIMATE_CACHE_TTL segundos
+    (no máximo ESTIMATE_CACHE_MAXSIZE consultas).
+    Em outros bancos (ex: SQLite nos testes) ou em caso de erro, usa COUNT(*) exato.
+    """
+    bind = query.session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return query.count()
+
+    try:
+        sql = str(query.enable_eagerloads(False).statement.compile(bind, compile_kwargs={"literal_binds": True}))
+    except Exception:
+        return query.count()
+
+    cached = _estimate_cache.get(sql)
+    record_cache("count_estimate", cached is not None)
+    if cached is not None:
+        return cached
+
+    try:
+        plan = query.session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+    except Exception:
+        return query.count()
+
+    _estimate_cache.set(sql, estimate)
+    return estimate
+
+
+def fetch_page(query, skip: int, limit: Optional[int], with_total: bool = True,
+               estimate_total: bool = False) -> tuple[list, Optional[int], Optional[bool]]:
+    """
+    Busca uma página no modo OFFSET, com o total opcional.
+
+    - with_total=True (padrão): COUNT(*) exato, como antes
+    - estimate_total=True: total aproximado (estimate_count) e has_next via limit+1
+    - with_total=False: sem COUNT(*); has_next via limit+1 e total None
+
+    Returns:
+        (itens, total, has_next) — has_next None significa "calcular pelo total"
+    """
+    query = query.offset(skip)
+
+    if limit is None:
+        items = query.all()
+        if items or skip == 0:
+            # Todos os registros restantes já foram lidos: total exato sem COUNT(*)
+            return items, skip + len(items), False
+        return items, (query.offset(None).count() if with_total else None), False
+
+    if with_total and not estimate_total:
+        return query.limit(limit).all(), query.offset(None).count(), None
+
+    items = query.limit(limit + 1).all()
+    has_next = len(items) > limit
+    items = items[:limit]
+
+    total = estimate_count(query.offset(None)) if with_total else None
+    return items, total, has_next
+
+
+# ============================================
+# PAGINAÇÃO POR CURSOR (KEYSET)
+# ============================================
+# Em vez de OFFSET + COUNT(*), filtra a partir da última chave retornada
+# (ex: (created_at, id)). O custo de cada página não cresce com a profundidade.
+# As chaves de ordenação não podem ser nulas e a última deve ser única (id).
+
+DEFAULT_CURSOR_LIMIT = 50
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Codifica os valores das chaves de ordenação em um cursor opaco (base64)"""
+    encoded = []
+    for value in values:
+        if isinstance(value, datetime):
+            encoded.append({"dt": value.isoformat()})
+        elif isinstance(value, date):
+            encoded.append({"d": value.isoformat()})
+        else:
+            encoded.append(value)
+    raw = json.dumps(encoded, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Decodifica o cursor. Levanta ValueError se estiver malformado"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        encoded = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Cursor inválido")
+
+    if not isinstance(encoded, list) or len(encoded) != size:
+        raise ValueError("Cursor inválido")
+
+    values = []
+    for value in encoded:
+        if isinstance(value, dict) and "dt" in value:
+            values.append(datetime.fromisoformat(value["dt"]))
+        elif isinstance(value, dict) and "d" in value:
+            values.append(date.fromisoformat(value["d"]))
+        elif isinstance(value, (int, float, str)):
+            values.append(value)
+        else:
+            raise ValueError("Cursor inválido")
+    return values
+
+
+def keyset_paginate(query, sort_columns: Sequence, cursor: Optional[str], limit: Optional[int],
+                    descending: bool = False) -> tuple[list, Optional[str]]:
+    """
+    Aplica paginação por cursor em uma query ORM.
+
+    Args:
+        query: Query já filtrada (a ordenação é substituída pelas chaves)
+        sort_columns: Colunas de ordenação, terminando em uma chave única (ex: Sale.created_at, Sale.id)
+        cursor: Cursor recebido do cliente ("" ou None = primeira página)
+        limit: Registros por página (padrão: DEFAULT_CURSOR_LIMIT)
+        descending: Ordenação decrescente em todas as chaves
+
+    Returns:
+        (itens da página, cursor da próxima página ou None)
+    """
+    limit = limit or DEFAULT_CURSOR_LIMIT
+
+    if cursor:
+        try:
+            values = decode_cursor(cursor, len(sort_columns))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor de paginação inválido"
+            )
+        keys = tuple_(*sort_columns)
+        bound = tuple_(*[literal(value, type_=column.type) for value, column in zip(values, sort_columns)])
+        query = query.filter(keys < bound if descending else keys > bound)
+
+    order = [column.desc() if descending else column.asc() for column in sort_columns]
+    items = query.order_by(None).order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in sort_columns])
+
+    return items, next_cursor
+
+
+def paginate_cursor(data: List[T], limit: Optional[int], next_cursor: Optional[str], cursor: Optional[str]) -> dict:
+    """
+    Resposta do modo cursor com o mesmo formato de paginate().
+    O total não é calculado (evita o COUNT(*)), então total/page/total_pages vêm nulos.
+    """
+    return {
+        "items": data,
+        "total": None,
+        "next_cursor": next_cursor,
+        "metadata": {
+            "total": None,
+            "page": None,
+            "per_page": limit or DEFAULT_CURSOR_LIMIT,
+            "total_pages": None,
+            "has_next": next_cursor is not None,
+            "has_prev": bool(cursor),
+            "next_cursor": next_cursor
+        }
+    }
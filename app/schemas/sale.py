@@ -20,6 +20,33 @@ class SaleCreate(BaseModel):
     notes: Optional[str] = None
 
 
+MAX_SALES_PER_BATCH = 500
+
+
+class SaleBatchEntry(SaleCreate):
+    client_reference: Optional[str] = Field(default=None, max_length=100)  # Identificador da venda no PDV
+
+
+class SaleBatchCreate(BaseModel):
+    sales: List[SaleBatchEntry] = Field(min_length=1, max_length=MAX_SALES_PER_BATCH)
+    all_or_nothing: bool = False
+
+
+class SaleBatchResult(BaseModel):
+    index: int
+    client_reference: Optional[str] = None
+    status: str  # created | rejected | skipped
+    sale_id: Optional[int] = None
+    total_amount: Optional[float] = None
+    error: Optional[str] = None
+
+
+class SaleBatchResponse(BaseModel):
+    created: int
+    rejected: int
+    results: List[SaleBatchResult]
+
+
 class ProductInSaleItem(BaseModel):
     """Dados do produto no item de venda"""
     id: int
@@ -0,0 +1,172 @@
+"""
+Serviço de Previsão de Recebimentos (fluxo de caixa do crediário)
+Soma o saldo em aberto das parcelas por data de vencimento em uma consulta
+agrupada e distribui em faixas de dia, semana ou mês. Parcelas já vencidas entram
+na faixa atual. O resultado fica em cache por empresa até a próxima escrita em
+parcelas ou pagamentos (ou até CASH_FLOW_CACHE_TTL_SECONDS).
+"""
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import Numeric, case, event, func, literal
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.models.installment import Installment, InstallmentStatus
+from app.models.installment_payment import InstallmentPayment, InstallmentPaymentStatus
+
+GRANULARITIES = ("day", "week", "month")
+
+# Chave inclui a data (as_of): entradas de dias anteriores vencem pelo TTL e
+# saem do cache a cada gravação
+FORECAST_CACHE_MAXSIZE = 512
+_forecast_cache = TTLCache(FORECAST_CACHE_MAXSIZE, settings.CASH_FLOW_CACHE_TTL_SECONDS)
+
+
+# ============================================
+# INVALIDAÇÃO DO CACHE
+# ============================================
+
+def invalidate_forecast_cache(company_id: Optional[int] = None) -> None:
+    """Remove as previsões em cache de uma empresa (ou de todas)"""
+    if company_id is None:
+        _forecast_cache.clear()
+        return
+    for key in [key for key in _forecast_cache.keys() if key[0] == company_id]:
+        _forecast_cache.pop(key)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_receivable_writes(session, flush_context):
+    companies = session.info.setdefault("cash_flow_dirty", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (Installment, InstallmentPayment)):
+            companies.add(obj.company_id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_receivable_writes(orm_execute_state):
+    # INSERT/UPDATE/DELETE em lote não passam pelo flush: invalida todas as empresas
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in (Installment, InstallmentPayment):
+        orm_execute_state.session.info.setdefault("cash_flow_dirty", set()).add(None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    companies = session.info.pop("cash_flow_dirty", None)
+    if not companies:
+        return
+    if None in companies:
+        invalidate_forecast_cache()
+    else:
+        for company_id in companies:
+            invalidate_forecast_cache(company_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("cash_flow_dirty", None)
+
+
+# ============================================
+# CÁLCULO
+# ============================================
+
+def _bucket_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(start: date, granularity: str) -> date:
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return date(start.year + 1, 1, 1) if start.month == 12 else date(start.year, start.month + 1, 1)
+    return start + timedelta(days=1)
+
+
+def _compute_forecast(db: Session, company_id: int, granularity: str, periods: int, as_of: date) -> dict:
+    starts = [_bucket_start(as_of, granularity)]
+    for _ in range(periods):
+        starts.append(_next_bucket(starts[-1], granularity))
+    first_start, horizon_end = starts[0], starts[-1]
+
+    paid = db.query(
+        InstallmentPayment.installment_id.label("installment_id"),
+        func.sum(InstallmentPayment.amount_paid).label("total_paid")
+    ).filter(
+        InstallmentPayment.company_id == company_id,
+        InstallmentPayment.status == InstallmentPaymentStatus.COMPLETED
+    ).group_by(InstallmentPayment.installment_id).subquery()
+
+    remaining = Installment.amount - func.coalesce(paid.c.total_paid, 0.0)
+    # Vencidas (antes de hoje) são esperadas hoje, na faixa atual
+    expected_date = case((Installment.due_date < as_of, as_of), else_=Installment.due_date)
+    is_overdue = case((Installment.due_date < as_of, 1), else_=0)
+
+    rows = db.query(
+        expected_date.label("expected_date"),
+        func.count(Installment.id),
+        func.sum(remaining),
+        func.sum(remaining * is_overdue)
+    ).outerjoin(
+        paid, paid.c.installment_id == Installment.id
+    ).filter(
+        Installment.company_id == company_id,
+        Installment.status.in_([InstallmentStatus.PENDING, InstallmentStatus.OVERDUE]),
+        Installment.due_date < horizon_end,
+        # Literal Numeric: comparado ao tipo Money, 0.005 seria arredondado para 0.01
+        remaining > literal(0.005, Numeric())
+    ).group_by("expected_date").all()
+
+    buckets = [
+        {"start": start, "end": end - timedelta(days=1), "installments_count": 0, "expected_amount": 0.0}
+        for start, end in zip(starts, starts[1:])
+    ]
+    overdue_amount = 0.0
+
+    for expected, count, amount, overdue in rows:
+        if isinstance(expected, str):  # SQLite devolve a expressão CASE como texto
+            expected = date.fromisoformat(expected)
+        index = 0
+        while index + 1 < len(buckets) and expected >= buckets[index + 1]["start"]:
+            index += 1
+        buckets[index]["installments_count"] += count
+        buckets[index]["expected_amount"] += amount or 0.0
+        overdue_amount += overdue or 0.0
+
+    for bucket in buckets:
+        bucket["expected_amount"] = round(bucket["expected_amount"], 2)
+
+    return {
+        "granularity": granularity,
+        "as_of": as_of,
+        "periods": periods,
+        "overdue_amount": round(overdue_amount, 2),
+        "total_expected": round(sum(bucket["expected_amount"] for bucket in buckets), 2),
+        "buckets": buckets
+    }
+
+
+def get_cash_flow_forecast(db: Session, company_id: int, granularity: str = "week", periods: int = 12,
+                           as_of: Optional[date] = None) -> dict:
+    """Previsão de recebimentos por faixa; usa o cache da empresa quando válido"""
+    as_of = as_of or date.today()
+    key = (company_id, granularity, periods, as_of)
+
+    cached = _forecast_cache.get(key)
+    record_cache("cash_flow_forecast", cached is not None)
+    if cached is not None:
+        return {**cached, "cached": True}
+
+    forecast = _compute_forecast(db, company_id, granularity, periods, as_of)
+    _forecast_cache.set(key, forecast)
+    return {**forecast, "cached": False}
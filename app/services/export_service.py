@@ -0,0 +1,223 @@
+"""
+Serviço de Exportação de Catálogo e Clientes em CSV
+As linhas são lidas com cursor do lado do servidor (stream_results + yield_per)
+e escritas em blocos, mantendo a memória limitada mesmo com 100k+ registros.
+"""
+import csv
+import io
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.money import balance_from_totals
+from app.models.category import Category
+from app.models.customer import Customer
+from app.models.installment import Installment, InstallmentStatus
+from app.models.installment_payment import InstallmentPayment, InstallmentPaymentStatus
+from app.models.product import Product
+
+# Mesmo cabeçalho da importação, permitindo reimportar o arquivo exportado
+PRODUCT_EXPORT_HEADER = [
+    'nome', 'marca', 'categoria', 'descricao', 'preco_custo', 'preco_venda',
+    'estoque', 'estoque_minimo', 'sku', 'codigo_barras', 'ativo', 'em_promocao',
+    'preco_promocional'
+]
+
+CUSTOMER_EXPORT_HEADER = ['id', 'nome', 'email', 'telefone', 'cpf', 'endereco', 'ativo', 'criado_em']
+CUSTOMER_DEBT_HEADER = ['total_debito', 'total_vencido']
+
+# Prefixos interpretados como fórmula por Excel/LibreOffice
+FORMULA_PREFIXES = ('=', '+', '-', '@')
+
+
+def _safe_text(value) -> str:
+    """Evita injeção de fórmulas ao abrir o CSV em planilhas"""
+    if value is None:
+        return ''
+    text = str(value)
+    if text.startswith(FORMULA_PREFIXES):
+        return "'" + text
+    return text
+
+
+def _format_bool(value) -> str:
+    return 'true' if value else 'false'
+
+
+def _format_money(value) -> str:
+    return f"{float(value):.2f}" if value is not None else ''
+
+
+def iter_csv(header: Sequence[str], rows: Iterable[Sequence], delimiter: str = ',') -> Iterator[bytes]:
+    """
+    Gera o CSV em blocos de bytes (UTF-8 com BOM, reconhecido pelo Excel).
+    Cada bloco corresponde a um lote de linhas lido do banco.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator='\n')
+
+    buffer.write('\ufeff')
+    writer.writerow(header)
+
+    written = 0
+    for row in rows:
+        writer.writerow(row)
+        written += 1
+        if written % settings.EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    remaining = buffer.getvalue()
+    if remaining:
+        yield remaining.encode('utf-8')
+
+
+def _stream(db: Session, stmt):
+    """Executa o SELECT com cursor do lado do servidor, lendo EXPORT_BATCH_SIZE linhas por vez"""
+    return db.execute(
+        stmt.execution_options(stream_results=True, yield_per=settings.EXPORT_BATCH_SIZE)
+    )
+
+
+def iter_product_rows(
+    session_factory: Callable[[], Session],
+    company_id: int,
+    active_only: bool = False
+) -> Iterator[List[str]]:
+    """Linhas do catálogo de produtos (com nome da categoria, estoque e preços)"""
+    db = session_factory()
+    try:
+        stmt = (
+            select(
+                Product.name,
+                Product.brand,
+                Category.name,
+                Product.description,
+                Product.cost_price,
+                Product.sale_price,
+                Product.stock_quantity,
+                Product.min_stock,
+                Product.sku,
+                Product.barcode,
+                Product.is_active,
+                Product.is_on_sale,
+                Product.promotional_price,
+            )
+            .outerjoin(Category, Category.id == Product.category_id)
+            .where(Product.company_id == company_id)
+            .order_by(Product.id)
+        )
+        if active_only:
+            stmt = stmt.where(Product.is_active == True)
+
+        for row in _stream(db, stmt):
+            yield [
+                _safe_text(row[0]),
+                _safe_text(row[1]),
+                _safe_text(row[2]),
+                _safe_text(row[3]),
+                _format_money(row[4]),
+                _format_money(row[5]),
+                row[6] or 0,
+                row[7] or 0,
+                _safe_text(row[8]),
+                _safe_text(row[9]),
+                _format_bool(row[10]),
+                _format_bool(row[11]),
+                _format_money(row[12]),
+            ]
+    finally:
+        db.close()
+
+
+def _load_debts(db: Session, company_id: int, customer_ids: List[int]) -> Dict[int, tuple[float, float]]:
+    """
+    Calcula débito total e vencido de um lote de clientes com uma única consulta.
+    O total pago de cada parcela é agregado no banco; o arredondamento segue
+    _calculate_installment_balance (mesmos valores de GET /customers).
+    """
+    paid_subquery = (
+        select(
+            InstallmentPayment.installment_id.label('installment_id'),
+            func.sum(InstallmentPayment.amount_paid).label('total_paid')
+        )
+        .where(
+            InstallmentPayment.company_id == company_id,
+            InstallmentPayment.status == InstallmentPaymentStatus.COMPLETED
+        )
+        .group_by(InstallmentPayment.installment_id)
+        .subquery()
+    )
+
+    stmt = (
+        select(
+            Installment.customer_id,
+            Installment.amount,
+            Installment.is_overdue,
+            func.coalesce(paid_subquery.c.total_paid, 0)
+        )
+        .outerjoin(paid_subquery, paid_subquery.c.installment_id == Installment.id)
+        .where(
+            Installment.company_id == company_id,
+            Installment.customer_id.in_(customer_ids),
+            Installment.status.in_([InstallmentStatus.PENDING, InstallmentStatus.OVERDUE])
+        )
+    )
+
+    debts: Dict[int, list] = defaultdict(lambda: [0.0, 0.0])
+    for customer_id, amount, is_overdue, total_paid in db.execute(stmt):
+        _, remaining = balance_from_totals(amount, float(total_paid))
+        debts[customer_id][0] += remaining
+        if is_overdue:
+            debts[customer_id][1] += remaining
+
+    return {customer_id: (values[0], values[1]) for customer_id, values in debts.items()}
+
+
+def iter_customer_rows(
+    session_factory: Callable[[], Session],
+    company_id: int,
+    include_debt: bool = False
+) -> Iterator[List]:
+    """Linhas da lista de clientes; com include_debt, o débito é calculado por lote"""
+    db = session_factory()
+    try:
+        stmt = (
+            select(
+                Customer.id,
+                Customer.name,
+                Customer.email,
+                Customer.phone,
+                Customer.cpf,
+                Customer.address,
+                Customer.is_active,
+                Customer.created_at,
+            )
+            .where(Customer.company_id == company_id)
+            .order_by(Customer.id)
+        )
+
+        for batch in _stream(db, stmt).partitions():
+            debts = _load_debts(db, company_id, [row[0] for row in batch]) if include_debt else {}
+
+            for row in batch:
+                line = [
+                    row[0],
+                    _safe_text(row[1]),
+                    _safe_text(row[2]),
+                    _safe_text(row[3]),
+                    _safe_text(row[4]),
+                    _safe_text(row[5]),
+                    _format_bool(row[6]),
+                    row[7].isoformat() if row[7] else '',
+                ]
+                if include_debt:
+                    total_debt, total_due = debts.get(row[0], (0.0, 0.0))
+                    line += [_format_money(total_debt), _format_money(total_due)]
+                yield line
+    finally:
+        db.close()
@@ -0,0 +1,166 @@
+"""
+Serviço de Idempotência (header Idempotency-Key)
+A primeira requisição com a chave executa a operação e guarda a resposta;
+reenvios devolvem a resposta guardada sem tocar em produtos ou parcelas.
+Duplicatas concorrentes esperam a requisição em andamento terminar.
+"""
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.idempotency_key import IdempotencyKey, IdempotencyStatus
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotency-Replayed"
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL_SECONDS = 0.1
+
+
+def _request_hash(payload: dict) -> str:
+    raw = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _claim(db: Session, company_id: int, endpoint: str, key: str, request_hash: str):
+    """
+    Reserva a chave (INSERT protegido pela constraint única).
+
+    Returns:
+        (registro reservado, None) quando esta requisição deve executar a operação
+        (None, registro concluído) quando a resposta já existe e deve ser repetida
+    """
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+
+    while True:
+        now = datetime.utcnow()
+        record = IdempotencyKey(
+            company_id=company_id,
+            endpoint=endpoint,
+            key=key,
+            request_hash=request_hash,
+            status=IdempotencyStatus.IN_PROGRESS,
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS)
+        )
+        db.add(record)
+        try:
+            db.commit()
+            return record, None
+        except IntegrityError:
+            db.rollback()
+
+        existing = db.query(IdempotencyKey).filter(
+            IdempotencyKey.company_id == company_id,
+            IdempotencyKey.endpoint == endpoint,
+            IdempotencyKey.key == key
+        ).populate_existing().first()
+
+        if existing is None:
+            continue
+
+        # Chave expirada (TTL) ou reserva abandonada: libera e tenta de novo
+        if existing.expires_at < now:
+            db.expunge(existing)
+            db.query(IdempotencyKey).filter(
+                IdempotencyKey.id == existing.id,
+                IdempotencyKey.expires_at < now
+            ).delete(synchronize_session=False)
+            db.commit()
+            continue
+
+        if existing.request_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key já utilizada com outra requisição"
+            )
+
+        if existing.status == IdempotencyStatus.COMPLETED:
+            return None, existing
+
+        if time.monotonic() >= deadline:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Requisição com esta Idempotency-Key ainda está em processamento"
+            )
+
+        time.sleep(POLL_INTERVAL_SECONDS)
+
+
+def run_idempotent(
+    db: Session,
+    company_id: int,
+    endpoint: str,
+    key: Optional[str],
+    payload: dict,
+    handler: Callable[[Callable[[Any], None]], Any],
+    serialize: Callable[[Any], dict],
+    response: Optional[Response] = None
+) -> Any:
+    """
+    Executa handler(complete) uma única vez por (empresa, endpoint, Idempotency-Key).
+
+    O handler chama complete(resultado) logo antes do seu commit: a chave é marcada
+    como concluída (com a resposta serializada) na mesma transação da operação, e uma
+    queda entre os dois não deixa a chave reservada para uma segunda execução.
+    Handlers que não gravam nada (ex.: lote rejeitado) podem não chamá-lo.
+
+    Sem chave, apenas executa o handler. Com chave, devolve a resposta serializada
+    (serialize) e a repete nos reenvios enquanto não expirar (IDEMPOTENCY_TTL_HOURS).
+    Se o handler falhar, a reserva é removida e o cliente pode tentar novamente.
+    """
+    if not key:
+        return handler(lambda result: None)
+
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key deve ter no máximo {MAX_KEY_LENGTH} caracteres"
+        )
+
+    record, existing = _claim(db, company_id, endpoint, key, _request_hash(payload))
+
+    if existing is not None:
+        if response is not None:
+            response.headers[REPLAYED_HEADER] = "true"
+        return json.loads(existing.response_body)
+
+    record_id = record.id
+    completed = {}
+
+    def complete(result: Any):
+        completed["body"] = serialize(result)
+        _mark_completed(db, record_id, completed["body"])
+
+    try:
+        result = handler(complete)
+    except Exception:
+        db.rollback()
+        db.query(IdempotencyKey).filter(IdempotencyKey.id == record_id).delete(synchronize_session=False)
+        db.commit()
+        raise
+
+    if "body" in completed:
+        return completed["body"]
+
+    # O handler não chamou complete (nada foi gravado): conclui a chave agora
+    body = serialize(result)
+    _mark_completed(db, record_id, body)
+    db.commit()
+
+    return body
+
+
+def _mark_completed(db: Session, record_id: int, body: dict):
+    """Grava a resposta e marca a chave como concluída (sem commit)"""
+    db.query(IdempotencyKey).filter(IdempotencyKey.id == record_id).update({
+        IdempotencyKey.status: IdempotencyStatus.COMPLETED,
+        IdempotencyKey.response_status: status.HTTP_201_CREATED,
+        IdempotencyKey.response_body: json.dumps(body, default=str),
+        IdempotencyKey.expires_at: datetime.utcnow() + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+    }, synchronize_session=False)
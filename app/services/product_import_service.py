@@ -0,0 +1,349 @@
+"""
+Serviço de Importação de Produtos via CSV
+Concentra o parsing das linhas (usado pela importação síncrona e pelos jobs)
+e o worker que processa os jobs em background, em lotes.
+"""
+import codecs
+import csv
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.category import Category
+from app.models.import_job import ImportJob, ImportJobStatus
+from app.models.product import Product
+
+REQUIRED_FIELDS = {'nome', 'marca', 'categoria', 'preco_custo', 'preco_venda'}
+
+SPOOL_READ_SIZE = 1024 * 1024
+
+
+def parse_bool(value: str) -> bool:
+    """Converte string para boolean"""
+    if not value or value.strip() == '':
+        return False
+    return value.lower() in ('true', 'sim', 'yes', '1', 't', 's', 'y')
+
+
+def parse_float(value: str, field_name: str, line_number: int) -> float:
+    """Converte string para float com validação"""
+    if not value or value.strip() == '':
+        raise ValueError(f"Linha {line_number}: Campo '{field_name}' é obrigatório")
+
+    try:
+        # Aceita tanto vírgula quanto ponto como separador decimal
+        value_clean = value.replace(',', '.')
+        result = float(value_clean)
+        if result < 0:
+            raise ValueError(f"Linha {line_number}: '{field_name}' não pode ser negativo")
+        return result
+    except ValueError as e:
+        if "could not convert" in str(e):
+            raise ValueError(f"Linha {line_number}: '{field_name}' deve ser um número válido")
+        raise
+
+
+def parse_int(value: str, field_name: str, line_number: int, default: int = 0) -> int:
+    """Converte string para int com validação"""
+    if not value or value.strip() == '':
+        return default
+
+    try:
+        result = int(value)
+        if result < 0:
+            raise ValueError(f"Linha {line_number}: '{field_name}' não pode ser negativo")
+        return result
+    except ValueError as e:
+        if "invalid literal" in str(e):
+            raise ValueError(f"Linha {line_number}: '{field_name}' deve ser um número inteiro válido")
+        raise
+
+
+def missing_header_fields(fieldnames: Optional[List[str]]) -> set:
+    """Retorna os campos obrigatórios ausentes no cabeçalho do CSV"""
+    header_fields = set(field.lower().strip() for field in (fieldnames or []))
+    return REQUIRED_FIELDS - header_fields
+
+
+def load_category_map(db: Session, company_id: int) -> tuple[List[Category], Dict[str, int]]:
+    """Busca as categorias ativas da empresa uma única vez (nome normalizado -> id)"""
+    categories = db.query(Category).filter(
+        Category.company_id == company_id,
+        Category.is_active == True
+    ).all()
+    return categories, {cat.name.lower().strip(): cat.id for cat in categories}
+
+
+def build_product_from_row(
+    db: Session,
+    row: dict,
+    line_number: int,
+    company_id: int,
+    categories: List[Category],
+    category_map: Dict[str, int]
+) -> Product:
+    """
+    Valida uma linha do CSV e monta o Product correspondente (sem adicionar à sessão).
+    Levanta ValueError com a mensagem da linha quando algum campo é inválido.
+    """
+    from app.api.v1.endpoints.products import generate_sku
+
+    # Normalizar chaves do dicionário (lowercase e strip)
+    row_normalized = {k.lower().strip(): v.strip() if v else '' for k, v in row.items()}
+
+    # Validar campos obrigatórios
+    if not row_normalized.get('nome'):
+        raise ValueError(f"Linha {line_number}: Campo 'nome' é obrigatório")
+
+    if not row_normalized.get('marca'):
+        raise ValueError(f"Linha {line_number}: Campo 'marca' é obrigatório")
+
+    if not row_normalized.get('categoria'):
+        raise ValueError(f"Linha {line_number}: Campo 'categoria' é obrigatório")
+
+    # Validar categoria existe
+    category_name = row_normalized['categoria'].lower().strip()
+    category_id = category_map.get(category_name)
+
+    if not category_id:
+        available_categories = ', '.join(sorted(set(cat.name for cat in categories)))
+        raise ValueError(
+            f"Linha {line_number}: Categoria '{row_normalized['categoria']}' não encontrada. "
+            f"Categorias disponíveis: {available_categories}"
+        )
+
+    # Parse de valores
+    preco_custo = parse_float(row_normalized.get('preco_custo', ''), 'preco_custo', line_number)
+    preco_venda = parse_float(row_normalized.get('preco_venda', ''), 'preco_venda', line_number)
+    estoque = parse_int(row_normalized.get('estoque', '0'), 'estoque', line_number, default=0)
+    estoque_minimo = parse_int(row_normalized.get('estoque_minimo', '0'), 'estoque_minimo', line_number, default=0)
+    ativo = parse_bool(row_normalized.get('ativo', 'false'))
+    em_promocao = parse_bool(row_normalized.get('em_promocao', 'false'))
+
+    # Validar preço promocional se em promoção
+    preco_promocional = None
+    if em_promocao:
+        preco_promo_str = row_normalized.get('preco_promocional', '')
+        if not preco_promo_str:
+            raise ValueError(f"Linha {line_number}: 'preco_promocional' é obrigatório quando 'em_promocao' é true")
+        preco_promocional = parse_float(preco_promo_str, 'preco_promocional', line_number)
+
+    # Gerar SKU se não fornecido
+    sku = row_normalized.get('sku', '').strip()
+    if not sku:
+        sku = generate_sku(
+            db=db,
+            company_id=company_id,
+            product_name=row_normalized['nome'],
+            category_id=category_id
+        )
+
+    return Product(
+        name=row_normalized['nome'],
+        brand=row_normalized['marca'],
+        description=row_normalized.get('descricao', ''),
+        category_id=category_id,
+        cost_price=preco_custo,
+        sale_price=preco_venda,
+        stock_quantity=estoque,
+        min_stock=estoque_minimo,
+        sku=sku,
+        barcode=row_normalized.get('codigo_barras', ''),
+        is_active=ativo,
+        is_on_sale=em_promocao,
+        promotional_price=preco_promocional,
+        company_id=company_id
+    )
+
+
+async def spool_upload(upload_file, company_id: int) -> dict:
+    """
+    Copia o upload para disco em blocos, sem carregar o arquivo inteiro em memória.
+
+    Retorna dict com: path, size, estimated_rows, encoding.
+    Levanta ValueError se o arquivo exceder IMPORT_MAX_UPLOAD_SIZE.
+    """
+    target_dir = os.path.join(settings.IMPORT_JOBS_DIR, str(company_id))
+    os.makedirs(target_dir, exist_ok=True)
+    path = os.path.join(target_dir, f"{uuid.uuid4().hex}.csv")
+
+    # Detecta a codificação durante a cópia: UTF-8 (com ou sem BOM) ou Latin-1
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    encoding = 'utf-8-sig'
+    size = 0
+    newlines = 0
+    last_byte = b''
+
+    try:
+        with open(path, 'wb') as spool:
+            while True:
+                chunk = await upload_file.read(SPOOL_READ_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > settings.IMPORT_MAX_UPLOAD_SIZE:
+                    raise ValueError(
+                        f"Arquivo muito grande. Máximo {settings.IMPORT_MAX_UPLOAD_SIZE // (1024 * 1024)}MB"
+                    )
+                if encoding == 'utf-8-sig':
+                    try:
+                        decoder.decode(chunk)
+                    except UnicodeDecodeError:
+                        encoding = 'latin-1'
+                newlines += chunk.count(b'\n')
+                last_byte = chunk[-1:]
+                spool.write(chunk)
+        if encoding == 'utf-8-sig':
+            try:
+                decoder.decode(b'', final=True)
+            except UnicodeDecodeError:
+                encoding = 'latin-1'
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    # Última linha sem quebra de linha também conta
+    if last_byte and last_byte != b'\n':
+        newlines += 1
+
+    return {
+        "path": path,
+        "size": size,
+        "estimated_rows": max(newlines - 1, 0),  # Excluir cabeçalho
+        "encoding": encoding,
+    }
+
+
+def read_spooled_header(path: str, encoding: str) -> Optional[List[str]]:
+    """Lê apenas o cabeçalho do CSV salvo em disco"""
+    with open(path, 'r', encoding=encoding, newline='') as f:
+        return csv.DictReader(f).fieldnames
+
+
+def _save_progress(db: Session, job: ImportJob, error_details: List[dict]):
+    job.errors = json.dumps(error_details, ensure_ascii=False)
+    db.commit()
+
+
+def run_import_job(job_id: int, session_factory: Callable[[], Session]):
+    """
+    Worker do job de importação.
+
+    Lê o CSV salvo em disco de forma incremental e grava os produtos em lotes de
+    IMPORT_CHUNK_SIZE linhas, fazendo commit e atualizando o progresso a cada lote.
+    Ao final persiste o resultado (mesmo formato da importação síncrona, com as
+    listas de detalhes limitadas para arquivos grandes) e remove o arquivo temporário.
+    """
+    db = session_factory()
+    job = None
+    try:
+        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        if not job or job.status != ImportJobStatus.PENDING:
+            return
+
+        job.status = ImportJobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        db.commit()
+
+        categories, category_map = load_category_map(db, job.company_id)
+        chunk_size = max(settings.IMPORT_CHUNK_SIZE, 1)
+
+        created: List[dict] = []
+        error_details: List[dict] = []
+        pending: List[Product] = []
+        line_number = 1  # Linha 1 é o cabeçalho
+
+        with open(job.file_path, 'r', encoding=job.encoding or 'utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                line_number += 1
+
+                try:
+                    product = build_product_from_row(
+                        db, row, line_number, job.company_id, categories, category_map
+                    )
+                    pending.append(product)
+                    job.success_count += 1
+                    if len(created) < settings.IMPORT_MAX_CREATED_DETAILS:
+                        created.append({"linha": line_number, "nome": product.name, "sku": product.sku})
+                except Exception as e:
+                    job.error_count += 1
+                    if len(error_details) < settings.IMPORT_MAX_ERROR_DETAILS:
+                        message = str(e) if isinstance(e, ValueError) else f"Erro inesperado: {str(e)}"
+                        error_details.append({"linha": line_number, "erro": message})
+
+                job.processed_rows += 1
+
+                if job.processed_rows % chunk_size == 0:
+                    db.add_all(pending)
+                    pending = []
+                    _save_progress(db, job, error_details)
+
+        db.add_all(pending)
+        job.result = json.dumps({
+            "total_linhas": line_number - 1,
+            "sucessos": job.success_count,
+            "erros": job.error_count,
+            "detalhes": {
+                "criados": created,
+                "erros": error_details
+            },
+            # Listas limitadas a IMPORT_MAX_CREATED_DETAILS / IMPORT_MAX_ERROR_DETAILS itens
+            "detalhes_truncados": len(created) < job.success_count or len(error_details) < job.error_count
+        }, ensure_ascii=False)
+        job.status = ImportJobStatus.COMPLETED
+        job.finished_at = datetime.utcnow()
+        _save_progress(db, job, error_details)
+    except Exception as e:
+        db.rollback()
+        if job is not None:
+            job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+            job.status = ImportJobStatus.FAILED
+            job.error_message = str(e)
+            job.finished_at = datetime.utcnow()
+            db.commit()
+    finally:
+        if job is not None and job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+        db.close()
+
+
+def job_to_dict(job: ImportJob) -> dict:
+    """Serializa o job com métricas de progresso e vazão (linhas/segundo)"""
+    elapsed = None
+    rows_per_second = 0.0
+    if job.started_at:
+        end = job.finished_at or datetime.utcnow()
+        elapsed = max((end - job.started_at).total_seconds(), 0.0)
+        if elapsed > 0:
+            rows_per_second = round(job.processed_rows / elapsed, 2)
+
+    progress = 0.0
+    if job.status == ImportJobStatus.COMPLETED:
+        progress = 100.0
+    elif job.estimated_rows:
+        progress = round(min(job.processed_rows / job.estimated_rows, 1.0) * 100, 2)
+
+    return {
+        "job_id": job.id,
+        "filename": job.filename,
+        "status": job.status.value,
+        "estimated_rows": job.estimated_rows,
+        "processed_rows": job.processed_rows,
+        "success_count": job.success_count,
+        "error_count": job.error_count,
+        "progress_percentage": progress,
+        "rows_per_second": rows_per_second,
+        "elapsed_seconds": round(elapsed, 3) if elapsed is not None else None,
+        "errors": json.loads(job.errors) if job.errors else [],
+        "result": json.loads(job.result) if job.result else None,
+        "error_message": job.error_message,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
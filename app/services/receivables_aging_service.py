@@ -0,0 +1,156 @@
+"""
+Serviço de Aging de Contas a Receber
+Calcula, em uma única consulta agrupada, o saldo em aberto das parcelas por
+empresa e faixa de atraso e grava uma foto diária (receivables_aging_snapshots).
+"""
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import Numeric, case, func, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+from app.models.installment import Installment, InstallmentStatus
+from app.models.installment_payment import InstallmentPayment, InstallmentPaymentStatus
+from app.models.receivables_aging_snapshot import ReceivablesAgingSnapshot
+
+AGING_BUCKETS = ("future", "current", "days_1_30", "days_31_60", "days_61_90", "days_90_plus")
+OVERDUE_BUCKETS = ("days_1_30", "days_31_60", "days_61_90", "days_90_plus")
+
+
+def _compute_aging(db: Session, as_of: date, company_id: Optional[int] = None) -> dict:
+    """
+    Saldo em aberto (valor - pagamentos concluídos) das parcelas pendentes/vencidas.
+
+    Returns:
+        {company_id: {bucket: (quantidade, valor)}}
+    """
+    paid = db.query(
+        InstallmentPayment.installment_id.label("installment_id"),
+        func.sum(InstallmentPayment.amount_paid).label("total_paid")
+    ).filter(
+        InstallmentPayment.status == InstallmentPaymentStatus.COMPLETED
+    ).group_by(InstallmentPayment.installment_id).subquery()
+
+    remaining = Installment.amount - func.coalesce(paid.c.total_paid, 0.0)
+
+    # Faixas por comparação de datas (sem aritmética de datas no banco)
+    bucket = case(
+        (Installment.due_date > as_of, "future"),
+        (Installment.due_date == as_of, "current"),
+        (Installment.due_date >= as_of - timedelta(days=30), "days_1_30"),
+        (Installment.due_date >= as_of - timedelta(days=60), "days_31_60"),
+        (Installment.due_date >= as_of - timedelta(days=90), "days_61_90"),
+        else_="days_90_plus"
+    )
+
+    query = db.query(
+        Installment.company_id,
+        bucket.label("bucket"),
+        func.count(Installment.id),
+        func.sum(remaining)
+    ).outerjoin(
+        paid, paid.c.installment_id == Installment.id
+    ).filter(
+        Installment.status.in_([InstallmentStatus.PENDING, InstallmentStatus.OVERDUE]),
+        # Literal Numeric: comparado ao tipo Money, 0.005 seria arredondado para 0.01
+        remaining > literal(0.005, Numeric())
+    )
+
+    if company_id is not None:
+        query = query.filter(Installment.company_id == company_id)
+
+    aging = {}
+    for row_company_id, row_bucket, count, amount in query.group_by(Installment.company_id, "bucket").all():
+        aging.setdefault(row_company_id, {})[row_bucket] = (count, round(amount or 0.0, 2))
+    return aging
+
+
+def refresh_aging_snapshots(db: Session, as_of: Optional[date] = None, company_id: Optional[int] = None) -> int:
+    """
+    Recalcula a foto do dia para uma empresa ou para todas (uma linha por empresa,
+    mesmo sem saldo em aberto). Substitui a foto existente da mesma data (upsert). Não faz commit.
+
+    Returns:
+        Número de empresas gravadas
+    """
+    as_of = as_of or date.today()
+    aging = _compute_aging(db, as_of, company_id)
+
+    if company_id is not None:
+        company_ids = [company_id]
+    else:
+        company_ids = [row[0] for row in db.query(Company.id).all()]
+
+    rows = []
+    for cid in company_ids:
+        values = {"company_id": cid, "snapshot_date": as_of}
+        for name in AGING_BUCKETS:
+            count, amount = aging.get(cid, {}).get(name, (0, 0.0))
+            values[f"{name}_count"] = count
+            values[f"{name}_amount"] = amount
+        rows.append(values)
+
+    if not rows:
+        return 0
+
+    # Upsert: duas requisições que calculam a mesma foto ao mesmo tempo não colidem
+    # na constraint única (company_id, snapshot_date); a última grava os valores
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(ReceivablesAgingSnapshot).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["company_id", "snapshot_date"],
+        set_={
+            **{
+                column: stmt.excluded[column]
+                for name in AGING_BUCKETS
+                for column in (f"{name}_count", f"{name}_amount")
+            },
+            "created_at": func.now(),
+        }
+    )
+    db.execute(stmt)
+    return len(rows)
+
+
+def get_aging_snapshot(db: Session, company_id: int, as_of: Optional[date] = None,
+                       refresh: bool = False) -> ReceivablesAgingSnapshot:
+    """Foto da empresa na data; calcula na hora se ainda não existir (ou se refresh=True)"""
+    as_of = as_of or date.today()
+
+    snapshot = None
+    if not refresh:
+        snapshot = db.query(ReceivablesAgingSnapshot).filter(
+            ReceivablesAgingSnapshot.company_id == company_id,
+            ReceivablesAgingSnapshot.snapshot_date == as_of
+        ).first()
+
+    if snapshot is None:
+        refresh_aging_snapshots(db, as_of, company_id)
+        db.commit()
+        snapshot = db.query(ReceivablesAgingSnapshot).filter(
+            ReceivablesAgingSnapshot.company_id == company_id,
+            ReceivablesAgingSnapshot.snapshot_date == as_of
+        ).first()
+
+    return snapshot
+
+
+def serialize_snapshot(snapshot: ReceivablesAgingSnapshot) -> dict:
+    buckets = {
+        name: {
+            "count": getattr(snapshot, f"{name}_count"),
+            "amount": getattr(snapshot, f"{name}_amount")
+        }
+        for name in AGING_BUCKETS
+    }
+    return {
+        "company_id": snapshot.company_id,
+        "snapshot_date": snapshot.snapshot_date,
+        "generated_at": snapshot.created_at,
+        "buckets": buckets,
+        "overdue_count": sum(buckets[name]["count"] for name in OVERDUE_BUCKETS),
+        "overdue_amount": round(sum(buckets[name]["amount"] for name in OVERDUE_BUCKETS), 2),
+        "total_open_amount": round(sum(bucket["amount"] for bucket in buckets.values()), 2)
+    }
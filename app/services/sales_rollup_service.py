@@ -0,0 +1,185 @@
+"""
+Serviço dos Consolidados de Vendas
+- product_daily_sales: totais por produto e dia (rankings de mais vendidos)
+- customer_product_stats: totais por cliente e produto (produtos que o cliente compra)
+
+Os totais são calculados no banco a partir de sale_items e somados na linha
+existente com INSERT ... ON CONFLICT DO UPDATE, na mesma transação da venda.
+"""
+from datetime import date, datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select, distinct
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.customer_product_stats import CustomerProductStats
+from app.models.product_daily_sales import ProductDailySales
+from app.models.sale import Sale, SaleItem, SaleStatus
+
+ROLLUP_COLUMNS = ["company_id", "product_id", "day", "quantity", "revenue", "cost", "sale_count"]
+CUSTOMER_STATS_COLUMNS = [
+    "company_id", "customer_id", "product_id",
+    "times_purchased", "total_quantity", "total_spent", "last_purchase_date"
+]
+
+
+def _aggregate_select(sign: int = 1):
+    """
+    SELECT agrupado por (empresa, produto, dia) no formato das colunas do consolidado.
+    Só vendas concluídas, como o ranking de mais vendidos calculado sobre sale_items.
+    """
+    day = func.date(Sale.created_at)
+    return select(
+        Sale.company_id,
+        SaleItem.product_id,
+        day,
+        sign * func.sum(SaleItem.quantity),
+        sign * func.sum(SaleItem.total_price),
+        sign * func.sum(SaleItem.quantity * func.coalesce(SaleItem.unit_cost_price, 0.0)),
+        sign * func.count(distinct(Sale.id))
+    ).join(SaleItem, SaleItem.sale_id == Sale.id).where(
+        Sale.status == SaleStatus.COMPLETED
+    ).group_by(Sale.company_id, SaleItem.product_id, day)
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _insert(db: Session, model=ProductDailySales):
+    dialect = postgresql if _is_postgres(db) else sqlite
+    return dialect.insert(model)
+
+
+def apply_sales_to_rollup(db: Session, sale_ids: Iterable[int], sign: int = 1) -> None:
+    """
+    Soma (sign=1, venda criada) ou subtrai (sign=-1, venda cancelada) os itens das
+    vendas no consolidado. Deve ser chamado com os itens já gravados (flush), na
+    mesma transação da venda; no cancelamento, antes de mudar o status da venda.
+    """
+    sale_ids = list(sale_ids)
+    if not sale_ids:
+        return
+
+    stmt = _insert(db).from_select(
+        ROLLUP_COLUMNS,
+        _aggregate_select(sign).where(Sale.id.in_(sale_ids))
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["company_id", "product_id", "day"],
+        set_={
+            "quantity": ProductDailySales.quantity + stmt.excluded.quantity,
+            "revenue": ProductDailySales.revenue + stmt.excluded.revenue,
+            "cost": ProductDailySales.cost + stmt.excluded.cost,
+            "sale_count": ProductDailySales.sale_count + stmt.excluded.sale_count,
+        }
+    )
+    db.execute(stmt)
+
+
+def rebuild_rollup(db: Session, company_id: int, start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+    """
+    Recalcula o consolidado da empresa a partir das vendas (intervalo [start_date, end_date)).
+    Sem datas, recalcula todo o histórico. Não faz commit.
+
+    Returns:
+        Número de linhas (produto x dia) geradas
+    """
+    delete_query = db.query(ProductDailySales).filter(ProductDailySales.company_id == company_id)
+    sales_filter = [Sale.company_id == company_id]
+
+    if start_date:
+        delete_query = delete_query.filter(ProductDailySales.day >= start_date)
+        sales_filter.append(Sale.created_at >= datetime.combine(start_date, datetime.min.time()))
+    if end_date:
+        delete_query = delete_query.filter(ProductDailySales.day < end_date)
+        sales_filter.append(Sale.created_at < datetime.combine(end_date, datetime.min.time()))
+
+    delete_query.delete(synchronize_session=False)
+
+    result = db.execute(
+        _insert(db).from_select(ROLLUP_COLUMNS, _aggregate_select().where(*sales_filter))
+    )
+    return result.rowcount
+
+
+def _customer_stats_select():
+    """SELECT agrupado por (empresa, cliente, produto) sobre as vendas concluídas"""
+    return select(
+        Sale.company_id,
+        Sale.customer_id,
+        SaleItem.product_id,
+        func.count(SaleItem.id),
+        func.sum(SaleItem.quantity),
+        func.sum(SaleItem.total_price),
+        func.max(Sale.created_at)
+    ).join(SaleItem, SaleItem.sale_id == Sale.id).where(
+        Sale.status == SaleStatus.COMPLETED
+    ).group_by(Sale.company_id, Sale.customer_id, SaleItem.product_id)
+
+
+def add_sales_to_customer_stats(db: Session, sale_ids: Iterable[int]) -> None:
+    """
+    Soma os itens de vendas recém-criadas (já gravadas com flush) nas
+    estatísticas de cada cliente x produto.
+    """
+    sale_ids = list(sale_ids)
+    if not sale_ids:
+        return
+
+    stmt = _insert(db, CustomerProductStats).from_select(
+        CUSTOMER_STATS_COLUMNS,
+        _customer_stats_select().where(Sale.id.in_(sale_ids))
+    )
+    # greatest() no PostgreSQL; no SQLite max() com dois argumentos é escalar
+    latest = func.greatest if _is_postgres(db) else func.max
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["company_id", "customer_id", "product_id"],
+        set_={
+            "times_purchased": CustomerProductStats.times_purchased + stmt.excluded.times_purchased,
+            "total_quantity": CustomerProductStats.total_quantity + stmt.excluded.total_quantity,
+            "total_spent": CustomerProductStats.total_spent + stmt.excluded.total_spent,
+            "last_purchase_date": latest(
+                func.coalesce(CustomerProductStats.last_purchase_date, stmt.excluded.last_purchase_date),
+                stmt.excluded.last_purchase_date
+            ),
+        }
+    )
+    db.execute(stmt)
+
+
+def rebuild_customer_stats(
+    db: Session,
+    company_id: int,
+    customer_id: Optional[int] = None,
+    product_ids: Optional[Iterable[int]] = None
+) -> int:
+    """
+    Recalcula as estatísticas a partir das vendas concluídas: da empresa inteira,
+    de um cliente ou só de alguns produtos do cliente (usado no cancelamento, em que
+    a data da última compra precisa ser recalculada). Não faz commit.
+
+    Returns:
+        Número de linhas (cliente x produto) geradas
+    """
+    delete_query = db.query(CustomerProductStats).filter(CustomerProductStats.company_id == company_id)
+    sales_filter = [Sale.company_id == company_id]
+
+    if customer_id is not None:
+        delete_query = delete_query.filter(CustomerProductStats.customer_id == customer_id)
+        sales_filter.append(Sale.customer_id == customer_id)
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        delete_query = delete_query.filter(CustomerProductStats.product_id.in_(product_ids))
+        sales_filter.append(SaleItem.product_id.in_(product_ids))
+
+    delete_query.delete(synchronize_session=False)
+
+    result = db.execute(
+        _insert(db, CustomerProductStats).from_select(
+            CUSTOMER_STATS_COLUMNS,
+            _customer_stats_select().where(*sales_filter)
+        )
+    )
+    return result.rowcount
@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+"""
+Gerador de massa de dados sintética para benchmark
+Cria N empresas com categorias, catálogo, clientes e anos de vendas (itens, parcelas
+do crediário com pagamentos parciais e movimentações de estoque) usando INSERTs em
+lote direto no driver, sem objetos ORM. Os IDs são atribuídos pelo gerador, então
+os lotes não dependem de RETURNING. Ao final recalcula os consolidados de vendas
+(product_daily_sales e customer_product_stats).
+
+Determinístico: a mesma --seed (e a mesma --end-date) gera os mesmos dados em um banco vazio.
+Funciona com arquivo SQLite e com PostgreSQL (no PostgreSQL as sequences são ajustadas
+ao final; rode as migrações antes ou use --create-tables).
+
+Uso:
+    python scripts/generate_synthetic_data.py --database-url sqlite:///bench.db --create-tables \\
+        --companies 2 --products 50000 --customers 20000 --sales 500000 --years 3
+"""
+import argparse
+import importlib
+import operator
+import pkgutil
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import bindparam, create_engine, event, func, select, text
+from sqlalchemy.orm import Session
+
+import app.models
+from app.core.database import Base
+from app.core.money import from_cents, split_cents, to_cents
+from app.core.security import hash_password
+from app.models.category import Category
+from app.models.company import Company
+from app.models.customer import Customer
+from app.models.installment import Installment, InstallmentStatus
+from app.models.installment_payment import InstallmentPayment, InstallmentPaymentStatus
+from app.models.product import Product
+from app.models.role import Role
+from app.models.sale import PaymentType, Sale, SaleItem, SaleStatus
+from app.models.stock_movement import MovementType, StockMovement
+from app.models.user import User
+from app.services.sales_rollup_service import rebuild_customer_stats, rebuild_rollup
+
+# Registra todas as tabelas no metadata (create_all e relacionamentos);
+# associations.py é a definição antiga de role_permissions, hoje em role.py
+for _module in pkgutil.iter_modules(app.models.__path__):
+    if _module.name != "associations":
+        importlib.import_module(f"app.models.{_module.name}")
+
+SYNTHETIC_PASSWORD = "Sintetico@123"
+
+FIRST_NAMES = [
+    "Ana", "Maria", "Francisca", "Antônia", "Adriana", "Juliana", "Márcia", "Fernanda", "Patrícia", "Aline",
+    "José", "João", "Antônio", "Francisco", "Carlos", "Paulo", "Pedro", "Lucas", "Luiz", "Marcos",
+]
+LAST_NAMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa",
+]
+PRODUCT_WORDS = [
+    "Perfume", "Colônia", "Hidratante", "Sabonete", "Shampoo", "Condicionador", "Batom", "Base", "Máscara",
+    "Esmalte", "Creme", "Loção", "Óleo", "Desodorante", "Body Splash", "Kit", "Gloss", "Pó Compacto",
+]
+PRODUCT_VARIANTS = ["Floral", "Amadeirado", "Cítrico", "Doce", "Intenso", "Suave", "Noite", "Verão", "Clássico"]
+BRANDS = ["Boticário", "Natura", "Avon", "Eudora", "Jequiti", "O.U.i", "Granado", "Vult", "Ruby Rose"]
+CATEGORY_NAMES = ["Perfumaria", "Maquiagem", "Cabelos", "Corpo e Banho", "Unhas", "Infantil", "Masculino", "Kits"]
+
+# Itens por venda e número de parcelas no crediário (valores, pesos)
+ITEMS_PER_SALE = ([1, 2, 3, 4, 5], [40, 30, 15, 10, 5])
+INSTALLMENT_COUNTS = ([1, 2, 3, 4, 5, 6, 10], [10, 25, 30, 10, 10, 10, 5])
+
+# Ordem de gravação dos lotes (pais antes dos filhos, por causa das FKs no PostgreSQL)
+SALE_TABLES = [Sale.__table__, SaleItem.__table__, Installment.__table__,
+               InstallmentPayment.__table__, StockMovement.__table__]
+
+
+class BulkWriter:
+    """
+    Acumula linhas por tabela e grava em lotes, um commit por lote.
+    Os valores passam pelos bind processors dos tipos das colunas (Money, Enum, DateTime
+    no SQLite) e vão direto ao driver: executemany no SQLite, execute_values no psycopg2.
+    """
+
+    def __init__(self, conn, batch_size: int):
+        self.conn = conn
+        self.dialect = conn.dialect
+        self.batch_size = batch_size
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, table, row: dict):
+        self.buffers.setdefault(table, []).append(row)
+
+    def insert(self, table, rows: list):
+        if not rows:
+            return
+        columns = list(rows[0])
+        getter = operator.itemgetter(*columns)
+        processors = [
+            (position, table.c[name].type.bind_processor(self.dialect)) for position, name in enumerate(columns)
+        ]
+        processors = [(position, process) for position, process in processors if process is not None]
+
+        values = []
+        for row in rows:
+            row_values = list(getter(row))
+            for position, process in processors:
+                if row_values[position] is not None:
+                    row_values[position] = process(row_values[position])
+            values.append(tuple(row_values))
+
+        quote = self.dialect.identifier_preparer.quote
+        into = f"INSERT INTO {quote(table.name)} ({', '.join(quote(name) for name in columns)}) VALUES "
+        if self.dialect.driver == "psycopg2":
+            from psycopg2.extras import execute_values
+
+            with self.conn.connection.dbapi_connection.cursor() as cursor:
+                execute_values(cursor, into + "%s", values, page_size=self.batch_size)
+        else:
+            placeholder = "?" if self.dialect.paramstyle == "qmark" else "%s"
+            self.conn.exec_driver_sql(into + f"({', '.join([placeholder] * len(columns))})", values)
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+
+    def flush_if_full(self, table):
+        if len(self.buffers.get(table, ())) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for table in SALE_TABLES:
+            self.insert(table, self.buffers.pop(table, []))
+        self.conn.commit()
+
+
+def _sqlite_fast_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous = OFF")
+    cursor.execute("PRAGMA journal_mode = MEMORY")
+    cursor.close()
+
+
+def create_generator_engine(database_url: str):
+    if database_url.startswith("sqlite"):
+        engine = create_engine(database_url)
+        event.listen(engine, "connect", _sqlite_fast_pragmas)
+        return engine
+    return create_engine(database_url)
+
+
+def _next_ids(conn) -> dict:
+    tables = [Company, Category, Product, Customer, User, Sale, SaleItem, Installment,
+              InstallmentPayment, StockMovement]
+    return {model: (conn.execute(select(func.max(model.id))).scalar() or 0) + 1 for model in tables}
+
+
+def _role_id(conn) -> int:
+    role_id = conn.execute(select(Role.id).where(Role.name == "Administrador")).scalar()
+    if role_id is None:
+        role_id = conn.execute(
+            Role.__table__.insert().values(name="Administrador", is_active=True).returning(Role.id)
+        ).scalar()
+    return role_id
+
+
+def _reset_sequences(conn):
+    """PostgreSQL: sequences continuam depois dos IDs gravados pelo gerador"""
+    for table in ["companies", "categories", "products", "customers", "users", "sales", "sale_items",
+                  "installments", "installment_payments", "stock_movements"]:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}"
+        ))
+    conn.commit()
+
+
+class CompanyGenerator:
+    """Dados de uma empresa; rng próprio para cada empresa ser reprodutível"""
+
+    def __init__(self, writer: BulkWriter, ids: dict, rng: random.Random, role_id: int, password_hash: str,
+                 start: datetime, end: datetime):
+        self.writer = writer
+        self.ids = ids
+        self.rng = rng
+        self.role_id = role_id
+        self.password_hash = password_hash
+        self.start = start
+        self.end = end
+
+    def _take_id(self, model) -> int:
+        value = self.ids[model]
+        self.ids[model] += 1
+        return value
+
+    def _random_time(self, low: datetime, high: datetime) -> datetime:
+        return low + timedelta(seconds=self.rng.random() * max((high - low).total_seconds(), 0))
+
+    # ----- cadastros -----
+
+    def create_company(self) -> int:
+        company_id = self._take_id(Company)
+        self.writer.insert(Company.__table__, [{
+            "id": company_id,
+            "name": f"Loja Sintética {company_id}",
+            "slug": f"sintetica-{company_id}",
+            "cnpj": f"{company_id:014d}",
+            "email": f"contato@sintetica-{company_id}.test",
+            "phone": f"85{self.rng.randrange(10 ** 8, 10 ** 9)}",
+            "address": f"Rua Sintética, {company_id}",
+            "is_active": True,
+            "created_at": self.start,
+            "updated_at": self.start,
+        }])
+        self.user_id = self._take_id(User)
+        self.writer.insert(User.__table__, [{
+            "id": self.user_id,
+            "name": f"Admin Sintética {company_id}",
+            "email": f"admin@sintetica-{company_id}.test",
+            "password_hash": self.password_hash,
+            "company_id": company_id,
+            "role_id": self.role_id,
+            "is_active": True,
+            "created_at": self.start,
+            "updated_at": self.start,
+        }])
+        self.company_id = company_id
+        return company_id
+
+    def create_categories(self, count: int):
+        rows = []
+        for index in range(count):
+            base = CATEGORY_NAMES[index % len(CATEGORY_NAMES)]
+            suffix = "" if index < len(CATEGORY_NAMES) else f" {index // len(CATEGORY_NAMES) + 1}"
+            rows.append({
+                "id": self._take_id(Category),
+                "name": base + suffix,
+                "description": f"Categoria {base}",
+                "company_id": self.company_id,
+                "is_active": True,
+                "created_at": self.start,
+                "updated_at": self.start,
+            })
+        self.writer.insert(Category.__table__, rows)
+        self.category_ids = [row["id"] for row in rows]
+
+    def create_products(self, count: int, batch_size: int):
+        rng = self.rng
+        # Por produto: id, preço (centavos), custo (centavos), estoque corrente
+        self.product_ids, self.product_prices, self.product_costs, self.stock = [], [], [], []
+        self.initial_stock = []
+        rows = []
+        for index in range(count):
+            product_id = self._take_id(Product)
+            cost_cents = rng.randrange(500, 30000)
+            price_cents = int(cost_cents * rng.uniform(1.3, 2.5))
+            on_sale = rng.random() < 0.05
+            promotional_cents = int(price_cents * 0.85) if on_sale else None
+            stock = rng.randrange(20, 200)
+
+            self.product_ids.append(product_id)
+            self.product_prices.append(promotional_cents or price_cents)
+            self.product_costs.append(cost_cents)
+            self.stock.append(stock)
+            self.initial_stock.append(stock)
+
+            rows.append({
+                "id": product_id,
+                "name": f"{rng.choice(PRODUCT_WORDS)} {rng.choice(PRODUCT_VARIANTS)} {index + 1}",
+                "description": None,
+                "sku": f"SKU-{self.company_id}-{index + 1:06d}",
+                "barcode": f"789{product_id:010d}",
+                "brand": rng.choice(BRANDS),
+                "cost_price": from_cents(cost_cents),
+                "sale_price": from_cents(price_cents),
+                "is_on_sale": on_sale,
+                "promotional_price": from_cents(promotional_cents) if on_sale else None,
+                "stock_quantity": stock,
+                "min_stock": rng.randrange(0, 15),
+                "category_id": rng.choice(self.category_ids),
+                "company_id": self.company_id,
+                "is_active": rng.random() < 0.97,
+                "created_at": self.start,
+                "updated_at": self.start,
+            })
+            if len(rows) >= batch_size:
+                self.writer.insert(Product.__table__, rows)
+                rows = []
+        self.writer.insert(Product.__table__, rows)
+
+        # Estoque inicial de cada produto
+        movements = []
+        for position, product_id in enumerate(self.product_ids):
+            movements.append(self._movement(position, MovementType.ADJUSTMENT, self.initial_stock[position],
+                                            "manual", None, self.start, previous=0, notes="Estoque inicial"))
+            if len(movements) >= batch_size:
+                self.writer.insert(StockMovement.__table__, movements)
+                movements = []
+        self.writer.insert(StockMovement.__table__, movements)
+        self.writer.conn.commit()
+
+    def create_customers(self, count: int, batch_size: int):
+        rng = self.rng
+        self.customer_ids = []
+        rows = []
+        for _ in range(count):
+            customer_id = self._take_id(Customer)
+            self.customer_ids.append(customer_id)
+            rows.append({
+                "id": customer_id,
+                "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "email": f"cliente{customer_id}@exemplo.test",
+                "phone": f"85{rng.randrange(10 ** 8, 10 ** 9)}",
+                "cpf": f"{customer_id:011d}",
+                "address": f"Rua {rng.choice(LAST_NAMES)}, {rng.randrange(1, 3000)}",
+                "company_id": self.company_id,
+                "is_active": True,
+                "created_at": self.start,
+                "updated_at": self.start,
+            })
+            if len(rows) >= batch_size:
+                self.writer.insert(Customer.__table__, rows)
+                rows = []
+        self.writer.insert(Customer.__table__, rows)
+        self.writer.conn.commit()
+
+    # ----- vendas -----
+
+    def _movement(self, position: int, movement_type: MovementType, quantity: int, reference_type: str,
+                  reference_id, created_at: datetime, previous: int, notes=None) -> dict:
+        return {
+            "id": self._take_id(StockMovement),
+            "product_id": self.product_ids[position],
+            "user_id": self.user_id,
+            "company_id": self.company_id,
+            "movement_type": movement_type,
+            "quantity": quantity,
+            "previous_stock": previous,
+            "new_stock": previous + quantity,
+            "reference_type": reference_type,
+            "reference_id": reference_id,
+            "notes": notes,
+            "created_at": created_at,
+        }
+
+    def _pick_product(self) -> int:
+        # Poucos produtos concentram a maior parte das vendas
+        return int(len(self.product_ids) * self.rng.random() ** 3)
+
+    def create_sales(self, count: int, progress_every: int = 100000):
+        rng = self.rng
+        writer = self.writer
+        span_days = (self.end - self.start).days
+        offsets = sorted(rng.random() for _ in range(count))
+        started = time.perf_counter()
+
+        for number, offset in enumerate(offsets, 1):
+            # Dia uniforme no período, em horário comercial (8h às 20h)
+            created_at = self.start + timedelta(days=int(offset * span_days), hours=8 + rng.random() * 12)
+            self._create_sale(created_at)
+            writer.flush_if_full(Sale.__table__)
+
+            if number % progress_every == 0:
+                rate = number / (time.perf_counter() - started)
+                print(f"   … {number:,} vendas ({rate:,.0f}/s)")
+        writer.flush()
+
+        # Estoque final dos produtos
+        update = Product.__table__.update().where(Product.id == bindparam("product_id")).values(
+            stock_quantity=bindparam("stock_quantity")
+        )
+        writer.conn.execute(update, [
+            {"product_id": product_id, "stock_quantity": stock}
+            for product_id, stock in zip(self.product_ids, self.stock)
+        ])
+        writer.conn.commit()
+
+    def _create_sale(self, created_at: datetime):
+        rng = self.rng
+        writer = self.writer
+        sale_id = self._take_id(Sale)
+        customer_id = self.customer_ids[int(len(self.customer_ids) * rng.random() ** 2)]
+
+        roll = rng.random()
+        payment_type = PaymentType.CASH if roll < 0.4 else PaymentType.PIX if roll < 0.7 else PaymentType.CREDIT
+        cancelled = rng.random() < 0.02
+
+        positions = {self._pick_product() for _ in range(rng.choices(*ITEMS_PER_SALE)[0])}
+        subtotal_cents = cost_cents = 0
+        for position in positions:
+            quantity = 1 + int(rng.random() ** 3 * 3)
+            unit_cents = self.product_prices[position]
+            subtotal_cents += unit_cents * quantity
+            cost_cents += self.product_costs[position] * quantity
+            writer.add(SaleItem.__table__, {
+                "id": self._take_id(SaleItem),
+                "sale_id": sale_id,
+                "product_id": self.product_ids[position],
+                "quantity": quantity,
+                "unit_price": from_cents(unit_cents),
+                "total_price": from_cents(unit_cents * quantity),
+                "unit_cost_price": from_cents(self.product_costs[position]),
+            })
+
+            # Reposição quando o estoque não cobre a venda
+            if self.stock[position] < quantity:
+                restock = rng.randrange(50, 200)
+                writer.add(StockMovement.__table__, self._movement(
+                    position, MovementType.ADJUSTMENT, restock, "manual", None, created_at,
+                    previous=self.stock[position], notes="Reposição"
+                ))
+                self.stock[position] += restock
+            writer.add(StockMovement.__table__, self._movement(
+                position, MovementType.SALE, -quantity, "sale", sale_id, created_at, previous=self.stock[position]
+            ))
+            self.stock[position] -= quantity
+            if cancelled:
+                writer.add(StockMovement.__table__, self._movement(
+                    position, MovementType.CANCEL, quantity, "sale_cancel", sale_id, created_at,
+                    previous=self.stock[position]
+                ))
+                self.stock[position] += quantity
+
+        discount_cents = subtotal_cents * rng.choice((5, 10)) // 100 if rng.random() < 0.1 else 0
+        total_cents = subtotal_cents - discount_cents
+        installments_count = rng.choices(*INSTALLMENT_COUNTS)[0] if payment_type == PaymentType.CREDIT else 1
+
+        writer.add(Sale.__table__, {
+            "id": sale_id,
+            "customer_id": customer_id,
+            "company_id": self.company_id,
+            "user_id": self.user_id,
+            "payment_type": payment_type,
+            "status": SaleStatus.CANCELLED if cancelled else SaleStatus.COMPLETED,
+            "subtotal": from_cents(subtotal_cents),
+            "discount_amount": from_cents(discount_cents),
+            "total_amount": from_cents(total_cents),
+            "total_cost": from_cents(cost_cents),
+            "total_profit": from_cents(total_cents - cost_cents),
+            "installments_count": installments_count,
+            "notes": None,
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+
+        if payment_type == PaymentType.CREDIT:
+            self._create_installments(sale_id, customer_id, created_at, total_cents, installments_count, cancelled)
+
+    def _create_installments(self, sale_id: int, customer_id: int, created_at: datetime, total_cents: int,
+                             count: int, cancelled: bool):
+        rng = self.rng
+        for number, amount in enumerate(split_cents(from_cents(total_cents), count), 1):
+            amount_cents = to_cents(amount)
+            installment_id = self._take_id(Installment)
+            due_date = created_at.date() + timedelta(days=30 * number)
+            due_at = datetime.combine(due_date, created_at.time())
+
+            payments = []
+            if not cancelled:
+                roll = rng.random()
+                if due_at <= self.end:
+                    if roll < 0.85:
+                        # Quitada, às vezes em dois pagamentos
+                        paid_at = min(self._random_time(due_at - timedelta(days=10), due_at + timedelta(days=5)),
+                                      self.end)
+                        paid_at = max(paid_at, created_at)
+                        if rng.random() < 0.2 and amount_cents > 1:
+                            first = amount_cents * rng.randrange(20, 80) // 100
+                            payments = [(first, self._random_time(created_at, paid_at)), (amount_cents - first, paid_at)]
+                        else:
+                            payments = [(amount_cents, paid_at)]
+                    elif roll < 0.95 and amount_cents > 1:
+                        # Pagamento parcial de parcela que venceu
+                        partial = amount_cents * rng.randrange(20, 80) // 100
+                        payments = [(partial, self._random_time(created_at, min(due_at + timedelta(days=20), self.end)))]
+                elif roll < 0.1 and amount_cents > 1:
+                    # Adiantamento parcial de parcela futura
+                    partial = amount_cents * rng.randrange(20, 80) // 100
+                    payments = [(partial, self._random_time(created_at, self.end))]
+
+            paid_cents = sum(value for value, _ in payments)
+            if cancelled:
+                status = InstallmentStatus.CANCELLED
+            elif paid_cents >= amount_cents:
+                status = InstallmentStatus.PAID
+            else:
+                # Vencida é derivada na leitura (due_date < hoje)
+                status = InstallmentStatus.PENDING
+
+            self.writer.add(Installment.__table__, {
+                "id": installment_id,
+                "sale_id": sale_id,
+                "customer_id": customer_id,
+                "company_id": self.company_id,
+                "installment_number": number,
+                "amount": from_cents(amount_cents),
+                "due_date": due_date,
+                "paid_at": payments[-1][1] if status == InstallmentStatus.PAID else None,
+                "status": status,
+                "version": 1 + len(payments),
+                "created_at": created_at,
+                "updated_at": payments[-1][1] if payments else created_at,
+            })
+            for value, paid_at in payments:
+                self.writer.add(InstallmentPayment.__table__, {
+                    "id": self._take_id(InstallmentPayment),
+                    "installment_id": installment_id,
+                    "company_id": self.company_id,
+                    "amount_paid": from_cents(value),
+                    "status": InstallmentPaymentStatus.COMPLETED,
+                    "paid_at": paid_at,
+                    "created_at": paid_at,
+                    "updated_at": paid_at,
+                })
+
+
+def generate(engine, companies: int = 1, categories: int = 8, products: int = 1000, customers: int = 500,
+             sales: int = 10000, years: float = 2.0, seed: int = 42, end_date: date = None,
+             batch_size: int = 5000, create_tables: bool = False, rollups: bool = True) -> dict:
+    """
+    Gera os dados e retorna o número de linhas gravadas por tabela.
+    `products`, `customers` e `sales` são por empresa.
+    """
+    if create_tables:
+        Base.metadata.create_all(bind=engine)
+
+    end = datetime.combine(end_date or date.today(), datetime.min.time())
+    start = end - timedelta(days=int(365 * years))
+    password_hash = hash_password(SYNTHETIC_PASSWORD)
+    company_ids = []
+
+    with engine.connect() as conn:
+        ids = _next_ids(conn)
+        role_id = _role_id(conn)
+        writer = BulkWriter(conn, batch_size)
+
+        for index in range(companies):
+            started = time.perf_counter()
+            rng = random.Random(f"{seed}:{index}")
+            company = CompanyGenerator(writer, ids, rng, role_id, password_hash, start, end)
+            company_id = company.create_company()
+            print(f"🏪 Empresa {company_id} ({index + 1}/{companies})")
+
+            company.create_categories(categories)
+            company.create_products(products, batch_size)
+            company.create_customers(customers, batch_size)
+            company.create_sales(sales)
+            company_ids.append(company_id)
+            print(f"   ✓ {sales:,} vendas em {time.perf_counter() - started:.1f}s")
+
+        if engine.dialect.name == "postgresql":
+            _reset_sequences(conn)
+        counts = dict(writer.counts)
+
+    if rollups:
+        print("📊 Recalculando consolidados de vendas...")
+        with Session(engine) as db:
+            for company_id in company_ids:
+                counts["product_daily_sales"] = counts.get("product_daily_sales", 0) + rebuild_rollup(db, company_id)
+                counts["customer_product_stats"] = (
+                    counts.get("customer_product_stats", 0) + rebuild_customer_stats(db, company_id)
+                )
+            db.commit()
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera massa de dados sintética para benchmark")
+    parser.add_argument("--database-url", required=True, help="ex: sqlite:///bench.db ou postgresql://...")
+    parser.add_argument("--companies", type=int, default=1)
+    parser.add_argument("--categories", type=int, default=8, help="Por empresa")
+    parser.add_argument("--products", type=int, default=1000, help="Por empresa")
+    parser.add_argument("--customers", type=int, default=500, help="Por empresa")
+    parser.add_argument("--sales", type=int, default=10000, help="Por empresa")
+    parser.add_argument("--years", type=float, default=2.0, help="Período das vendas até --end-date")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="AAAA-MM-DD (padrão: hoje)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--create-tables", action="store_true", help="Cria as tabelas (create_all) se não existirem")
+    parser.add_argument("--skip-rollups", action="store_true", help="Não recalcula os consolidados de vendas")
+    args = parser.parse_args()
+
+    engine = create_generator_engine(args.database_url)
+    started = time.perf_counter()
+    counts = generate(
+        engine,
+        companies=args.companies,
+        categories=args.categories,
+        products=args.products,
+        customers=args.customers,
+        sales=args.sales,
+        years=args.years,
+        seed=args.seed,
+        end_date=args.end_date,
+        batch_size=args.batch_size,
+        create_tables=args.create_tables,
+        rollups=not args.skip_rollups,
+    )
+
+    print(f"✅ Concluído em {time.perf_counter() - started:.1f}s")
+    for table, count in sorted(counts.items()):
+        print(f"   {table}: {count:,}")
+
+
+if __name__ == "__main__":
+    main()
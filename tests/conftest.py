@@ -5,6 +5,8 @@ os.environ["TESTING"] = "true"
 Configuração de fixtures para testes do sistema TatyStore
 Todas as fixtures compartilhadas entre os testes estão aqui
 """
+from datetime import date, timedelta
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -544,6 +546,70 @@ def test_sale(db, test_company1, test_customer, test_product, test_admin_user):
     return sale
 
 
+@pytest.fixture(scope="function")
+def credit_sale_installments(db, test_company1, test_customer, test_admin_user):
+    """
+    Fábrica de vendas a crediário com parcelas de valor fixo (faz flush, sem commit)
+
+    Uso: credit_sale_installments([-10, (0, "pending"), (30, "paid")], company_id=..., customer_id=...)
+    - cada item é o deslocamento do vencimento em dias a partir de hoje, ou (deslocamento, status)
+    - status: padrão das parcelas sem status próprio
+    - numbers: números das parcelas (padrão 1..n na ordem informada)
+
+    Retorna as parcelas na ordem informada.
+    """
+    def create(due_offsets, company_id=None, customer_id=None, status="pending", amount=100.0, numbers=None):
+        company_id = company_id or test_company1.id
+        customer_id = customer_id or test_customer.id
+        total = amount * len(due_offsets)
+        sale = Sale(customer_id=customer_id, company_id=company_id, user_id=test_admin_user.id,
+                    subtotal=total, total_amount=total, payment_type="credit", status="completed")
+        db.add(sale)
+        db.flush()
+
+        installments = []
+        for index, entry in enumerate(due_offsets):
+            offset, installment_status = entry if isinstance(entry, tuple) else (entry, status)
+            installments.append(Installment(
+                sale_id=sale.id,
+                customer_id=customer_id,
+                company_id=company_id,
+                installment_number=numbers[index] if numbers else index + 1,
+                amount=amount,
+                status=installment_status,
+                due_date=date.today() + timedelta(days=offset)
+            ))
+        db.add_all(installments)
+        db.flush()
+        return installments
+
+    return create
+
+
+@pytest.fixture(scope="function")
+def cash_sale(client, admin_token, test_customer):
+    """
+    Fábrica de vendas à vista pela API (POST /sales, preço unitário 20,00)
+
+    Uso: cash_sale([(product_id, quantidade), ...], customer_id=...)
+    Retorna o id da venda criada.
+    """
+    def create(items, customer_id=None):
+        response = client.post(
+            "/api/v1/sales/",
+            headers=get_auth_headers(admin_token),
+            json={
+                "customer_id": customer_id or test_customer.id,
+                "payment_type": "cash",
+                "items": [{"product_id": pid, "quantity": qty, "unit_price": 20.00} for pid, qty in items]
+            }
+        )
+        assert response.status_code == 201, response.text
+        return response.json()["id"]
+
+    return create
+
+
 @pytest.fixture(scope="function")
 def test_company(db):
     """
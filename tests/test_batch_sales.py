@@ -0,0 +1,107 @@
+"""
+Testes do Lote de Vendas (POST /sales/batch) para sincronização de PDV offline
+"""
+from app.models.stock_movement import StockMovement
+from tests.conftest import get_auth_headers, Customer, Installment, Product, Sale
+
+
+def _entry(customer_id, product_id, quantity, reference, **extra):
+    return {
+        "client_reference": reference,
+        "customer_id": customer_id,
+        "payment_type": "cash",
+        "items": [{"product_id": product_id, "quantity": quantity, "unit_price": 20.00}],
+        **extra
+    }
+
+
+def test_batch_creates_valid_sales_and_rejects_others(client, admin_token, test_product, test_customer, db):
+    """
+    Teste: Vendas válidas são gravadas, as inválidas voltam com o motivo
+    """
+    payload = {"sales": [
+        _entry(test_customer.id, test_product.id, 60, "pdv-1"),
+        _entry(test_customer.id, test_product.id, 50, "pdv-2"),  # Estoque restante: 40
+        _entry(test_customer.id, test_product.id, 40, "pdv-3"),
+        _entry(test_customer.id, test_product.id, 1, "pdv-4", payment_type="credit", installments_count=2),
+        _entry(999999, test_product.id, 1, "pdv-5"),
+    ]}
+
+    response = client.post("/api/v1/sales/batch", headers=get_auth_headers(admin_token), json=payload)
+    assert response.status_code == 200, response.text
+    data = response.json()
+
+    assert data["created"] == 2
+    assert data["rejected"] == 3
+    statuses = [(r["client_reference"], r["status"]) for r in data["results"]]
+    assert statuses == [("pdv-1", "created"), ("pdv-2", "rejected"), ("pdv-3", "created"),
+                        ("pdv-4", "rejected"), ("pdv-5", "rejected")]
+    assert "Estoque insuficiente" in data["results"][1]["error"]
+    assert "crediário" in data["results"][3]["error"]
+    assert data["results"][4]["error"] == "Cliente não encontrado"
+
+    created_ids = [r["sale_id"] for r in data["results"] if r["status"] == "created"]
+    assert db.query(Sale).filter(Sale.id.in_(created_ids)).count() == 2
+    assert db.query(Sale).count() == 2
+
+    db.expire_all()
+    assert db.query(Product).filter(Product.id == test_product.id).first().stock_quantity == 0
+
+    movements = db.query(StockMovement).filter(
+        StockMovement.product_id == test_product.id
+    ).order_by(StockMovement.id).all()
+    assert [(m.previous_stock, m.new_stock) for m in movements] == [(100, 40), (40, 0)]
+
+
+def test_batch_all_or_nothing(client, admin_token, test_product, test_customer, db):
+    """
+    Teste: Com all_or_nothing, uma rejeição impede a gravação do lote inteiro
+    """
+    payload = {"all_or_nothing": True, "sales": [
+        _entry(test_customer.id, test_product.id, 10, "pdv-1"),
+        _entry(test_customer.id, test_product.id, 500, "pdv-2"),
+    ]}
+
+    data = client.post("/api/v1/sales/batch", headers=get_auth_headers(admin_token), json=payload).json()
+
+    assert data["created"] == 0
+    assert [r["status"] for r in data["results"]] == ["skipped", "rejected"]
+    assert db.query(Sale).count() == 0
+    db.expire_all()
+    assert db.query(Product).filter(Product.id == test_product.id).first().stock_quantity == 100
+
+
+def test_batch_credit_sales_generate_installments(client, admin_token, test_company1, test_product, db):
+    """
+    Teste: Vendas a crediário do lote geram as parcelas normalmente
+    """
+    customer = Customer(name="Cliente Completo", cpf="98765432100", phone="85999999999",
+                        address="Rua A, 1", company_id=test_company1.id, is_active=True)
+    db.add(customer)
+    db.commit()
+
+    payload = {"sales": [
+        _entry(customer.id, test_product.id, 3, f"pdv-{i}", payment_type="credit", installments_count=3)
+        for i in range(4)
+    ]}
+
+    data = client.post("/api/v1/sales/batch", headers=get_auth_headers(admin_token), json=payload).json()
+
+    assert data["created"] == 4
+    assert db.query(Installment).count() == 12
+    db.expire_all()
+    assert db.query(Product).filter(Product.id == test_product.id).first().stock_quantity == 88
+
+
+def test_batch_is_tenant_scoped(client, admin_token, test_customer, test_product_company2, db):
+    """
+    Teste: Produto de outra empresa é rejeitado como não encontrado
+    """
+    payload = {"sales": [_entry(test_customer.id, test_product_company2.id, 1, "pdv-1")]}
+
+    data = client.post("/api/v1/sales/batch", headers=get_auth_headers(admin_token), json=payload).json()
+
+    assert data["results"][0]["status"] == "rejected"
+    assert "não encontrado" in data["results"][0]["error"]
+    db.expire_all()
+    assert db.query(Product).filter(Product.id == test_product_company2.id).first().stock_quantity == 50
@@ -0,0 +1,87 @@
+"""
+Testes do Gerador de Massa de Dados Sintética (scripts/generate_synthetic_data.py)
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from scripts.generate_synthetic_data import create_generator_engine, generate
+from app.models.installment import Installment, InstallmentStatus
+from app.models.installment_payment import InstallmentPayment
+from app.models.product import Product
+from app.models.product_daily_sales import ProductDailySales
+from app.models.sale import PaymentType, Sale, SaleItem, SaleStatus
+from app.models.stock_movement import StockMovement
+
+OPTIONS = dict(companies=2, categories=4, products=60, customers=30, sales=400, years=1.0,
+               seed=7, end_date=date(2026, 6, 30), batch_size=100, create_tables=True)
+
+
+@pytest.fixture
+def generated(tmp_path):
+    engine = create_generator_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    counts = generate(engine, **OPTIONS)
+    yield engine, counts
+    engine.dispose()
+
+
+def test_generates_requested_volume(generated):
+    """
+    Teste: Volume por empresa conforme os parâmetros, com itens, parcelas e pagamentos
+    """
+    engine, counts = generated
+    assert counts["companies"] == 2
+    assert counts["products"] == 120
+    assert counts["customers"] == 60
+    assert counts["sales"] == 800
+    assert counts["sale_items"] >= 800
+    assert counts["installments"] > 0 and counts["installment_payments"] > 0
+
+    with Session(engine) as db:
+        assert db.query(Sale).count() == 800
+        assert db.query(Sale).filter(Sale.payment_type == PaymentType.CREDIT).count() > 0
+        assert db.query(Installment).filter(Installment.is_overdue).count() > 0
+        assert db.query(Installment).filter(Installment.status == InstallmentStatus.PAID).count() > 0
+
+
+def test_generated_data_is_consistent(generated):
+    """
+    Teste: Parcelas somam o total da venda, estoque bate com as movimentações e consolidados com os itens
+    """
+    engine, _ = generated
+    with Session(engine) as db:
+        for sale in db.query(Sale).filter(Sale.payment_type == PaymentType.CREDIT):
+            assert round(sum(i.amount for i in sale.installments), 2) == sale.total_amount
+            for installment in sale.installments:
+                paid = sum(p.amount_paid for p in installment.payments)
+                assert paid <= installment.amount + 0.001
+                if installment.status == InstallmentStatus.PAID:
+                    assert round(paid, 2) == installment.amount
+
+        for product in db.query(Product):
+            movements = db.query(func.sum(StockMovement.quantity)).filter(
+                StockMovement.product_id == product.id
+            ).scalar()
+            assert product.stock_quantity == movements >= 0
+
+        sold = db.query(func.sum(SaleItem.quantity)).join(Sale).filter(Sale.status == SaleStatus.COMPLETED).scalar()
+        assert db.query(func.sum(ProductDailySales.quantity)).scalar() == sold
+
+
+def test_same_seed_generates_same_data(tmp_path):
+    """
+    Teste: Mesma seed e mesma data final geram os mesmos dados
+    """
+    totals = []
+    for name in ("a.db", "b.db"):
+        engine = create_generator_engine(f"sqlite:///{tmp_path / name}")
+        generate(engine, **{**OPTIONS, "companies": 1, "sales": 200})
+        with Session(engine) as db:
+            totals.append(db.query(Sale.id, Sale.created_at, Sale.total_amount, InstallmentPayment.amount_paid)
+                          .outerjoin(Installment, Installment.sale_id == Sale.id)
+                          .outerjoin(InstallmentPayment, InstallmentPayment.installment_id == Installment.id)
+                          .order_by(Sale.id, Installment.id, InstallmentPayment.id).all())
+        engine.dispose()
+    assert totals[0] == totals[1]
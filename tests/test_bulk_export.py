@@ -0,0 +1,129 @@
+"""
+Testes da Exportação em CSV (catálogo de produtos e clientes)
+"""
+import csv
+import io
+from datetime import date, timedelta
+
+from app.core.config import settings
+from app.models.category import Category
+from app.models.customer import Customer
+from app.models.installment import Installment, InstallmentStatus
+from app.models.installment_payment import InstallmentPayment, InstallmentPaymentStatus
+from app.models.product import Product
+from app.models.sale import Sale
+from tests.conftest import get_auth_headers
+
+
+def _read_csv(response, delimiter=","):
+    text = response.content.decode("utf-8")
+    assert text.startswith("\ufeff")
+    return list(csv.DictReader(io.StringIO(text[1:]), delimiter=delimiter))
+
+
+def test_export_products_streams_all_rows(client, admin_token, test_company1, test_product_company2, db, monkeypatch):
+    """
+    Teste: Exporta todos os produtos da empresa em vários blocos, com nome da categoria
+    """
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 4)
+
+    category = Category(name="Perfumaria", company_id=test_company1.id, is_active=True)
+    db.add(category)
+    db.flush()
+    db.add_all([
+        Product(
+            name=f"Produto {i}", brand="Marca", category_id=category.id, cost_price=10,
+            sale_price=19.9, stock_quantity=i, min_stock=1, sku=f"EXP-{i:02d}",
+            company_id=test_company1.id, is_active=i % 2 == 0
+        )
+        for i in range(10)
+    ])
+    db.add(Product(name="=HYPERLINK(\"x\")", sale_price=1, cost_price=1, sku="EXP-XX", company_id=test_company1.id))
+    db.commit()
+
+    response = client.get("/api/v1/exports/products", headers=get_auth_headers(admin_token))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "attachment" in response.headers["content-disposition"]
+
+    rows = _read_csv(response)
+    assert len(rows) == 11
+    assert rows[3]["categoria"] == "Perfumaria"
+    assert rows[3]["preco_venda"] == "19.90"
+    assert rows[3]["estoque"] == "3"
+    assert rows[3]["ativo"] == "false"
+    # Produto de outra empresa não aparece
+    assert "PROD-002" not in [row["sku"] for row in rows]
+    # Texto que seria interpretado como fórmula é escapado
+    assert rows[10]["nome"].startswith("'=")
+
+    active = client.get(
+        "/api/v1/exports/products?active_only=true&delimiter=;",
+        headers=get_auth_headers(admin_token)
+    )
+    assert len(_read_csv(active, delimiter=";")) == 6
+
+
+def test_export_customers_with_debt(client, admin_token, test_company1, test_admin_user, test_customer, db):
+    """
+    Teste: Débito por cliente calculado em lote, igual ao de GET /customers
+    """
+    other = Customer(name="Sem Débito", company_id=test_company1.id, is_active=True)
+    db.add(other)
+    sale = Sale(
+        customer_id=test_customer.id, company_id=test_company1.id, user_id=test_admin_user.id,
+        total_amount=300.0, payment_type="credit"
+    )
+    db.add(sale)
+    db.flush()
+
+    overdue = Installment(
+        sale_id=sale.id, customer_id=test_customer.id, company_id=test_company1.id,
+        installment_number=1, amount=100.0, due_date=date.today() - timedelta(days=3),
+        status=InstallmentStatus.PENDING
+    )
+    future = Installment(
+        sale_id=sale.id, customer_id=test_customer.id, company_id=test_company1.id,
+        installment_number=2, amount=100.0, due_date=date.today() + timedelta(days=30),
+        status=InstallmentStatus.PENDING
+    )
+    paid = Installment(
+        sale_id=sale.id, customer_id=test_customer.id, company_id=test_company1.id,
+        installment_number=3, amount=100.0, due_date=date.today() - timedelta(days=30),
+        status=InstallmentStatus.PAID
+    )
+    db.add_all([overdue, future, paid])
+    db.flush()
+    db.add(InstallmentPayment(
+        installment_id=overdue.id, company_id=test_company1.id,
+        amount_paid=40.0, status=InstallmentPaymentStatus.COMPLETED
+    ))
+    db.commit()
+
+    response = client.get(
+        "/api/v1/exports/customers?include_debt=true",
+        headers=get_auth_headers(admin_token)
+    )
+    assert response.status_code == 200
+
+    rows = {row["nome"]: row for row in _read_csv(response)}
+    assert rows["Cliente Teste"]["total_debito"] == "160.00"
+    assert rows["Cliente Teste"]["total_vencido"] == "60.00"
+    assert rows["Sem Débito"]["total_debito"] == "0.00"
+
+    listing = client.get("/api/v1/customers/", headers=get_auth_headers(admin_token)).json()
+    listed = next(c for c in listing["items"] if c["id"] == test_customer.id)
+    assert listed["total_debt"] == 160.0
+    assert listed["total_due"] == 60.0
+
+    without_debt = _read_csv(client.get("/api/v1/exports/customers", headers=get_auth_headers(admin_token)))
+    assert "total_debito" not in without_debt[0]
+
+
+def test_export_requires_manager(client, user_token):
+    """
+    Teste: Vendedor não pode exportar
+    """
+    response = client.get("/api/v1/exports/customers", headers=get_auth_headers(user_token))
+    assert response.status_code == 403
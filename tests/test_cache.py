@@ -0,0 +1,39 @@
+"""
+Testes do Cache em Memória com TTL e Tamanho Máximo
+"""
+from app.core import cache as cache_module
+from app.core.cache import TTLCache
+
+
+def test_least_recently_used_entry_is_evicted_above_maxsize():
+    """
+    Teste: Acima de maxsize sai a entrada usada há mais tempo
+    """
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_expired_entries_are_dropped_on_read_and_write(monkeypatch):
+    """
+    Teste: Entradas vencidas não são devolvidas e saem do cache na próxima gravação
+    """
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    now[0] += 61
+    assert cache.get("a") is None
+
+    cache.set("c", 3)
+    assert cache.keys() == ["c"]
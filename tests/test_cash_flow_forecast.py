@@ -0,0 +1,102 @@
+"""
+Testes da Previsão de Recebimentos (fluxo de caixa do crediário)
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from app.core import cache as cache_module
+from app.core.config import settings
+from app.models.installment_payment import InstallmentPayment, InstallmentPaymentStatus
+from app.services.cash_flow_service import _forecast_cache, get_cash_flow_forecast, invalidate_forecast_cache
+from tests.conftest import get_auth_headers
+
+URL = "/api/v1/reports/cash-flow-forecast"
+
+
+@pytest.fixture(autouse=True)
+def clear_forecast_cache():
+    invalidate_forecast_cache()
+    yield
+    invalidate_forecast_cache()
+
+
+@pytest.fixture
+def receivables(db, test_company1, credit_sale_installments):
+    """Parcelas de 100 com vencimento em -10, 0, +1, +8 e +200 dias, uma paga e uma com pagamento parcial"""
+    offsets = [(-10, "overdue"), (0, "pending"), (1, "pending"), (8, "pending"), (200, "pending"), (2, "paid")]
+    installments = dict(zip([offset for offset, _ in offsets], credit_sale_installments(offsets)))
+    db.add(InstallmentPayment(installment_id=installments[8].id, company_id=test_company1.id,
+                              amount_paid=30.0, status=InstallmentPaymentStatus.COMPLETED))
+    db.commit()
+    return installments
+
+
+def test_daily_forecast_rolls_overdue_into_current_bucket(client, admin_token, receivables):
+    """
+    Teste: Vencidas entram na faixa de hoje e o saldo desconta pagamentos parciais
+    """
+    data = client.get(f"{URL}?granularity=day&periods=10", headers=get_auth_headers(admin_token)).json()
+
+    amounts = [bucket["expected_amount"] for bucket in data["buckets"]]
+    assert len(amounts) == 10
+    assert data["buckets"][0]["start"] == date.today().isoformat()
+    assert amounts[0] == 200.0
+    assert amounts[1] == 100.0
+    assert amounts[8] == 70.0
+    assert data["buckets"][0]["installments_count"] == 2
+    assert data["overdue_amount"] == 100.0
+    assert data["total_expected"] == 370.0
+
+
+def test_monthly_forecast_covers_horizon(client, admin_token, receivables):
+    """
+    Teste: Faixas mensais começam no dia 1 e incluem parcelas dentro do horizonte
+    """
+    data = client.get(f"{URL}?granularity=month&periods=12", headers=get_auth_headers(admin_token)).json()
+
+    assert data["buckets"][0]["start"] == date.today().replace(day=1).isoformat()
+    assert data["total_expected"] == 470.0
+
+
+def test_forecast_is_cached_until_payment(client, admin_token, receivables):
+    """
+    Teste: Segunda consulta vem do cache; um pagamento invalida o cache da empresa
+    """
+    headers = get_auth_headers(admin_token)
+
+    first = client.get(f"{URL}?granularity=week", headers=headers).json()
+    second = client.get(f"{URL}?granularity=week", headers=headers).json()
+    assert first["cached"] is False
+    assert second["cached"] is True
+
+    response = client.post("/api/v1/installment-payments/", headers=headers,
+                           json={"installment_id": receivables[1].id, "amount": 100.0})
+    assert response.status_code == 201, response.text
+
+    third = client.get(f"{URL}?granularity=week", headers=headers).json()
+    assert third["cached"] is False
+    assert third["total_expected"] == first["total_expected"] - 100.0
+
+
+def test_forecast_requires_manager(client, user_token):
+    """
+    Teste: Vendedor/usuário comum não acessa a previsão
+    """
+    response = client.get(URL, headers=get_auth_headers(user_token))
+    assert response.status_code == 403
+
+
+def test_forecasts_of_previous_days_are_evicted(db, test_company1, monkeypatch):
+    """
+    Teste: A chave inclui a data; previsões vencidas saem do cache na gravação seguinte
+    """
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    yesterday = date.today() - timedelta(days=1)
+
+    get_cash_flow_forecast(db, test_company1.id, as_of=yesterday)
+    now[0] += settings.CASH_FLOW_CACHE_TTL_SECONDS + 1
+    get_cash_flow_forecast(db, test_company1.id, as_of=date.today())
+
+    assert _forecast_cache.keys() == [(test_company1.id, "week", 12, date.today())]
@@ -0,0 +1,91 @@
+"""
+Testes da Paginação por Cursor (keyset)
+"""
+from datetime import date, datetime, timedelta
+
+from app.schemas.pagination import decode_cursor, encode_cursor
+from tests.conftest import get_auth_headers, Product, Sale, Installment
+
+
+def _walk(client, url, token, limit):
+    """Percorre todas as páginas seguindo o next_cursor"""
+    items, cursor, pages = [], "", 0
+    while True:
+        separator = "&" if "?" in url else "?"
+        response = client.get(f"{url}{separator}cursor={cursor}&limit={limit}", headers=get_auth_headers(token))
+        assert response.status_code == 200
+        data = response.json()
+        items.extend(data["items"])
+        pages += 1
+        if not data["next_cursor"]:
+            assert data["metadata"]["has_next"] is False
+            return items, pages
+        assert data["metadata"]["has_next"] is True
+        cursor = data["next_cursor"]
+
+
+def test_cursor_roundtrip():
+    """
+    Teste: Cursor preserva tipos das chaves de ordenação
+    """
+    values = [datetime(2024, 5, 1, 10, 30, 15, 123), date(2024, 5, 2), 42]
+    assert decode_cursor(encode_cursor(values), 3) == values
+
+
+def test_products_cursor_pages_cover_all_rows(client, admin_token, test_company1, db):
+    """
+    Teste: Páginas por cursor trazem todos os produtos, sem repetição
+    """
+    db.add_all([
+        Product(name=f"Produto {i}", sku=f"CUR-{i:02d}", cost_price=1, sale_price=2,
+                company_id=test_company1.id, is_active=True)
+        for i in range(12)
+    ])
+    db.commit()
+
+    items, pages = _walk(client, "/api/v1/products/", admin_token, limit=5)
+
+    assert pages == 3
+    ids = [item["id"] for item in items]
+    assert len(ids) == 12
+    assert ids == sorted(set(ids))
+
+    # Sem cursor a resposta continua sendo a lista simples
+    legacy = client.get("/api/v1/products/", headers=get_auth_headers(admin_token)).json()
+    assert isinstance(legacy, list)
+    assert len(legacy) == 12
+
+
+def test_installments_cursor_follows_due_date(client, admin_token, test_company1, test_admin_user, test_customer, db):
+    """
+    Teste: Parcelas com mesmo vencimento são desempatadas pelo id
+    """
+    sale = Sale(customer_id=test_customer.id, company_id=test_company1.id, user_id=test_admin_user.id,
+                total_amount=700.0, payment_type="credit")
+    db.add(sale)
+    db.flush()
+    base = date.today()
+    db.add_all([
+        Installment(sale_id=sale.id, customer_id=test_customer.id, company_id=test_company1.id,
+                    installment_number=i + 1, amount=100.0, due_date=base + timedelta(days=30 * (i // 2)))
+        for i in range(7)
+    ])
+    db.commit()
+
+    items, _ = _walk(client, "/api/v1/installments/filter", admin_token, limit=2)
+
+    keys = [(item["due_date"], item["id"]) for item in items]
+    assert len(keys) == 7
+    assert keys == sorted(keys)
+
+    offset = client.get("/api/v1/installments/", headers=get_auth_headers(admin_token)).json()
+    assert offset["total"] == 7
+    assert "next_cursor" not in offset
+
+
+def test_invalid_cursor_returns_400(client, admin_token):
+    """
+    Teste: Cursor malformado é rejeitado
+    """
+    response = client.get("/api/v1/customers/?cursor=nao-e-um-cursor", headers=get_auth_headers(admin_token))
+    assert response.status_code == 400
@@ -0,0 +1,67 @@
+"""
+Testes das Estatísticas Cliente x Produto (customer_product_stats)
+"""
+from app.models.customer_product_stats import CustomerProductStats
+from tests.conftest import get_auth_headers, Product, Sale, SaleItem
+
+
+def _products_url(customer_id):
+    return f"/api/v1/sales/by-customer/{customer_id}/products"
+
+
+def test_purchased_products_follow_sales_and_cancellation(client, admin_token, test_company1,
+                                                          test_product, test_customer, db, cash_sale):
+    """
+    Teste: Venda soma nas estatísticas do cliente e o cancelamento as recalcula
+    """
+    other = Product(name="Produto B", brand="Marca B", sku="PROD-B", cost_price=4.0, sale_price=8.0,
+                    stock_quantity=100, company_id=test_company1.id, is_active=True)
+    db.add(other)
+    db.commit()
+    headers = get_auth_headers(admin_token)
+
+    cash_sale([(test_product.id, 2), (other.id, 1)])
+    cash_sale([(test_product.id, 3)])
+    last_id = cash_sale([(other.id, 1)])
+
+    data = client.get(_products_url(test_customer.id), headers=headers).json()
+    assert data["total"] == 2
+    first = data["items"][0]
+    assert (first["product_id"], first["times_purchased"], first["total_quantity"], first["total_spent"]) == \
+        (test_product.id, 2, 5, 100.0)
+
+    client.post(f"/api/v1/sales/{last_id}/cancel", headers=headers)
+
+    db.expire_all()
+    stats = db.query(CustomerProductStats).filter(CustomerProductStats.product_id == other.id).one()
+    assert (stats.times_purchased, stats.total_quantity, stats.total_spent) == (1, 1, 20.0)
+
+    data = client.get(f"{_products_url(test_customer.id)}?limit=1&skip=1", headers=headers).json()
+    assert data["total"] == 2
+    assert [item["product_id"] for item in data["items"]] == [other.id]
+
+
+def test_rebuild_customer_products(client, admin_token, test_company1, test_admin_user,
+                                   test_product, test_customer, db):
+    """
+    Teste: Rebuild refaz as estatísticas a partir das vendas concluídas
+    """
+    sale = Sale(customer_id=test_customer.id, company_id=test_company1.id, user_id=test_admin_user.id,
+                subtotal=60.0, total_amount=60.0, payment_type="cash", status="completed")
+    db.add(sale)
+    db.flush()
+    db.add(SaleItem(sale_id=sale.id, product_id=test_product.id, quantity=3,
+                    unit_price=20.0, total_price=60.0, unit_cost_price=10.0))
+    db.commit()
+    headers = get_auth_headers(admin_token)
+
+    assert client.get(_products_url(test_customer.id), headers=headers).json()["total"] == 0
+
+    response = client.post(f"/api/v1/reports/customer-products/rebuild?customer_id={test_customer.id}",
+                           headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["rows"] == 1
+
+    data = client.get(_products_url(test_customer.id), headers=headers).json()
+    assert data["items"][0]["total_quantity"] == 3
+    assert data["items"][0]["last_purchase_date"] is not None
@@ -0,0 +1,183 @@
+"""
+Testes do Header Idempotency-Key (POST /sales e POST /installment-payments)
+"""
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.idempotency_key import IdempotencyKey, IdempotencyStatus
+from app.models.installment_payment import InstallmentPayment
+from app.schemas.sale import SaleCreate
+from app.services.idempotency_service import _request_hash
+from tests.conftest import engine, get_auth_headers, Installment, Product, Sale
+
+
+def _sale_payload(product_id, customer_id, quantity=2):
+    return {
+        "customer_id": customer_id,
+        "payment_type": "cash",
+        "items": [{"product_id": product_id, "quantity": quantity, "unit_price": 20.00}]
+    }
+
+
+def _headers(token, key):
+    return {**get_auth_headers(token), "Idempotency-Key": key}
+
+
+def test_sale_replay_returns_same_sale(client, admin_token, test_product, test_customer, db):
+    """
+    Teste: Reenvio com a mesma chave devolve a mesma venda e não baixa o estoque de novo
+    """
+    payload = _sale_payload(test_product.id, test_customer.id)
+
+    first = client.post("/api/v1/sales/", headers=_headers(admin_token, "venda-1"), json=payload)
+    second = client.post("/api/v1/sales/", headers=_headers(admin_token, "venda-1"), json=payload)
+
+    assert first.status_code == 201, first.text
+    assert second.status_code == 201, second.text
+    assert second.json()["id"] == first.json()["id"]
+    assert second.headers.get("Idempotency-Replayed") == "true"
+    assert "Idempotency-Replayed" not in first.headers
+
+    assert db.query(Sale).count() == 1
+    db.expire_all()
+    assert db.query(Product).filter(Product.id == test_product.id).first().stock_quantity == 98
+
+
+def test_sale_without_key_is_not_deduplicated(client, admin_token, test_product, test_customer, db):
+    """
+    Teste: Sem o header o comportamento continua o mesmo (cada POST cria uma venda)
+    """
+    payload = _sale_payload(test_product.id, test_customer.id)
+    headers = get_auth_headers(admin_token)
+
+    client.post("/api/v1/sales/", headers=headers, json=payload)
+    client.post("/api/v1/sales/", headers=headers, json=payload)
+
+    assert db.query(Sale).count() == 2
+    assert db.query(IdempotencyKey).count() == 0
+
+
+def test_same_key_with_different_payload_is_rejected(client, admin_token, test_product, test_customer, db):
+    """
+    Teste: Reutilizar a chave com outro corpo retorna 422
+    """
+    client.post("/api/v1/sales/", headers=_headers(admin_token, "venda-2"),
+                json=_sale_payload(test_product.id, test_customer.id, quantity=1))
+    response = client.post("/api/v1/sales/", headers=_headers(admin_token, "venda-2"),
+                           json=_sale_payload(test_product.id, test_customer.id, quantity=3))
+
+    assert response.status_code == 422
+    assert db.query(Sale).count() == 1
+
+
+def test_failed_request_releases_key(client, admin_token, test_product, test_customer, db):
+    """
+    Teste: Se a venda falha (estoque insuficiente), a chave pode ser usada de novo
+    """
+    payload = _sale_payload(test_product.id, test_customer.id, quantity=1000)
+
+    response = client.post("/api/v1/sales/", headers=_headers(admin_token, "venda-3"), json=payload)
+    assert response.status_code == 400
+    assert db.query(IdempotencyKey).count() == 0
+
+
+def test_in_progress_key_returns_conflict(client, admin_token, test_company1, test_product,
+                                          test_customer, db, monkeypatch):
+    """
+    Teste: Duplicata enquanto a primeira requisição está em andamento recebe 409
+    """
+    payload = _sale_payload(test_product.id, test_customer.id)
+    db.add(IdempotencyKey(
+        company_id=test_company1.id,
+        endpoint="POST /sales",
+        key="venda-4",
+        request_hash=_request_hash(SaleCreate(**payload).model_dump(mode="json")),
+        status=IdempotencyStatus.IN_PROGRESS,
+        expires_at=datetime.utcnow() + timedelta(minutes=2)
+    ))
+    db.commit()
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 0)
+
+    response = client.post("/api/v1/sales/", headers=_headers(admin_token, "venda-4"), json=payload)
+    assert response.status_code == 409
+    assert db.query(Sale).count() == 0
+
+
+def test_expired_key_is_reused(client, admin_token, test_company1, test_product, test_customer, db):
+    """
+    Teste: Chave expirada é descartada e a operação é executada normalmente
+    """
+    db.add(IdempotencyKey(
+        company_id=test_company1.id,
+        endpoint="POST /sales",
+        key="venda-5",
+        request_hash="0" * 64,
+        status=IdempotencyStatus.COMPLETED,
+        response_body="{}",
+        expires_at=datetime.utcnow() - timedelta(hours=1)
+    ))
+    db.commit()
+
+    response = client.post("/api/v1/sales/", headers=_headers(admin_token, "venda-5"),
+                           json=_sale_payload(test_product.id, test_customer.id))
+    assert response.status_code == 201, response.text
+    assert db.query(Sale).count() == 1
+
+
+def test_payment_replay_is_registered_once(client, admin_token, test_company1, test_admin_user,
+                                           test_customer, db):
+    """
+    Teste: Pagamento reenviado com a mesma chave é registrado uma única vez
+    """
+    sale = Sale(customer_id=test_customer.id, company_id=test_company1.id, user_id=test_admin_user.id,
+                subtotal=100.0, total_amount=100.0, payment_type="credit", status="completed")
+    db.add(sale)
+    db.flush()
+    installment = Installment(
+        sale_id=sale.id,
+        customer_id=test_customer.id,
+        company_id=test_company1.id,
+        installment_number=1,
+        amount=100.0,
+        due_date=date.today() + timedelta(days=30)
+    )
+    db.add(installment)
+    db.commit()
+
+    payload = {"installment_id": installment.id, "amount": 40.0}
+    first = client.post("/api/v1/installment-payments/", headers=_headers(admin_token, "pag-1"), json=payload)
+    second = client.post("/api/v1/installment-payments/", headers=_headers(admin_token, "pag-1"), json=payload)
+
+    assert first.status_code == 201, first.text
+    assert second.status_code == 201, second.text
+    assert second.json()["id"] == first.json()["id"]
+    assert db.query(InstallmentPayment).filter(InstallmentPayment.installment_id == installment.id).count() == 1
+
+
+def test_key_is_completed_in_the_same_commit_as_the_sale(client, admin_token, test_product, test_customer):
+    """
+    Teste: Nenhum commit deixa a venda gravada com a chave ainda em processamento
+    (uma queda nesse intervalo permitiria gravar a venda duas vezes)
+    """
+    states = []
+
+    def record_state(session):
+        with engine.connect() as conn:
+            states.append((
+                conn.execute(select(func.count(Sale.id))).scalar(),
+                conn.execute(select(IdempotencyKey.status)).scalar()
+            ))
+
+    event.listen(Session, "after_commit", record_state)
+    try:
+        response = client.post("/api/v1/sales/", headers=_headers(admin_token, "venda-atomica"),
+                               json=_sale_payload(test_product.id, test_customer.id))
+    finally:
+        event.remove(Session, "after_commit", record_state)
+
+    assert response.status_code == 201, response.text
+    assert (1, IdempotencyStatus.COMPLETED) in states
+    assert all(status == IdempotencyStatus.COMPLETED for sales, status in states if sales)
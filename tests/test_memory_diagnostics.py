@@ -0,0 +1,87 @@
+"""
+Testes do Diagnóstico de Memória (tracemalloc)
+"""
+import logging
+
+import pytest
+
+from app.core import memory
+from app.core.config import settings
+from tests.conftest import get_auth_headers
+
+_retained = []
+
+
+@pytest.fixture
+def tracing():
+    memory.start_tracing(5)
+    yield
+    memory.stop_tracing()
+    memory._route_stats.clear()
+    _retained.clear()
+
+
+def test_memory_endpoints_are_super_admin_only(client, admin_token):
+    """
+    Teste: Admin de empresa não liga o tracemalloc nem lê snapshots
+    """
+    headers = get_auth_headers(admin_token)
+    assert client.post("/api/v1/profiling/memory/start", headers=headers).status_code == 403
+    assert client.get("/api/v1/profiling/memory/diff", headers=headers).status_code == 403
+
+
+def test_snapshot_diff_shows_growth_since_baseline(client, super_admin_token):
+    """
+    Teste: Diff mostra o local que alocou depois do snapshot de referência
+    """
+    headers = get_auth_headers(super_admin_token)
+    assert client.get("/api/v1/profiling/memory/diff", headers=headers).status_code == 409
+
+    try:
+        started = client.post("/api/v1/profiling/memory/start?frames=5", headers=headers).json()
+        assert started["tracing"] is True
+        assert client.post("/api/v1/profiling/memory/snapshot", headers=headers).json()["baseline_taken_at"]
+
+        _retained.append([bytearray(1024) for _ in range(2000)])
+
+        diff = client.get("/api/v1/profiling/memory/diff?limit=5", headers=headers).json()
+        assert diff["compared_to_baseline"] is True
+        top = diff["top"][0]
+        assert "test_memory_diagnostics.py" in top["location"][0]
+        assert top["size_diff_bytes"] >= 2000 * 1024
+
+        assert client.get("/api/v1/profiling/memory/diff?group_by=x", headers=headers).status_code == 400
+    finally:
+        assert client.post("/api/v1/profiling/memory/stop", headers=headers).json()["tracing"] is False
+        _retained.clear()
+
+
+def test_request_peak_recorded_and_warned(client, admin_token, tracing, monkeypatch, caplog):
+    """
+    Teste: Requisição amostrada registra o pico por rota e avisa acima do limite, com rota e empresa
+    """
+    monkeypatch.setattr(settings, "MEMORY_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "MEMORY_REQUEST_WARN_MB", 0.0)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.memory"):
+        response = client.get("/api/v1/products/", headers=get_auth_headers(admin_token))
+    assert response.status_code == 200
+
+    stats = {item["route"]: item for item in memory.route_stats()}
+    assert stats["GET /api/v1/products/"]["samples"] == 1
+    assert stats["GET /api/v1/products/"]["max_peak_bytes"] > 0
+
+    warning = next(record for record in caplog.records if record.name == "app.core.memory")
+    assert warning.route == "/api/v1/products/"
+    assert warning.company_id is not None
+
+    assert 'http_request_peak_alloc_bytes_count{route="/api/v1/products/"}' in client.get("/metrics").text
+
+
+def test_no_measure_without_tracing(client, admin_token, monkeypatch):
+    """
+    Teste: Com o tracemalloc desligado nada é medido
+    """
+    monkeypatch.setattr(settings, "MEMORY_SAMPLE_RATE", 1.0)
+    client.get("/api/v1/products/", headers=get_auth_headers(admin_token))
+    assert memory.route_stats() == []
@@ -0,0 +1,106 @@
+"""
+Testes do Endpoint /metrics (formato de texto do Prometheus)
+"""
+import asyncio
+import json
+import os
+
+import pytest
+
+from app.core import metrics
+from app.core.config import settings
+from tests.conftest import get_auth_headers
+
+
+def _sample(body: str, prefix: str) -> float:
+    """Valor da primeira linha que começa com prefix"""
+    for line in body.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"Série não encontrada: {prefix}")
+
+
+def test_metrics_endpoint_reports_route_templates(client, admin_token, test_product):
+    """
+    Teste: /metrics expõe contagem e latência pelo template da rota, não pelo caminho real
+    """
+    headers = get_auth_headers(admin_token)
+    assert client.get(f"/api/v1/products/{test_product.id}", headers=headers).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    body = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    route = 'route="/api/v1/products/{product_id}"'
+    assert _sample(body, f'http_requests_total{{method="GET",{route},status="200"}}') >= 1
+    assert _sample(body, f'http_request_duration_seconds_count{{method="GET",{route}}}') >= 1
+    assert _sample(body, f'http_request_duration_seconds_bucket{{method="GET",{route},le="+Inf"}}') >= 1
+    assert f"/api/v1/products/{test_product.id}\"" not in body
+    assert "db_pool_checkouts_total" in body
+
+
+def test_histogram_buckets_are_cumulative():
+    """
+    Teste: Faixas do histograma acumulam e +Inf é igual ao total
+    """
+    histogram = metrics.Histogram("test_latency_seconds", "Latência de teste", ("op",), buckets=(0.1, 1.0))
+    try:
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value, op="x")
+        body = metrics.render_metrics()
+        assert 'test_latency_seconds_bucket{op="x",le="0.1"} 1' in body
+        assert 'test_latency_seconds_bucket{op="x",le="1.0"} 3' in body
+        assert 'test_latency_seconds_bucket{op="x",le="+Inf"} 4' in body
+        assert 'test_latency_seconds_sum{op="x"} 4.25' in body
+    finally:
+        metrics.REGISTRY._metrics.pop("test_latency_seconds")
+
+
+def test_multiprocess_snapshots_are_aggregated(tmp_path, monkeypatch):
+    """
+    Teste: Contadores somam os snapshots de todos os workers; gauges ignoram workers encerrados
+    """
+    monkeypatch.setattr(settings, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    counter = metrics.Counter("test_jobs_total", "Contador de teste")
+    gauge = metrics.Gauge("test_in_flight", "Gauge de teste")
+    try:
+        counter.inc(2)
+        gauge.set(1)
+        snapshot = metrics.REGISTRY.snapshot()
+
+        # Outro worker vivo (processo pai) e um worker já encerrado
+        for pid in (os.getppid(), 2 ** 22 + 1):
+            (tmp_path / f"metrics_{pid}.json").write_text(json.dumps({"pid": pid, "metrics": snapshot}))
+
+        body = metrics.render_metrics()
+        assert "test_jobs_total 6" in body
+        assert "test_in_flight 2" in body
+
+        metrics.write_snapshot()
+        assert (tmp_path / f"metrics_{os.getpid()}.json").exists()
+        assert "test_jobs_total 6" in metrics.render_metrics()
+    finally:
+        metrics.REGISTRY._metrics.pop("test_jobs_total")
+        metrics.REGISTRY._metrics.pop("test_in_flight")
+
+
+def test_track_job_records_duration_and_failures():
+    """
+    Teste: Jobs do scheduler (sync e async) registram duração e resultado
+    """
+    def failing_job():
+        raise RuntimeError("falhou")
+
+    async def async_job():
+        return "ok"
+
+    with pytest.raises(RuntimeError):
+        metrics.track_job("test_failing", failing_job)()
+    assert asyncio.run(metrics.track_job("test_async", async_job)()) == "ok"
+
+    body = metrics.render_metrics()
+    assert 'scheduler_job_runs_total{job="test_failing",result="error"} 1' in body
+    assert 'scheduler_job_runs_total{job="test_async",result="success"} 1' in body
+    assert 'scheduler_job_duration_seconds_count{job="test_async"} 1' in body
@@ -0,0 +1,74 @@
+"""
+Testes dos Valores Monetários em Centavos (app.core.money)
+"""
+import pytest
+
+from app.core.money import balance_from_totals, from_cents, split_cents, to_cents
+from tests.conftest import get_auth_headers, Installment
+
+
+@pytest.mark.parametrize("value, cents", [
+    (0.1 + 0.2, 30),
+    (10.005, 1001),
+    (19.99, 1999),
+    (-2.675, -268),
+    (None, 0),
+])
+def test_to_cents_rounds_half_up(value, cents):
+    """
+    Teste: Conversão para centavos corrige o erro do float e arredonda meio para cima
+    """
+    assert to_cents(value) == cents
+
+
+def test_split_cents_keeps_total():
+    """
+    Teste: Parcelas somam exatamente o total; a última compensa o arredondamento
+    """
+    assert split_cents(100.0, 3) == [33.33, 33.33, 33.34]
+    assert split_cents(0.1 + 0.2, 1) == [0.3]
+    assert sum(to_cents(amount) for amount in split_cents(999.99, 7)) == 99999
+
+
+def test_balance_from_totals_in_cents():
+    """
+    Teste: Saldo calculado em centavos, com a mesma tolerância de 1 centavo
+    """
+    assert balance_from_totals(30.3, 10.1 + 20.2) == (30.3, 0.0)
+    assert balance_from_totals(100.0, 99.99) == (99.99, 0.0)
+    assert balance_from_totals(100.0, 33.33) == (33.33, 66.67)
+    assert from_cents(6667) == 66.67
+
+
+def test_credit_sale_installments_are_whole_cents(client, admin_token, test_product, test_customer, db):
+    """
+    Teste: Venda de R$ 100,00 em 3x gera 33.33 + 33.33 + 33.34 e quita com pagamentos fracionados
+    """
+    test_customer.address = "Rua Teste, 100"
+    db.commit()
+
+    headers = get_auth_headers(admin_token)
+    response = client.post("/api/v1/sales/", headers=headers, json={
+        "customer_id": test_customer.id,
+        "payment_type": "credit",
+        "installments_count": 3,
+        "items": [{"product_id": test_product.id, "quantity": 1, "unit_price": 100.00}]
+    })
+    assert response.status_code == 201, response.text
+    sale_id = response.json()["id"]
+
+    installments = db.query(Installment).filter(Installment.sale_id == sale_id).order_by(
+        Installment.installment_number
+    ).all()
+    assert [i.amount for i in installments] == [33.33, 33.33, 33.34]
+
+    last_id = installments[-1].id
+    for amount in (11.11, 22.23):
+        paid = client.post("/api/v1/installment-payments/", headers=headers,
+                           json={"installment_id": last_id, "amount": amount})
+        assert paid.status_code == 201, paid.text
+
+    detail = client.get(f"/api/v1/installments/{last_id}", headers=headers).json()
+    assert detail["total_paid"] == 33.34
+    assert detail["remaining_amount"] == 0.0
+    assert detail["status"] == "paid"
@@ -0,0 +1,86 @@
+"""
+Testes do Status de Vencimento Calculado na Leitura
+Parcelas pendentes com vencimento passado aparecem como vencidas sem o job noturno
+"""
+from sqlalchemy import func
+
+from app.core.config import settings
+from tests.conftest import get_auth_headers, Installment
+
+
+# Uma parcela vencida ontem (ainda PENDING no banco), uma a vencer e uma paga
+DUE_OFFSETS = [(-1, "pending"), (30, "pending"), (-10, "paid")]
+
+
+def test_past_due_pending_is_overdue_without_job(client, db, admin_token, test_company1, test_customer,
+                                                 credit_sale_installments):
+    """
+    Teste: status=overdue, overdue=true e /installments/overdue enxergam a parcela vencida ontem
+    """
+    overdue, upcoming, _ = credit_sale_installments(DUE_OFFSETS)
+    db.commit()
+    headers = get_auth_headers(admin_token)
+
+    by_status = client.get("/api/v1/installments/filter?status=overdue", headers=headers).json()
+    assert [i["id"] for i in by_status["items"]] == [overdue.id]
+    assert by_status["items"][0]["status"] == "overdue"
+
+    by_flag = client.get("/api/v1/installments/filter?overdue=true", headers=headers).json()
+    assert [i["id"] for i in by_flag["items"]] == [overdue.id]
+
+    pending = client.get("/api/v1/installments/filter?status=pending", headers=headers).json()
+    assert [i["id"] for i in pending["items"]] == [upcoming.id]
+
+    listed = client.get("/api/v1/installments/overdue", headers=headers).json()
+    assert [i["id"] for i in listed["items"]] == [overdue.id]
+
+    report = client.get("/api/v1/reports/overdue", headers=headers).json()
+    assert report["overdue_count"] == 1
+    assert report["total_amount"] == 100.0
+
+    # O banco continua com PENDING: nada foi gravado na leitura
+    db.refresh(overdue)
+    assert overdue.status.value == "pending"
+    assert overdue.is_overdue is True
+    assert overdue.effective_status.value == "overdue"
+
+
+def test_effective_status_in_aggregation(db, test_company1, test_customer, credit_sale_installments):
+    """
+    Teste: effective_status funciona em GROUP BY (contagem por status calculado)
+    """
+    credit_sale_installments(DUE_OFFSETS)
+    db.commit()
+
+    # Agrupa pelo rótulo: no PostgreSQL o CASE com parâmetros não pode ser repetido no GROUP BY
+    counts = dict(
+        db.query(Installment.effective_status.label("effective_status"), func.count(Installment.id))
+        .filter(Installment.company_id == test_company1.id)
+        .group_by("effective_status")
+        .all()
+    )
+    assert {status.value: count for status, count in counts.items()} == {
+        "overdue": 1,
+        "pending": 1,
+        "paid": 1,
+    }
+
+
+def test_payment_endpoints_report_overdue_without_job(client, db, admin_token, test_customer,
+                                                      credit_sale_installments, monkeypatch):
+    """
+    Teste: Com o job desligado, detalhe da parcela e distribuição de pagamento mostram "overdue"
+    """
+    monkeypatch.setattr(settings, "OVERDUE_JOB_ENABLED", False)
+    overdue, _, _ = credit_sale_installments(DUE_OFFSETS)
+    db.commit()
+    headers = get_auth_headers(admin_token)
+
+    detail = client.get(f"/api/v1/installment-payments/installments/{overdue.id}/detail", headers=headers)
+    assert detail.status_code == 200, detail.text
+    assert detail.json()["status"] == "overdue"
+
+    allocation = client.post("/api/v1/installment-payments/allocate", headers=headers,
+                             json={"customer_id": test_customer.id, "amount": 40.0})
+    assert allocation.status_code == 201, allocation.text
+    assert [(a["installment_id"], a["status"]) for a in allocation.json()["allocations"]] == [(overdue.id, "overdue")]
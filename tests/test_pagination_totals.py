@@ -0,0 +1,57 @@
+"""
+Testes de Totais Opcionais/Estimados na Paginação
+"""
+from tests.conftest import get_auth_headers, Customer
+
+
+def _create_customers(db, company_id, count):
+    db.add_all([
+        Customer(name=f"Cliente {i}", company_id=company_id, is_active=True)
+        for i in range(count)
+    ])
+    db.commit()
+
+
+def test_without_total_uses_limit_plus_one(client, admin_token, test_company1, db):
+    """
+    Teste: with_total=false não calcula total e has_next vem de limit+1
+    """
+    _create_customers(db, test_company1.id, 5)
+    headers = get_auth_headers(admin_token)
+
+    first = client.get("/api/v1/customers/?with_total=false&limit=3", headers=headers).json()
+    assert first["total"] is None
+    assert first["metadata"]["total_pages"] is None
+    assert len(first["items"]) == 3
+    assert first["metadata"]["has_next"] is True
+
+    last = client.get("/api/v1/customers/?with_total=false&limit=3&skip=3", headers=headers).json()
+    assert len(last["items"]) == 2
+    assert last["metadata"]["has_next"] is False
+    assert last["metadata"]["has_prev"] is True
+
+
+def test_default_keeps_exact_total(client, admin_token, test_company1, db):
+    """
+    Teste: Sem parâmetros a resposta continua com o total exato
+    """
+    _create_customers(db, test_company1.id, 5)
+
+    data = client.get("/api/v1/customers/?limit=2", headers=get_auth_headers(admin_token)).json()
+    assert data["total"] == 5
+    assert data["metadata"]["total_pages"] == 3
+    assert data["metadata"]["has_next"] is True
+
+
+def test_estimate_total_falls_back_to_exact_count(client, admin_token, test_company1, db):
+    """
+    Teste: Fora do PostgreSQL o total estimado usa COUNT exato
+    """
+    _create_customers(db, test_company1.id, 4)
+
+    data = client.get(
+        "/api/v1/customers/?estimate_total=true&limit=3",
+        headers=get_auth_headers(admin_token)
+    ).json()
+    assert data["total"] == 4
+    assert data["metadata"]["has_next"] is True
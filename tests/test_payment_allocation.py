@@ -0,0 +1,64 @@
+"""
+Testes da Distribuição de Pagamento entre Parcelas (FIFO por vencimento)
+"""
+import pytest
+
+from app.models.installment_payment import InstallmentPayment, InstallmentPaymentStatus
+from tests.conftest import get_auth_headers, Installment
+
+URL = "/api/v1/installment-payments/allocate"
+
+
+@pytest.fixture
+def open_installments(db, test_company1, credit_sale_installments):
+    """Quatro parcelas de 100 (a segunda já com 30 pagos) e uma paga, fora de ordem de criação"""
+    installments = credit_sale_installments(
+        [(60, "pending"), (-20, "overdue"), (10, "pending"), (90, "pending"), (-40, "paid")],
+        numbers=[3, 1, 2, 4, 5]
+    )
+    db.add(InstallmentPayment(installment_id=installments[2].id, company_id=test_company1.id,
+                              amount_paid=30.0, status=InstallmentPaymentStatus.COMPLETED))
+    db.commit()
+    # Ordem de vencimento: número 1, 2, 3, 4
+    return sorted(installments[:4], key=lambda i: i.installment_number)
+
+
+def test_allocates_oldest_installments_first(client, admin_token, test_customer, open_installments, db):
+    """
+    Teste: Valor quita as parcelas mais antigas e deixa a seguinte com pagamento parcial
+    """
+    response = client.post(URL, headers=get_auth_headers(admin_token),
+                           json={"customer_id": test_customer.id, "amount": 200.0})
+    assert response.status_code == 201, response.text
+    data = response.json()
+
+    breakdown = [(a["installment_number"], a["amount_paid"], a["remaining_amount"], a["status"])
+                 for a in data["allocations"]]
+    assert breakdown == [(1, 100.0, 0.0, "paid"), (2, 70.0, 0.0, "paid"), (3, 30.0, 70.0, "pending")]
+    assert data["remaining_debt"] == 170.0
+
+    db.expire_all()
+    statuses = {i.installment_number: i.status.value for i in db.query(Installment).filter(
+        Installment.id.in_([i.id for i in open_installments]))}
+    assert statuses == {1: "paid", 2: "paid", 3: "pending", 4: "pending"}
+    assert db.query(InstallmentPayment).count() == 4
+    assert {a["payment_id"] for a in data["allocations"]} <= {p.id for p in db.query(InstallmentPayment)}
+
+
+def test_allocation_cannot_exceed_debt(client, admin_token, test_customer, open_installments, db):
+    """
+    Teste: Valor maior que o saldo devedor é recusado sem registrar pagamentos
+    """
+    response = client.post(URL, headers=get_auth_headers(admin_token),
+                           json={"customer_id": test_customer.id, "amount": 370.01})
+    assert response.status_code == 400
+    assert db.query(InstallmentPayment).count() == 1
+
+
+def test_allocation_is_tenant_scoped(client, company2_token, test_customer, open_installments):
+    """
+    Teste: Cliente de outra empresa não é encontrado
+    """
+    response = client.post(URL, headers=get_auth_headers(company2_token),
+                           json={"customer_id": test_customer.id, "amount": 10.0})
+    assert response.status_code == 404
@@ -0,0 +1,153 @@
+"""
+Testes de Concorrência Otimista nos Pagamentos de Parcelas
+Vários caixas pagando a mesma parcela ao mesmo tempo, cada um com sua própria sessão
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.endpoints.installment_payments import _register_payment
+from app.core.config import settings
+from app.core.database import Base
+from app.models.installment_payment import InstallmentPayment
+from app.schemas.installment_payment import InstallmentPaymentCreate
+from tests.conftest import Company, Customer, Installment, Role, Sale, User
+
+
+@pytest.fixture
+def file_session_factory(tmp_path):
+    """Banco SQLite em arquivo: cada sessão usa sua própria conexão (o banco em memória dos testes tem uma só)"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'payments.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture
+def installment_id(file_session_factory):
+    """Parcela de R$ 100,00 sem pagamentos"""
+    with file_session_factory() as session:
+        company = Company(name="Empresa Concorrência", slug="empresa-concorrencia", cnpj="11222333000181",
+                          email="contato@concorrencia.com", is_active=True)
+        role = Role(name="Administrador", description="Administrador com acesso total")
+        session.add_all([company, role])
+        session.flush()
+        user = User(name="Caixa", email="caixa@teste.com", password_hash="x",
+                    company_id=company.id, role_id=role.id, is_active=True)
+        customer = Customer(name="Cliente Concorrência", company_id=company.id, is_active=True)
+        session.add_all([user, customer])
+        session.flush()
+        sale = Sale(customer_id=customer.id, company_id=company.id, user_id=user.id,
+                    subtotal=100.0, total_amount=100.0, payment_type="credit", status="completed")
+        session.add(sale)
+        session.flush()
+        installment = Installment(sale_id=sale.id, customer_id=customer.id, company_id=company.id,
+                                  installment_number=1, amount=100.0,
+                                  due_date=date.today() + timedelta(days=30))
+        session.add(installment)
+        session.commit()
+        return installment.id
+
+
+def _cashier(file_session_factory, installment_id):
+    with file_session_factory() as session:
+        company_id = session.get(Installment, installment_id).company_id
+    return SimpleNamespace(company_id=company_id)
+
+
+def _pay(file_session_factory, installment_id, current_user, amount):
+    with file_session_factory() as session:
+        try:
+            _register_payment(installment_id, InstallmentPaymentCreate(amount=amount), current_user, session)
+            return 201
+        except HTTPException as exc:
+            return exc.status_code
+
+
+def _paid_total(file_session_factory, installment_id):
+    with file_session_factory() as session:
+        total = session.query(func.coalesce(func.sum(InstallmentPayment.amount_paid), 0.0)).filter(
+            InstallmentPayment.installment_id == installment_id
+        ).scalar()
+        installment = session.get(Installment, installment_id)
+        return total, installment.status.value, installment.version
+
+
+def test_stale_read_is_retried_without_overpayment(file_session_factory, installment_id):
+    """
+    Teste: Pagamento baseado em saldo desatualizado é refeito e rejeitado, sem pagar a mais
+    """
+    current_user = _cashier(file_session_factory, installment_id)
+
+    with file_session_factory() as stale:
+        # Caixa 1 lê a parcela (saldo R$ 100,00) antes do caixa 2 quitá-la
+        installment = stale.get(Installment, installment_id)
+        assert installment.payments == []
+        assert _pay(file_session_factory, installment_id, current_user, 100.0) == 201
+
+        with pytest.raises(HTTPException) as exc:
+            _register_payment(installment_id, InstallmentPaymentCreate(amount=60.0), current_user, stale)
+
+    assert exc.value.status_code == 400
+    assert _paid_total(file_session_factory, installment_id) == (100.0, "paid", 2)
+
+
+def test_retries_exhausted_returns_conflict(file_session_factory, installment_id, monkeypatch):
+    """
+    Teste: Sem novas tentativas, o conflito de versão vira 409 e nada é gravado
+    """
+    monkeypatch.setattr(settings, "PAYMENT_MAX_RETRIES", 0)
+    current_user = _cashier(file_session_factory, installment_id)
+
+    with file_session_factory() as stale:
+        installment = stale.get(Installment, installment_id)
+        assert installment.payments == []
+        assert _pay(file_session_factory, installment_id, current_user, 30.0) == 201
+
+        with pytest.raises(HTTPException) as exc:
+            _register_payment(installment_id, InstallmentPaymentCreate(amount=30.0), current_user, stale)
+
+    assert exc.value.status_code == 409
+    assert _paid_total(file_session_factory, installment_id) == (30.0, "pending", 2)
+
+
+@pytest.mark.parametrize("amount, expected_successes", [(10.0, 10), (30.0, 3)])
+def test_concurrent_payments_never_exceed_installment(file_session_factory, installment_id, monkeypatch,
+                                                      record_property, amount, expected_successes):
+    """
+    Teste: 10 caixas simultâneos; todo pagamento aceito cabe no saldo e a soma nunca passa de R$ 100,00
+
+    O tempo total e a vazão (pagamentos aceitos por segundo) vão para o relatório
+    do pytest (record_property / --junitxml), para comparar entre execuções.
+    """
+    monkeypatch.setattr(settings, "PAYMENT_MAX_RETRIES", 20)
+    current_user = _cashier(file_session_factory, installment_id)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        results = list(executor.map(
+            lambda _: _pay(file_session_factory, installment_id, current_user, amount), range(10)
+        ))
+    elapsed = time.perf_counter() - started
+    record_property("elapsed_seconds", round(elapsed, 4))
+    record_property("payments_per_second", round(results.count(201) / elapsed, 1))
+
+    assert results.count(201) == expected_successes
+    assert set(results) <= {201, 400}
+
+    total, installment_status, version = _paid_total(file_session_factory, installment_id)
+    assert total == amount * expected_successes
+    assert total <= 100.0
+    assert installment_status == ("paid" if total == 100.0 else "pending")
+    assert version == expected_successes + 1
@@ -0,0 +1,132 @@
+"""
+Testes do Consolidado Diário de Vendas por Produto (product_daily_sales)
+"""
+from datetime import date
+
+from app.models.product_daily_sales import ProductDailySales
+from tests.conftest import get_auth_headers, Product, Sale, SaleItem
+
+
+def _second_product(db, company_id):
+    product = Product(name="Produto B", sku="PROD-B", cost_price=4.0, sale_price=8.0,
+                      stock_quantity=100, company_id=company_id, is_active=True)
+    db.add(product)
+    db.commit()
+    return product
+
+
+def test_rollup_follows_create_and_cancel(client, admin_token, test_company1, test_product, test_customer,
+                                          db, cash_sale):
+    """
+    Teste: Venda soma no consolidado do dia e o cancelamento subtrai
+    """
+    other = _second_product(db, test_company1.id)
+    cash_sale([(test_product.id, 2), (other.id, 1)])
+    sale_id = cash_sale([(test_product.id, 3)])
+
+    row = db.query(ProductDailySales).filter(ProductDailySales.product_id == test_product.id).one()
+    assert row.day == date.today()
+    assert (row.quantity, row.revenue, row.cost, row.sale_count) == (5, 100.0, 50.0, 2)
+
+    response = client.post(f"/api/v1/sales/{sale_id}/cancel", headers=get_auth_headers(admin_token))
+    assert response.status_code == 200
+
+    db.expire_all()
+    row = db.query(ProductDailySales).filter(ProductDailySales.product_id == test_product.id).one()
+    assert (row.quantity, row.revenue, row.sale_count) == (2, 40.0, 1)
+
+
+def test_rankings_read_from_rollup(client, admin_token, test_company1, test_product, test_customer,
+                                   db, cash_sale):
+    """
+    Teste: top-sellers e sold-products usam o consolidado
+    """
+    other = _second_product(db, test_company1.id)
+    cash_sale([(test_product.id, 1), (other.id, 4)])
+    cash_sale([(test_product.id, 2)])
+    headers = get_auth_headers(admin_token)
+
+    top = client.get("/api/v1/sales/products/top-sellers?period=month", headers=headers).json()
+    assert [(p["id"], p["quantity"]) for p in top] == [(other.id, 4), (test_product.id, 3)]
+
+    top = client.get("/api/v1/sales/products/top-sellers?period=month&metric=revenue&limit=1", headers=headers).json()
+    assert [(p["id"], p["revenue"]) for p in top] == [(other.id, 80.0)]
+
+    sold = client.get("/api/v1/reports/sold-products?period=month", headers=headers).json()
+    assert [(p["product_id"], p["quantity_sold"]) for p in sold["products"]] == [(other.id, 4), (test_product.id, 3)]
+
+
+def test_top_sellers_by_customer_uses_sale_items(client, admin_token, test_product, test_customer,
+                                                 db, cash_sale):
+    """
+    Teste: Filtro por cliente continua consultando os itens das vendas
+    """
+    cash_sale([(test_product.id, 2)])
+
+    top = client.get(
+        f"/api/v1/sales/products/top-sellers?period=month&customer_id={test_customer.id}",
+        headers=get_auth_headers(admin_token)
+    ).json()
+    assert [(p["id"], p["quantity"]) for p in top] == [(test_product.id, 2)]
+
+
+def test_rebuild_recomputes_from_sales(client, admin_token, test_company1, test_admin_user,
+                                       test_product, test_customer, db):
+    """
+    Teste: Rebuild refaz o consolidado a partir das vendas (ex.: vendas importadas direto no banco)
+    """
+    sale = Sale(customer_id=test_customer.id, company_id=test_company1.id, user_id=test_admin_user.id,
+                subtotal=60.0, total_amount=60.0, payment_type="cash", status="completed")
+    db.add(sale)
+    db.flush()
+    db.add(SaleItem(sale_id=sale.id, product_id=test_product.id, quantity=3,
+                    unit_price=20.0, total_price=60.0, unit_cost_price=10.0))
+    db.commit()
+    headers = get_auth_headers(admin_token)
+
+    assert client.get("/api/v1/sales/products/top-sellers?period=month", headers=headers).json() == []
+
+    today = date.today().isoformat()
+    response = client.post(
+        f"/api/v1/reports/sold-products/rebuild?start_date={today}&end_date={today}",
+        headers=headers
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["rows"] == 1
+
+    top = client.get("/api/v1/sales/products/top-sellers?period=month", headers=headers).json()
+    assert [(p["id"], p["quantity"], p["revenue"]) for p in top] == [(test_product.id, 3, 60.0)]
+
+
+def test_rebuild_requires_admin(client, manager_token):
+    """
+    Teste: Apenas admin pode recalcular o consolidado
+    """
+    response = client.post("/api/v1/reports/sold-products/rebuild", headers=get_auth_headers(manager_token))
+    assert response.status_code == 403
+
+
+def test_rollup_counts_only_completed_sales(client, admin_token, test_company1, test_admin_user,
+                                            test_product, test_customer, db):
+    """
+    Teste: Vendas pendentes não entram no consolidado (mesmo critério do ranking por sale_items)
+    """
+    for status, quantity in (("completed", 2), ("pending", 5)):
+        sale = Sale(customer_id=test_customer.id, company_id=test_company1.id, user_id=test_admin_user.id,
+                    subtotal=20.0 * quantity, total_amount=20.0 * quantity, payment_type="cash", status=status)
+        db.add(sale)
+        db.flush()
+        db.add(SaleItem(sale_id=sale.id, product_id=test_product.id, quantity=quantity,
+                        unit_price=20.0, total_price=20.0 * quantity, unit_cost_price=10.0))
+    db.commit()
+    headers = get_auth_headers(admin_token)
+
+    response = client.post("/api/v1/reports/sold-products/rebuild", headers=headers)
+    assert response.status_code == 200, response.text
+
+    top = client.get("/api/v1/sales/products/top-sellers?period=month", headers=headers).json()
+    by_customer = client.get(
+        f"/api/v1/sales/products/top-sellers?period=month&customer_id={test_customer.id}", headers=headers
+    ).json()
+    assert [(p["id"], p["quantity"]) for p in top] == [(test_product.id, 2)]
+    assert [(p["id"], p["quantity"]) for p in by_customer] == [(test_product.id, 2)]
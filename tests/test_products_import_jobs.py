@@ -0,0 +1,140 @@
+"""
+Testes da Importação de Produtos em Background (jobs)
+O upload é salvo em disco, o job é processado em lotes e o progresso fica consultável
+"""
+import io
+import pytest
+
+from app.core.config import settings
+from tests.conftest import get_auth_headers, Product
+from tests.test_products_import import create_csv_content
+
+
+@pytest.fixture
+def small_chunks(tmp_path, monkeypatch):
+    """Força lotes pequenos e diretório temporário para os arquivos do job"""
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_SIZE", 7)
+    monkeypatch.setattr(settings, "IMPORT_JOBS_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _upload(client, token, csv_content, encoding="utf-8"):
+    return client.post(
+        "/api/v1/products-import/import/jobs",
+        headers=get_auth_headers(token),
+        files={"file": ("test.csv", io.BytesIO(csv_content.encode(encoding)), "text/csv")}
+    )
+
+
+def test_import_job_processes_in_chunks(client, admin_token, test_category, db, small_chunks):
+    """
+    Teste: Job retorna imediatamente com id e processa todas as linhas em lotes
+    """
+    csv_rows = [
+        f"Produto Job {i},Marca,{test_category.name},Desc,10.00,20.00,1,0,JOB-{i:03d},,true,false,"
+        for i in range(30)
+    ]
+    csv_rows.append(f"Produto Sem Preco,Marca,{test_category.name},Desc,,20.00,1,0,,,true,false,")
+
+    response = _upload(client, admin_token, create_csv_content(csv_rows))
+
+    assert response.status_code == 202
+    data = response.json()
+    assert data["job_id"]
+    assert data["estimated_rows"] == 31
+
+    status_response = client.get(
+        f"/api/v1/products-import/import/jobs/{data['job_id']}",
+        headers=get_auth_headers(admin_token)
+    )
+    assert status_response.status_code == 200
+    job = status_response.json()
+    assert job["status"] == "completed"
+    assert job["processed_rows"] == 31
+    assert job["success_count"] == 30
+    assert job["error_count"] == 1
+    assert job["progress_percentage"] == 100.0
+    assert job["rows_per_second"] >= 0
+    assert "preco_custo" in job["errors"][0]["erro"]
+
+    # Resultado persistido no mesmo formato da importação síncrona
+    assert job["result"]["total_linhas"] == 31
+    assert job["result"]["sucessos"] == 30
+    assert len(job["result"]["detalhes"]["criados"]) == 30
+
+    assert db.query(Product).filter(Product.sku.like("JOB-%")).count() == 30
+
+    # Arquivo temporário removido após o processamento
+    assert list(small_chunks.rglob("*.csv")) == []
+
+
+def test_import_job_accepts_latin1(client, admin_token, test_category, db, small_chunks):
+    """
+    Teste: Arquivo em Latin-1 é detectado durante a cópia para disco
+    """
+    csv_rows = [f"Sabonete Maçã,Marca,{test_category.name},Descrição,1.00,2.00,0,0,LAT-001,,true,false,"]
+
+    response = _upload(client, admin_token, create_csv_content(csv_rows), encoding="latin-1")
+    assert response.status_code == 202
+
+    job = client.get(
+        f"/api/v1/products-import/import/jobs/{response.json()['job_id']}",
+        headers=get_auth_headers(admin_token)
+    ).json()
+    assert job["status"] == "completed"
+    assert db.query(Product).filter(Product.sku == "LAT-001").first().name == "Sabonete Maçã"
+
+
+def test_import_job_rejects_missing_header(client, admin_token, small_chunks):
+    """
+    Teste: Cabeçalho inválido é rejeitado antes de criar o job
+    """
+    response = _upload(client, admin_token, "nome,marca\nProduto,Marca\n")
+
+    assert response.status_code == 400
+    assert "Campos obrigatórios faltando" in response.json()["detail"]
+    assert list(small_chunks.rglob("*.csv")) == []
+
+
+def test_import_job_isolated_by_company(client, admin_token, company2_token, test_category, small_chunks):
+    """
+    Teste: Outra empresa não enxerga o job
+    """
+    csv_rows = [f"Produto,Marca,{test_category.name},Desc,1.00,2.00,0,0,,,false,false,"]
+    job_id = _upload(client, admin_token, create_csv_content(csv_rows)).json()["job_id"]
+
+    response = client.get(
+        f"/api/v1/products-import/import/jobs/{job_id}",
+        headers=get_auth_headers(company2_token)
+    )
+    assert response.status_code in [403, 404]
+
+    listing = client.get(
+        "/api/v1/products-import/import/jobs",
+        headers=get_auth_headers(admin_token)
+    )
+    assert listing.status_code == 200
+    assert [j["job_id"] for j in listing.json()] == [job_id]
+
+
+def test_import_job_caps_result_details(client, admin_token, test_category, db, small_chunks, monkeypatch):
+    """
+    Teste: Listas de detalhes do resultado são limitadas; os totais continuam exatos
+    """
+    monkeypatch.setattr(settings, "IMPORT_MAX_CREATED_DETAILS", 5)
+    monkeypatch.setattr(settings, "IMPORT_MAX_ERROR_DETAILS", 2)
+    csv_rows = [
+        f"Produto Cap {i},Marca,{test_category.name},Desc,10.00,20.00,1,0,CAP-{i:03d},,true,false,"
+        for i in range(20)
+    ]
+    csv_rows += [f"Sem Preco {i},Marca,{test_category.name},Desc,,20.00,1,0,,,true,false," for i in range(4)]
+
+    job_id = _upload(client, admin_token, create_csv_content(csv_rows)).json()["job_id"]
+    job = client.get(f"/api/v1/products-import/import/jobs/{job_id}", headers=get_auth_headers(admin_token)).json()
+
+    assert (job["success_count"], job["error_count"]) == (20, 4)
+    assert len(job["errors"]) == 2
+    assert len(job["result"]["detalhes"]["criados"]) == 5
+    assert len(job["result"]["detalhes"]["erros"]) == 2
+    assert job["result"]["detalhes_truncados"] is True
+    assert db.query(Product).filter(Product.sku.like("CAP-%")).count() == 20
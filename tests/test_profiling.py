@@ -0,0 +1,105 @@
+"""
+Testes do Profiler de Requisições sob Demanda
+"""
+import threading
+import time
+
+import pytest
+
+from app.core import profiler
+from app.core.config import settings
+from tests.conftest import get_auth_headers
+
+
+@pytest.fixture
+def profiles_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILER_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_profile_header_requires_super_admin(client, admin_token, profiles_dir):
+    """
+    Teste: Header X-Profile de quem não é Super Admin é ignorado
+    """
+    headers = {**get_auth_headers(admin_token), "X-Profile": "1"}
+    response = client.get("/api/v1/products/", headers=headers)
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert profiler.list_reports() == []
+
+
+def test_super_admin_profiles_request_and_lists_report(client, super_admin_token, profiles_dir):
+    """
+    Teste: Super Admin perfila pelo header e consulta o relatório pelos endpoints de diagnóstico
+    """
+    headers = get_auth_headers(super_admin_token)
+    response = client.get("/api/v1/profiling/rules", headers={**headers, "X-Profile": "1"})
+    assert response.status_code == 200
+    report_id = response.headers["x-profile-id"]
+
+    reports = client.get("/api/v1/profiling/reports", headers=headers).json()
+    assert [report["id"] for report in reports] == [report_id]
+    assert reports[0]["trigger"] == "header"
+    assert reports[0]["route"] == "/api/v1/profiling/rules"
+
+    report = client.get(f"/api/v1/profiling/reports/{report_id}", headers=headers)
+    assert report.status_code == 200
+    assert report.text.startswith("GET /api/v1/profiling/rules  status=200")
+
+    assert client.get("/api/v1/profiling/reports/..%2Frules", headers=headers).status_code == 404
+
+
+def test_sampling_rule_by_route_and_company(client, super_admin_token, admin_token, company2_token,
+                                            test_company1, profiles_dir):
+    """
+    Teste: Regra por prefixo de rota e empresa perfila só as requisições dessa empresa
+    """
+    headers = get_auth_headers(super_admin_token)
+    created = client.post("/api/v1/profiling/rules", headers=headers, json={
+        "path_prefix": "/api/v1/products", "company_id": test_company1.id, "sample_rate": 1.0
+    })
+    assert created.status_code == 201, created.text
+    rule_id = created.json()["id"]
+
+    matched = client.get("/api/v1/products/", headers=get_auth_headers(admin_token))
+    other_company = client.get("/api/v1/products/", headers=get_auth_headers(company2_token))
+    assert matched.status_code == other_company.status_code == 200
+    assert "x-profile-id" in matched.headers
+    assert "x-profile-id" not in other_company.headers
+
+    assert client.delete(f"/api/v1/profiling/rules/{rule_id}", headers=headers).status_code == 204
+    assert client.get("/api/v1/profiling/rules", headers=headers).json() == []
+    assert "x-profile-id" not in client.get("/api/v1/products/", headers=get_auth_headers(admin_token)).headers
+
+
+def test_profiling_endpoints_are_super_admin_only(client, admin_token, profiles_dir):
+    """
+    Teste: Admin de empresa não acessa relatórios nem regras
+    """
+    headers = get_auth_headers(admin_token)
+    assert client.get("/api/v1/profiling/reports", headers=headers).status_code == 403
+    assert client.post("/api/v1/profiling/rules", headers=headers,
+                       json={"path_prefix": "/api/v1/sales"}).status_code == 403
+
+
+def test_sampler_builds_call_tree_from_endpoint():
+    """
+    Teste: Amostras são recortadas a partir da função raiz e agregadas na árvore
+    """
+    def busy_endpoint():
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+
+    sampler = profiler.StackSampler(0.002)
+    sampler.start()
+    worker = threading.Thread(target=busy_endpoint)
+    worker.start()
+    worker.join()
+    sampler.stop()
+
+    tree, total = profiler.build_call_tree(sampler.samples, profiler._endpoint_frame(busy_endpoint))
+    assert total > 0
+    lines = profiler.render_call_tree(tree, total, sampler.interval)
+    assert "busy_endpoint" in lines[0]
+    assert lines[0].lstrip().startswith("100.0%")
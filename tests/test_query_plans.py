@@ -0,0 +1,138 @@
+"""
+Testes de Regressão dos Planos de Execução
+Captura o SQL das rotas mais usadas, roda EXPLAIN e falha se uma consulta deixar de
+usar o índice esperado ou passar a varrer inteira uma tabela com dados de empresa.
+
+SQLite (banco dos testes): EXPLAIN QUERY PLAN.
+PostgreSQL (conftest apontando para um banco real): EXPLAIN (FORMAT JSON) com
+enable_seqscan desligado, para que Seq Scan só apareça quando não há índice utilizável.
+"""
+import json
+import re
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from tests.conftest import engine, get_auth_headers
+
+# Tabelas filtradas por company_id (ou por FK de uma delas): nunca podem ser varridas inteiras
+TENANT_TABLES = {
+    "sales", "sale_items", "installments", "installment_payments", "products", "customers",
+    "product_daily_sales", "customer_product_stats", "receivables_aging_snapshots",
+}
+
+# SCAN products | SEARCH installment_payments_1 USING INDEX ix_... (installment_id=?)
+SQLITE_PLAN_RE = re.compile(
+    r"^(?P<op>SCAN|SEARCH) (?:TABLE )?(?P<table>\w+)(?: AS \w+)?"
+    r"(?: USING (?:COVERING )?INDEX (?P<index>\w+)| USING (?P<pk>INTEGER PRIMARY KEY))?"
+)
+
+
+@contextmanager
+def capture_selects():
+    """Guarda (sql, parâmetros) de cada SELECT executado no bloco"""
+    statements = []
+
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_execute)
+
+
+def _table_name(name: str) -> str:
+    # Aliases gerados pelo SQLAlchemy (installment_payments_1) apontam para a tabela original
+    return re.sub(r"_\d+$", "", name)
+
+
+def _sqlite_accesses(connection, statement, parameters):
+    accesses = []
+    for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all():
+        match = SQLITE_PLAN_RE.match(row[-1])
+        if not match:
+            continue
+        index = match.group("index") or match.group("pk")
+        # SCAN (mesmo "USING INDEX") percorre a tabela/índice inteiro
+        accesses.append((_table_name(match.group("table")), index if match.group("op") == "SEARCH" else None))
+    return accesses
+
+
+def _postgresql_accesses(connection, statement, parameters):
+    accesses = []
+
+    def _walk(node):
+        relation = node.get("Relation Name")
+        if relation:
+            full_scan = node["Node Type"] == "Seq Scan"
+            accesses.append((relation, None if full_scan else node.get("Index Name", node["Node Type"])))
+        elif node["Node Type"] == "Bitmap Index Scan":
+            accesses.append((None, node["Index Name"]))
+        for child in node.get("Plans", []):
+            _walk(child)
+
+    with connection.begin():
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        raw = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    plan = raw if isinstance(raw, list) else json.loads(raw)
+    _walk(plan[0]["Plan"])
+
+    # Bitmap Heap Scan: o índice está no nó filho
+    for position, (table, index) in enumerate(accesses):
+        if table and index == "Bitmap Heap Scan" and position + 1 < len(accesses):
+            accesses[position] = (table, accesses[position + 1][1])
+    return [access for access in accesses if access[0]]
+
+
+def explain_accesses(statements):
+    """Lista (tabela, índice) de cada acesso; índice None indica varredura completa"""
+    explain = _postgresql_accesses if engine.dialect.name == "postgresql" else _sqlite_accesses
+    accesses = []
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            accesses.extend(
+                (table, index, statement)
+                for table, index in explain(connection, statement, parameters)
+            )
+    return accesses
+
+
+HOT_QUERIES = [
+    ("/api/v1/sales/?limit=10", {"sales": "ix_sales_company_created_at"}),
+    ("/api/v1/sales/products/top-sellers", {"product_daily_sales": "ix_product_daily_sales_company_day"}),
+    ("/api/v1/installments/filter?status=overdue&limit=10",
+     {"installments": "ix_installments_company_status_due_date"}),
+    ("/api/v1/products/search?q=Produto", {"products": "ix_products_company_name"}),
+    ("/api/v1/customers/?limit=10", {"customers": "ix_customers_company_id_id"}),
+    ("/api/v1/reports/overdue", {"installments": "ix_installments_company_status_due_date"}),
+]
+
+
+@pytest.mark.parametrize("url, expected_indexes", HOT_QUERIES)
+def test_hot_query_plans_use_indexes(client, db, admin_token, test_product, test_customer, url, expected_indexes):
+    """
+    Teste: Consultas das rotas principais usam os índices esperados e não varrem tabelas de empresa
+    """
+    headers = get_auth_headers(admin_token)
+    with capture_selects() as statements:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+
+    accesses = explain_accesses(statements)
+
+    full_scans = [
+        f"{table}: {' '.join(statement.split())[:200]}"
+        for table, index, statement in accesses
+        if table in TENANT_TABLES and index is None
+    ]
+    assert not full_scans, "Varredura completa em tabela de empresa:\n" + "\n".join(full_scans)
+
+    used = {}
+    for table, index, _ in accesses:
+        used.setdefault(table, set()).add(index)
+    for table, index in expected_indexes.items():
+        assert index in used.get(table, set()), f"{url}: {table} usou {used.get(table)}, esperado {index}"
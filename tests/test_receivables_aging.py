@@ -0,0 +1,115 @@
+"""
+Testes do Aging de Contas a Receber (foto diária por empresa)
+"""
+from app.core.config import settings
+from app.models.installment_payment import InstallmentPayment, InstallmentPaymentStatus
+from app.models.receivables_aging_snapshot import ReceivablesAgingSnapshot
+from tests.conftest import get_auth_headers
+
+
+def test_aging_buckets(client, admin_token, test_company1, credit_sale_installments, test_customer, db):
+    """
+    Teste: Saldo em aberto distribuído nas faixas, descontando pagamentos parciais
+    """
+    installments = credit_sale_installments([10, 0, -1, -30, -31, -75, -91, -400])
+    db.add(InstallmentPayment(installment_id=installments[2].id, company_id=test_company1.id,
+                              amount_paid=40.0, status=InstallmentPaymentStatus.COMPLETED))
+    # Parcela paga não entra no aging
+    credit_sale_installments([-5], status="paid")
+    db.commit()
+
+    data = client.get("/api/v1/reports/receivables-aging", headers=get_auth_headers(admin_token)).json()
+    buckets = data["buckets"]
+
+    assert buckets["future"] == {"count": 1, "amount": 100.0}
+    assert buckets["current"] == {"count": 1, "amount": 100.0}
+    assert buckets["days_1_30"] == {"count": 2, "amount": 160.0}
+    assert buckets["days_31_60"] == {"count": 1, "amount": 100.0}
+    assert buckets["days_61_90"] == {"count": 1, "amount": 100.0}
+    assert buckets["days_90_plus"] == {"count": 2, "amount": 200.0}
+    assert data["overdue_count"] == 6
+    assert data["overdue_amount"] == 560.0
+    assert data["total_open_amount"] == 760.0
+
+
+def test_aging_reads_stored_snapshot_until_refresh(client, admin_token, test_company1, credit_sale_installments,
+                                                   test_customer, db):
+    """
+    Teste: A foto do dia é reutilizada; refresh=true recalcula
+    """
+    headers = get_auth_headers(admin_token)
+    credit_sale_installments([-3])
+    db.commit()
+
+    assert client.get("/api/v1/reports/receivables-aging", headers=headers).json()["overdue_count"] == 1
+
+    credit_sale_installments([-4])
+    db.commit()
+
+    assert client.get("/api/v1/reports/receivables-aging", headers=headers).json()["overdue_count"] == 1
+    refreshed = client.get("/api/v1/reports/receivables-aging?refresh=true", headers=headers).json()
+    assert refreshed["overdue_count"] == 2
+    assert db.query(ReceivablesAgingSnapshot).filter(
+        ReceivablesAgingSnapshot.company_id == test_company1.id
+    ).count() == 1
+
+
+def test_cron_summary_uses_snapshots(client, test_company1, test_company2, credit_sale_installments,
+                                     test_customer, test_customer2, db):
+    """
+    Teste: Resumo do cron agrupa por empresa a partir das fotos do dia
+    """
+    credit_sale_installments([-10, -40, 5])
+    credit_sale_installments([-2], company_id=test_company2.id, customer_id=test_customer2.id)
+    db.commit()
+    cron_headers = {"X-Cron-Secret": settings.CRON_SECRET}
+
+    response = client.post("/api/v1/cron/receivables-aging", headers=cron_headers)
+    assert response.status_code == 200
+    assert response.json()["companies_count"] >= 2
+
+    data = client.get("/api/v1/cron/overdue-summary", headers=cron_headers).json()
+    by_company = {c["company_id"]: c for c in data["companies"]}
+
+    assert by_company[test_company1.id]["overdue_count"] == 2
+    assert by_company[test_company1.id]["overdue_amount"] == 200.0
+    assert by_company[test_company2.id]["overdue_count"] == 1
+    assert data["total_overdue_installments"] == 3
+    assert data["total_overdue_amount"] == 300.0
+
+
+def test_cron_summary_covers_all_companies_after_tenant_report(client, admin_token, test_company1,
+                                                                 test_company2, credit_sale_installments,
+                                                                 test_customer, test_customer2, db):
+    """
+    Teste: Foto gravada pelo relatório de uma empresa não esconde as demais no resumo do cron
+    """
+    credit_sale_installments([-10])
+    credit_sale_installments([-2, -3], company_id=test_company2.id, customer_id=test_customer2.id)
+    db.commit()
+
+    report = client.get("/api/v1/reports/receivables-aging", headers=get_auth_headers(admin_token))
+    assert report.json()["overdue_count"] == 1
+
+    cron_headers = {"X-Cron-Secret": settings.CRON_SECRET}
+    data = client.get("/api/v1/cron/overdue-summary", headers=cron_headers).json()
+    by_company = {c["company_id"]: c for c in data["companies"]}
+
+    assert by_company[test_company1.id]["overdue_count"] == 1
+    assert by_company[test_company2.id]["overdue_count"] == 2
+    assert data["total_overdue_installments"] == 3
+
+
+def test_aging_keeps_one_cent_balance(client, admin_token, test_company1, credit_sale_installments,
+                                      test_customer, db):
+    """
+    Teste: Parcela com R$ 0,01 em aberto continua no aging
+    """
+    installment = credit_sale_installments([-5])[0]
+    db.add(InstallmentPayment(installment_id=installment.id, company_id=test_company1.id,
+                              amount_paid=99.99, status=InstallmentPaymentStatus.COMPLETED))
+    db.commit()
+
+    data = client.get("/api/v1/reports/receivables-aging", headers=get_auth_headers(admin_token)).json()
+
+    assert data["buckets"]["days_1_30"] == {"count": 1, "amount": 0.01}
@@ -0,0 +1,59 @@
+"""
+Testes do Snapshot de Custo e Lucro na Venda
+"""
+from tests.conftest import get_auth_headers, Sale
+
+
+def _create_cash_sale(client, token, product_id, customer_id):
+    response = client.post(
+        "/api/v1/sales/",
+        headers=get_auth_headers(token),
+        json={
+            "customer_id": customer_id,
+            "payment_type": "cash",
+            "discount_amount": 10.0,
+            "items": [{"product_id": product_id, "quantity": 5, "unit_price": 20.00}]
+        }
+    )
+    assert response.status_code in [200, 201], response.text
+    return response.json()
+
+
+def test_sale_stores_cost_and_profit(client, admin_token, test_product, test_customer, db):
+    """
+    Teste: Custo e lucro são gravados na criação e não mudam com o custo atual do produto
+    """
+    sale_id = _create_cash_sale(client, admin_token, test_product.id, test_customer.id)["id"]
+
+    sale = db.query(Sale).filter(Sale.id == sale_id).first()
+    assert sale.total_cost == 50.0
+    assert sale.total_profit == 50.0
+
+    # Alterar o custo do produto não altera o lucro da venda já registrada
+    test_product.cost_price = 15.0
+    db.commit()
+
+    data = client.get(f"/api/v1/sales/{sale_id}", headers=get_auth_headers(admin_token)).json()
+    assert data["profit"] == 50.0
+
+
+def test_profit_report_uses_stored_cost(client, admin_token, test_product, test_customer, db):
+    """
+    Teste: Relatório de lucro soma o custo gravado e mantém o fallback para vendas antigas
+    """
+    _create_cash_sale(client, admin_token, test_product.id, test_customer.id)
+
+    test_product.cost_price = 15.0
+    db.commit()
+
+    report = client.get("/api/v1/reports/profit?period=month", headers=get_auth_headers(admin_token)).json()
+    assert report["total_revenue"] == 90.0
+    assert report["total_cost"] == 50.0
+    assert report["profit"] == 40.0
+
+    # Venda sem snapshot (anterior à migração) continua sendo calculada pelos itens
+    db.query(Sale).update({Sale.total_cost: None, Sale.total_profit: None})
+    db.commit()
+
+    report = client.get("/api/v1/reports/profit?period=month", headers=get_auth_headers(admin_token)).json()
+    assert report["total_cost"] == 50.0
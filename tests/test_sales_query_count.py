@@ -0,0 +1,185 @@
+"""
+Testes de Regressão N+1 nas Listagens de Vendas
+O número de comandos SQL por requisição não pode crescer com o tamanho da página
+"""
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from app.models.installment_payment import InstallmentPayment, InstallmentPaymentStatus
+from tests.conftest import engine, get_auth_headers, Installment, Product, Sale, SaleItem
+
+# Autenticação + consulta da página + um SELECT ... IN por relacionamento (+ um SELECT de estatísticas)
+MAX_STATEMENTS_PER_REQUEST = 15
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_execute)
+
+
+@pytest.fixture
+def sales_with_details(db, test_company1, test_admin_user, test_customer):
+    """10 vendas, cada uma com 2 itens (produtos distintos) e 2 parcelas com pagamento"""
+    sales = []
+    for i in range(10):
+        products = [
+            Product(name=f"Produto {i}-{j}", sku=f"NPLUS-{i}-{j}", cost_price=5, sale_price=10,
+                    stock_quantity=10, company_id=test_company1.id)
+            for j in range(2)
+        ]
+        db.add_all(products)
+        db.flush()
+
+        sale = Sale(customer_id=test_customer.id, company_id=test_company1.id, user_id=test_admin_user.id,
+                    subtotal=20.0, total_amount=20.0, payment_type="credit", status="completed")
+        db.add(sale)
+        db.flush()
+
+        for product in products:
+            db.add(SaleItem(sale_id=sale.id, product_id=product.id, quantity=1,
+                            unit_price=10.0, total_price=10.0, unit_cost_price=5.0))
+        for number in (1, 2):
+            installment = Installment(sale_id=sale.id, customer_id=test_customer.id, company_id=test_company1.id,
+                                      installment_number=number, amount=10.0,
+                                      due_date=date.today() + timedelta(days=30 * number))
+            db.add(installment)
+            db.flush()
+            db.add(InstallmentPayment(installment_id=installment.id, company_id=test_company1.id,
+                                      amount_paid=5.0, status=InstallmentPaymentStatus.COMPLETED))
+        sales.append(sale)
+    db.commit()
+    db.expire_all()
+    return sales
+
+
+def _statements_for(client, db, url, token):
+    headers = get_auth_headers(token)
+    # A sessão de teste é compartilhada entre requisições: expira tudo para medir do zero
+    db.expire_all()
+    with count_statements() as statements:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    return len(statements), response.json()
+
+
+def test_list_sales_statement_count_is_constant(client, db, admin_token, sales_with_details):
+    """
+    Teste: Listar 2 ou 10 vendas executa o mesmo número de comandos SQL
+    """
+    small, small_data = _statements_for(client, db, "/api/v1/sales/?limit=2", admin_token)
+    large, large_data = _statements_for(client, db, "/api/v1/sales/?limit=10", admin_token)
+
+    assert len(small_data["items"]) == 2
+    assert len(large_data["items"]) == 10
+    assert large_data["items"][0]["items"][0]["product"]["name"].startswith("Produto")
+    assert large_data["items"][0]["installments"][0]["total_paid"] == 5.0
+
+    assert small == large
+    assert large <= MAX_STATEMENTS_PER_REQUEST
+
+
+def test_customer_sales_history_statement_count_is_constant(client, db, admin_token, test_customer, sales_with_details):
+    """
+    Teste: Histórico do cliente não faz uma consulta por venda
+    """
+    url = f"/api/v1/sales/by-customer/{test_customer.id}"
+    small, _ = _statements_for(client, db, f"{url}?limit=2", admin_token)
+    large, data = _statements_for(client, db, f"{url}?limit=10", admin_token)
+
+    assert len(data["sales"]) == 10
+    assert small == large
+    assert large <= MAX_STATEMENTS_PER_REQUEST
+
+
+def test_get_sale_statement_count(client, db, admin_token, sales_with_details):
+    """
+    Teste: Detalhe da venda carrega itens, produtos, cliente e parcelas em consultas fixas
+    """
+    count, data = _statements_for(client, db, f"/api/v1/sales/{sales_with_details[0].id}", admin_token)
+
+    assert len(data["items"]) == 2
+    assert data["customer"]["name"] == "Cliente Teste"
+    assert count <= MAX_STATEMENTS_PER_REQUEST
+
+
+def test_customer_sales_history_statistics(client, db, admin_token, test_company1, test_admin_user,
+                                           test_customer, sales_with_details):
+    """
+    Teste: Estatísticas agregadas no banco consideram apenas vendas concluídas
+    """
+    db.add_all([
+        Sale(customer_id=test_customer.id, company_id=test_company1.id, user_id=test_admin_user.id,
+             total_amount=30.0, payment_type="cash", status="completed"),
+        Sale(customer_id=test_customer.id, company_id=test_company1.id, user_id=test_admin_user.id,
+             total_amount=999.0, payment_type="pix", status="cancelled"),
+    ])
+    db.commit()
+
+    _, data = _statements_for(client, db, f"/api/v1/sales/by-customer/{test_customer.id}?limit=1", admin_token)
+    stats = data["statistics"]
+
+    assert stats["total_sales"] == 12
+    assert stats["completed_sales"] == 11
+    assert stats["total_spent"] == 230.0
+    assert stats["average_ticket"] == pytest.approx(230.0 / 11)
+    assert stats["total_items_purchased"] == 20
+    assert stats["most_used_payment"] == "credit"
+    assert stats["first_purchase_date"] is not None
+    assert len(data["sales"]) == 1
+
+
+def test_cancel_sale_statement_count_is_constant(client, db, admin_token, test_company1, test_admin_user,
+                                                 test_customer):
+    """
+    Teste: Cancelar uma venda com 50 itens devolve o estoque com comandos SQL fixos
+    """
+    products = [
+        Product(name=f"Item {i}", sku=f"CANCEL-{i}", cost_price=5, sale_price=10,
+                stock_quantity=10, company_id=test_company1.id)
+        for i in range(25)
+    ]
+    db.add_all(products)
+    sale = Sale(customer_id=test_customer.id, company_id=test_company1.id, user_id=test_admin_user.id,
+                subtotal=500.0, total_amount=500.0, payment_type="credit", status="completed")
+    db.add(sale)
+    db.flush()
+    # Dois itens por produto: a devolução é agregada por produto
+    for product in products * 2:
+        db.add(SaleItem(sale_id=sale.id, product_id=product.id, quantity=2,
+                        unit_price=10.0, total_price=20.0, unit_cost_price=5.0))
+    for number in (1, 2):
+        db.add(Installment(sale_id=sale.id, customer_id=test_customer.id, company_id=test_company1.id,
+                           installment_number=number, amount=250.0,
+                           due_date=date.today() + timedelta(days=30 * number)))
+    db.commit()
+
+    headers = get_auth_headers(admin_token)
+    sale_id = sale.id
+    db.expire_all()
+    with count_statements() as statements:
+        response = client.post(f"/api/v1/sales/{sale_id}/cancel", headers=headers)
+    assert response.status_code == 200, response.text
+    assert len(statements) <= MAX_STATEMENTS_PER_REQUEST
+
+    db.expire_all()
+    assert {p.stock_quantity for p in db.query(Product).filter(Product.sku.like("CANCEL-%"))} == {14}
+    # StockMovement é substituído por mock em test_credit_validation_tdd: consulta direta na tabela
+    movements = db.execute(
+        text("SELECT quantity, previous_stock, new_stock FROM stock_movements WHERE reference_id = :id"),
+        {"id": sale_id}
+    ).all()
+    assert len(movements) == 25
+    assert set(movements) == {(4, 10, 14)}
+    assert {i.status.value for i in db.query(Installment).filter(Installment.sale_id == sale_id)} == {"cancelled"}
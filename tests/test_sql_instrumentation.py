@@ -0,0 +1,71 @@
+"""
+Testes da Instrumentação de SQL por Requisição (Server-Timing e detecção de N+1)
+"""
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.middleware.sql_instrumentation import fingerprint, track_sql
+from tests.conftest import engine, get_auth_headers
+
+
+def test_fingerprint_collapses_in_lists_and_numbers():
+    """
+    Teste: Mesmo comando com listas IN e literais diferentes tem o mesmo fingerprint
+    """
+    first = fingerprint("SELECT * FROM products WHERE id IN (?, ?, ?) LIMIT 10")
+    second = fingerprint("SELECT *  FROM products\n WHERE id IN (?, ?) LIMIT 50")
+    assert first == second == "SELECT * FROM products WHERE id IN (?) LIMIT ?"
+
+
+def test_server_timing_header_on_sampled_request(client, admin_token, monkeypatch):
+    """
+    Teste: Requisição amostrada devolve o tempo de banco e a contagem de SQL no Server-Timing
+    """
+    monkeypatch.setattr(settings, "SQL_INSTRUMENTATION_SAMPLE_RATE", 1.0)
+    response = client.get("/api/v1/products/", headers=get_auth_headers(admin_token))
+    assert response.status_code == 200
+
+    timing = response.headers["server-timing"]
+    assert "db;dur=" in timing and "app;dur=" in timing
+    assert 'desc="0 SQL"' not in timing
+
+
+def test_unsampled_request_has_no_header(client, admin_token, monkeypatch):
+    """
+    Teste: Fora da amostra nada é medido
+    """
+    monkeypatch.setattr(settings, "SQL_INSTRUMENTATION_SAMPLE_RATE", 0.0)
+    response = client.get("/api/v1/products/", headers=get_auth_headers(admin_token))
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+
+
+def test_repeated_statement_flagged_as_n_plus_one():
+    """
+    Teste: Mesmo comando repetido acima do limite é apontado com o ponto de chamada
+    """
+    with track_sql(threshold=3) as stats:
+        with engine.connect() as connection:
+            for value in range(5):
+                connection.execute(text("SELECT :value"), {"value": value})
+            connection.execute(text("SELECT 1 + 1"))
+
+    assert stats.statements == 6
+    assert stats.duration > 0
+    assert len(stats.n_plus_one) == 1
+
+    finding = next(iter(stats.n_plus_one.values()))
+    assert finding["count"] == 5
+    assert "test_sql_instrumentation.py" in finding["call_site"]
+    assert "test_repeated_statement_flagged_as_n_plus_one" in finding["call_site"]
+
+
+def test_no_tracking_outside_request():
+    """
+    Teste: Sem requisição ativa os eventos não acumulam nada
+    """
+    with track_sql() as stats:
+        pass
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert stats.statements == 0